@@ -1,18 +1,129 @@
+import os
+import time
+_T0 = time.perf_counter()
+
 from dash import Dash
+from flask import Response, jsonify, request
 import layout
+import profiler
+import visibility
+import scheduler
+from config import CONFIG, configure
+from panels.registry import IMPORT_TIMES
+import data.ws_client as ws
+from data import alerts, latency, venues
 from data.ws_client import start_ws_thread
+from data.state_channel import INGEST_SOCKET, start_mirror_thread
 import callbacks
 import plotly.io as pio
 pio.templates.default = "plotly_dark"
 
-app = Dash(__name__)
-app.layout = layout.serve_layout()
+# gzip/brotli responses when flask-compress is installed
+try:
+    import flask_compress  # noqa: F401
+    COMPRESS = True
+except ImportError:
+    COMPRESS = False
+
+# Measured once the app is built, reported on /metrics
+STARTUP = {"total": None}
+
+# Cache lifetime for /assets (seconds)
+ASSET_MAX_AGE = int(os.environ.get("ASSET_MAX_AGE", "3600"))
+
+
+def create_app():
+    """
+    Build the Dash app. The layout (including panel 1's REST figure) is
+    computed once here; under gunicorn --preload it is built in the master
+    and shared by all forked workers.
+    """
+    configure(CONFIG)
+
+    app = Dash(__name__, compress=COMPRESS)
+    app.layout = layout.serve_layout()
+
+    # Register app callbacks
+    callbacks.register_callbacks(app)
+
+    server = app.server
+    server.config["SEND_FILE_MAX_AGE_DEFAULT"] = ASSET_MAX_AGE
+
+    # Prometheus metrics (latency histograms + feed counters)
+    @server.route("/metrics")
+    def metrics():
+        counters = dict(
+            ws.WS_STATS,
+            state_version=ws.STATE_VERSION,
+            startup_seconds=STARTUP["total"],
+            ingest_rate=scheduler.LAST_RATE,
+        )
+        counters.update(alerts.STATS)
+
+        labeled = {
+            "panel_import_seconds": [({"panel": k}, v) for k, v in IMPORT_TIMES.items()],
+            "suppressed_ticks": [({"panel": k}, v) for k, v in visibility.SUPPRESSED_TICKS.items()],
+        }
+        for venue, stats in venues.summary().items():
+            if venue == "combined":
+                continue                # sum(...) over the venue label
+            for k, v in stats.items():
+                if k != "last_price":
+                    labeled.setdefault(f"venue_{k}", []).append(({"venue": venue}, v))
+        for panel, stats in profiler.PANEL_BYTES.items():
+            for k, v in stats.items():
+                labeled.setdefault(k, []).append(({"panel": panel}, v))
+
+        return Response(
+            latency.prometheus_text(counters, labeled),
+            mimetype="text/plain; version=0.0.4"
+        )
+
+    # Callback profiler (hidden diagnostics endpoint)
+    profiler.install(server)
+
+    @server.route("/debug/callbacks")
+    def debug_callbacks():
+        return jsonify(profiler.report())
+
+    # Readiness: 200 once the first state snapshot is in.
+    # /ready?wait=5 blocks up to 5 s for it (capped at 30 s).
+    @server.route("/ready")
+    def ready():
+        try:
+            wait = float(request.args.get("wait", 0))
+        except ValueError:
+            wait = float("nan")
+        if not 0 <= wait < float("inf"):
+            return jsonify(error="wait must be a number of seconds"), 400
+        wait = min(wait, 30.0)
+        if ws.STATE_READY.wait(wait):
+            return jsonify(ready=True, state_version=ws.STATE_VERSION)
+        return jsonify(ready=False), 503
+
+    return app
+
+
+# Start ingest: mirror a standalone ingest service (see ingest.py)
+# when INGEST_SOCKET is set, otherwise run the websocket in-process.
+def start_ingest():
+    if INGEST_SOCKET:
+        start_mirror_thread()
+    else:
+        start_ws_thread()
+
 
-# Register app callbacks
-callbacks.register_callbacks(app)
+app = create_app()
+server = app.server
 
-# Start websocket listener
-start_ws_thread()
+STARTUP["total"] = time.perf_counter() - _T0
+print(
+    f"Startup: {STARTUP['total']:.2f} s — panels: "
+    + ", ".join(f"{k} {v * 1000:.0f} ms" for k, v in IMPORT_TIMES.items())
+)
 
 if __name__ == "__main__":
+    # The debug reloader's watcher process never serves requests
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        start_ingest()
     app.run(debug=True)
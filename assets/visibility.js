@@ -0,0 +1,79 @@
+// assets/visibility.js
+//
+// Pauses panel intervals while the tab is hidden (Page Visibility API)
+// or the panel is scrolled off-screen (IntersectionObserver).
+// When a panel becomes visible again it gets one catch-up render.
+// Also reports the panel width so long series can be downsampled to it.
+
+(function () {
+    var onScreen = {};      // "panel2" → bool
+    var hiddenSince = {};   // "panel2" → ms timestamp
+    var suppressed = {};    // "panel2" → ticks skipped since last report
+    var observed = {};
+
+    var observer = ("IntersectionObserver" in window)
+        ? new IntersectionObserver(function (entries) {
+            entries.forEach(function (e) {
+                onScreen[e.target.dataset.visibilityPanel] = e.isIntersecting;
+            });
+        })
+        : null;
+
+    function watch(prefix) {
+        if (observed[prefix] || !observer) return;
+        var el = document.querySelector('[id^="' + prefix + '-"]:not([id$="-interval"])');
+        var panel = el && el.closest(".panel");
+        if (!panel) return;
+        panel.dataset.visibilityPanel = prefix;
+        observer.observe(panel);
+        observed[prefix] = true;
+    }
+
+    function isVisible(prefix) {
+        watch(prefix);
+        return !document.hidden && onScreen[prefix] !== false;
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        visibility: {
+            gate: function (_, disabled, n, id, interval) {
+                var no = window.dash_clientside.no_update;
+                var prefix = id.replace(/-interval$/, "");
+                var now = Date.now();
+
+                if (!isVisible(prefix)) {
+                    if (!disabled) {
+                        hiddenSince[prefix] = now;
+                        return [true, no];
+                    }
+                    return [no, no];
+                }
+
+                if (disabled) {
+                    var skipped = Math.floor((now - (hiddenSince[prefix] || now)) / (interval || 1000));
+                    suppressed[prefix] = (suppressed[prefix] || 0) + skipped;
+                    // re-enable + bump n_intervals = single catch-up render
+                    return [false, (n || 0) + 1];
+                }
+                return [no, no];
+            },
+
+            graphWidth: function (_, current) {
+                // width of one grid column ≈ pixels available to a panel graph
+                var grid = document.getElementById("grid-container");
+                if (!grid) return window.dash_clientside.no_update;
+                var cols = getComputedStyle(grid).gridTemplateColumns.split(" ").length || 1;
+                var width = Math.round(grid.clientWidth / cols);
+                return width === current ? window.dash_clientside.no_update : width;
+            },
+
+            report: function (n) {
+                // flush suppressed-tick counts to the server every ~30 s
+                if (!n || n % 60 !== 0) return window.dash_clientside.no_update;
+                var out = suppressed;
+                suppressed = {};
+                return out;
+            }
+        }
+    });
+})();
@@ -0,0 +1,117 @@
+# bench_ingest.py
+#
+# Receive→apply latency of the ingest loop against a replayed feed,
+# with the default runtime and with INGEST_* tuning (uvloop, pinned
+# cores, raised priority), while request-like threads compete for the GIL.
+#
+#   python bench_ingest.py --rate 2000 --count 20000 --load 4 --cpus 1 --nice -5
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+PORT = 8799
+
+
+def _child(args):
+    # keep benchmark output away from the real log / store
+    tmp = tempfile.mkdtemp(prefix="bench_ingest_")
+    os.environ["TRADE_LOG_DIR"] = os.path.join(tmp, "tradelog")
+    os.environ["TS_STORE_DIR"] = os.path.join(tmp, "store")
+
+    import numpy as np
+    import data.ws_client as ws
+    from data import latency
+
+    samples = []
+    observe_trade = latency.observe_trade
+
+    def record(exchange_ts, recv_ts, apply_ts):
+        samples.append(apply_ts - recv_ts)
+        observe_trade(exchange_ts, recv_ts, apply_ts)
+
+    latency.observe_trade = record
+    ws.WS_URL = args.url
+
+    # request-like threads: CPU bursts with short pauses
+    def load():
+        while True:
+            sum(i * i for i in range(20000))
+            time.sleep(0.002)
+
+    for _ in range(args.load):
+        threading.Thread(target=load, daemon=True).start()
+
+    ws.start_ws_thread()
+    deadline = time.time() + args.count / args.rate + 30
+    while len(samples) < args.count and time.time() < deadline:
+        time.sleep(0.1)
+
+    ms = np.array(samples) * 1000
+    print(json.dumps({
+        "trades": len(ms),
+        "p50_ms": float(np.percentile(ms, 50)) if len(ms) else None,
+        "p99_ms": float(np.percentile(ms, 99)) if len(ms) else None,
+        "max_ms": float(ms.max()) if len(ms) else None,
+        "dropped_display": ws.WS_STATS["dropped_display"],
+    }))
+    sys.stdout.flush()
+    os._exit(0)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rate", type=float, default=2000)
+    parser.add_argument("--count", type=int, default=20000)
+    parser.add_argument("--load", type=int, default=4, help="request-like busy threads")
+    parser.add_argument("--cpus", default="", help="INGEST_CPUS for the tuned run")
+    parser.add_argument("--nice", default="", help="INGEST_NICE for the tuned run")
+    parser.add_argument("--child", action="store_true")
+    parser.add_argument("--url", default=f"ws://127.0.0.1:{PORT}")
+    args = parser.parse_args()
+
+    if args.child:
+        return _child(args)
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    replay = subprocess.Popen(
+        [sys.executable, "-m", "data.replay", "--port", str(PORT),
+         "--rate", str(args.rate), "--count", str(args.count)],
+        cwd=here, stdout=subprocess.PIPE, text=True
+    )
+    print(replay.stdout.readline().strip())
+
+    runs = {
+        "default": {"INGEST_UVLOOP": "0", "INGEST_CPUS": "", "INGEST_NICE": ""},
+        "tuned": {"INGEST_UVLOOP": "auto", "INGEST_CPUS": args.cpus, "INGEST_NICE": args.nice},
+    }
+
+    try:
+        for name, env in runs.items():
+            out = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--child",
+                 "--rate", str(args.rate), "--count", str(args.count),
+                 "--load", str(args.load), "--url", args.url],
+                cwd=here, env=dict(os.environ, **env), capture_output=True, text=True
+            )
+            lines = [l for l in out.stdout.splitlines() if l.startswith("{")]
+            if not lines:
+                print(f"{name}: failed\n{out.stdout}{out.stderr}")
+                continue
+            result = json.loads(lines[-1])
+            runtime_line = next((l for l in out.stdout.splitlines() if l.startswith("Ingest runtime")), "")
+            print(
+                f"{name:8s} trades={result['trades']:6d}  "
+                f"p50={result['p50_ms']:.3f} ms  p99={result['p99_ms']:.3f} ms  "
+                f"max={result['max_ms']:.1f} ms   ({runtime_line})"
+            )
+    finally:
+        replay.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,27 @@
-from panels import panel_2, panel_3, panel_4, panel_5, panel_6, panel_7, panel_8, panel_9
-
-def register_callbacks(app):
-    panel_2.register_callbacks(app)
-    panel_3.register_callbacks(app)
-    panel_4.register_callbacks(app)
-    panel_5.register_callbacks(app)
-    panel_6.register_callbacks(app)
-    panel_7.register_callbacks(app)
-    panel_8.register_callbacks(app)
-    panel_9.register_callbacks(app)
\ No newline at end of file
+from config import CONFIG
+from panels.registry import get_panels
+from profiler import ProfiledApp
+import visibility
+import scheduler
+import toasts
+
+def register_callbacks(app, panels=None):
+    # every panel callback is timed (see profiler.py)
+    app = ProfiledApp(app)
+    names = panels or CONFIG["panels"]
+    live = []
+
+    for name, panel in zip(names, get_panels(names)):
+        # static panels (panel 1) have no callbacks
+        if hasattr(panel, "register_callbacks"):
+            panel.register_callbacks(app)
+            live.append(name)
+
+    # pause intervals of hidden / off-screen panels
+    visibility.register_callbacks(app, live)
+
+    # refresh periods follow market activity
+    scheduler.register_callbacks(app, live)
+
+    # ingest-time alerts (data/alerts.py) as toasts
+    toasts.register_callbacks(app)
@@ -0,0 +1,47 @@
+# config.py
+import json
+import os
+
+# Which panels (and which symbol) this dashboard instance runs
+CONFIG_PATH = os.environ.get(
+    "DASHBOARD_CONFIG",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "dashboard.json")
+)
+
+DEFAULTS = {
+    "symbol": "PF_SOLUSD",
+    "panels": [
+        "panel_1", "panel_2", "panel_3",
+        "panel_4", "panel_5", "panel_6",
+        "panel_7", "panel_8", "panel_9",
+        "panel_10", "panel_11", "panel_12",
+    ],
+}
+
+
+def load_config(path=None):
+    """Defaults overlaid with the JSON config file, if there is one."""
+    config = dict(DEFAULTS)
+    path = path or CONFIG_PATH
+    if os.path.exists(path):
+        with open(path) as f:
+            config.update(json.load(f))
+    return config
+
+
+CONFIG = load_config()
+
+
+def configure(config=None):
+    """
+    Hand the config to the ingest-side modules. Shared by app.py and
+    ingest.py so both entry points wire the same settings.
+    """
+    import data.ws_client as ws
+    from data import alerts, sessions
+
+    config = config or CONFIG
+    ws.PRODUCT = config["symbol"]
+    alerts.RULES = config.get("alerts", alerts.RULES)
+    sessions.SESSIONS = config.get("sessions", sessions.SESSIONS)
+    ws.VENUES = config.get("venues", [])
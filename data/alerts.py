@@ -0,0 +1,376 @@
+# data/alerts.py
+import json
+import os
+import queue
+import threading
+import urllib.request
+from bisect import bisect_left, bisect_right
+from collections import deque
+
+import numpy as np
+
+
+# ============================================================
+# ALERT ENGINE (evaluated on the ingest stream)
+# ============================================================
+# Rules are grouped by kind and kept in flat arrays, so evaluation does
+# not depend on anyone having the dashboard open:
+#
+#   level        per trade : bisect of the sorted levels between the
+#                            previous and current price
+#   imbalance    per trade : bisect of sorted ratio thresholds on the
+#                            bucket that just traded
+#   divergence   per second: price vs CVD slope over each window
+#                            (panel 4 plots the same per-second series)
+#   volume_spike per second: short vs long EWMA of volume/sec
+#
+# Nothing is allocated per trade unless an alert fires. Alerts are
+# deduped (state change / re-arm + per-rule cooldown), rate-limited per
+# symbol and handed to every sink in SINKS.
+
+DEFAULT_RULES = [
+    {"type": "divergence", "window": 20},
+    {"type": "divergence", "window": 60},
+    {"type": "volume_spike", "ratio": 3.0, "short": 5, "long": 300},
+    {"type": "imbalance", "ratio": 4.0, "min_volume": 50.0},
+]
+RULES = DEFAULT_RULES          # replaced from the dashboard config
+
+COOLDOWN = 60.0                # seconds between two alerts of one rule
+RATE_PER_MINUTE = 30           # per symbol, token bucket
+BURST = 10
+HISTORY_SECONDS = 600          # longest divergence window
+SERIES_SECONDS = 3 * 3600      # per-second price / CVD kept for panel 4
+REARM = 0.8                    # spike re-arms below ratio * REARM
+
+STATS = {"alerts_fired": 0, "alerts_rate_limited": 0, "alerts_sink_errors": 0}
+
+lock = threading.Lock()
+RECENT = deque(maxlen=100)     # UI sink: newest last
+DIVERGENCE = {}                # symbol → (window, "bullish" | "bearish" | None) of the first rule
+SERIES = {}                    # symbol → (ts, price, cvd), mirrored from the ingest process
+
+_next_id = 0
+
+
+# ============================================================
+# SINKS
+# ============================================================
+
+def log_sink(alert):
+    print(f"ALERT [{alert['symbol']}] {alert['message']}")
+
+
+def ui_sink(alert):
+    RECENT.append(alert)
+
+
+class WebhookSink:
+    """POST each alert as JSON, from a background thread (never blocks ingest)."""
+
+    def __init__(self, url, timeout=2.0):
+        self.url = url
+        self.timeout = timeout
+        self.queue = queue.Queue(maxsize=1000)
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def __call__(self, alert):
+        try:
+            self.queue.put_nowait(alert)
+        except queue.Full:
+            STATS["alerts_sink_errors"] += 1
+
+    def _run(self):
+        while True:
+            alert = self.queue.get()
+            req = urllib.request.Request(
+                self.url, data=json.dumps(alert).encode(),
+                headers={"Content-Type": "application/json"}
+            )
+            try:
+                urllib.request.urlopen(req, timeout=self.timeout).close()
+            except Exception as e:
+                STATS["alerts_sink_errors"] += 1
+                print("Alert webhook error:", e)
+
+
+SINKS = [log_sink, ui_sink]
+if os.environ.get("ALERT_WEBHOOK"):
+    SINKS.append(WebhookSink(os.environ["ALERT_WEBHOOK"]))
+
+
+def add_sink(sink):
+    SINKS.append(sink)
+
+
+# ============================================================
+# ENGINE
+# ============================================================
+
+class AlertEngine:
+
+    def __init__(self, symbol, rules):
+        self.symbol = symbol
+        by_type = {}
+        for i, rule in enumerate(rules):
+            by_type.setdefault(rule["type"], []).append((i, rule))
+
+        # ---- level crosses (sorted) ----
+        levels = sorted((r["price"], i) for i, r in by_type.get("level", []))
+        self.levels = [p for p, _ in levels]
+        self.level_rules = [i for _, i in levels]
+
+        # ---- bucket imbalance (sorted by ratio) ----
+        imb = sorted((r["ratio"], r.get("min_volume", 0.0), i) for i, r in by_type.get("imbalance", []))
+        self.imb_ratio = [r for r, _, _ in imb]
+        self.imb_min = [m for _, m, _ in imb]
+        self.imb_rules = [i for _, _, i in imb]
+        self.imb_bucket = [None] * len(imb)          # dedupe: last bucket alerted
+
+        # ---- divergence ----
+        div = by_type.get("divergence", [])
+        self.div_windows = np.array([min(r["window"], HISTORY_SECONDS) for _, r in div], dtype=np.int64)
+        self.div_rules = [i for i, _ in div]
+        self.div_state = np.zeros(len(div), dtype=np.int8)
+
+        # ---- volume spikes (EWMA of volume/sec) ----
+        spk = by_type.get("volume_spike", [])
+        self.spk_ratio = np.array([r["ratio"] for _, r in spk])
+        self.spk_a_short = np.array([2.0 / (r.get("short", 5) + 1) for _, r in spk])
+        self.spk_a_long = np.array([2.0 / (r.get("long", 300) + 1) for _, r in spk])
+        self.spk_warmup = np.array([r.get("long", 300) for _, r in spk])
+        self.spk_short = np.zeros(len(spk))
+        self.spk_long = np.zeros(len(spk))
+        self.spk_armed = np.ones(len(spk), dtype=bool)
+        self.spk_rules = [i for i, _ in spk]
+
+        self.rules = rules
+        self.last_fired = np.full(len(rules), -np.inf)
+
+        # per-second history for divergence (and panel 4)
+        self.price_hist = np.zeros(max(HISTORY_SECONDS, SERIES_SECONDS) + 1)
+        self.cvd_hist = np.zeros_like(self.price_hist)
+        self.seconds = 0
+        self.sec = None
+        self.sec_volume = 0.0
+
+        self.prev_price = None
+        self.last_price = 0.0
+        self.last_cvd = 0.0
+
+        self.tokens = float(BURST)
+        self.token_ts = 0.0
+
+    # ---------------- delivery ----------------
+
+    def _fire(self, rule_idx, ts, kind, message, severity="info"):
+        global _next_id
+        if ts - self.last_fired[rule_idx] < COOLDOWN:
+            return
+        self.last_fired[rule_idx] = ts
+
+        # token bucket
+        self.tokens = min(BURST, self.tokens + (ts - self.token_ts) * RATE_PER_MINUTE / 60.0)
+        self.token_ts = ts
+        if self.tokens < 1:
+            STATS["alerts_rate_limited"] += 1
+            return
+        self.tokens -= 1
+
+        _next_id += 1
+        alert = {
+            "id": _next_id,
+            "time": ts,
+            "symbol": self.symbol,
+            "rule": rule_idx,
+            "kind": kind,
+            "severity": severity,
+            "message": message,
+        }
+        STATS["alerts_fired"] += 1
+        for sink in SINKS:
+            try:
+                sink(alert)
+            except Exception as e:
+                STATS["alerts_sink_errors"] += 1
+                print("Alert sink error:", e)
+
+    # ---------------- per trade ----------------
+
+    def on_trade(self, ts, price, qty, side, cvd, bucket, bucket_buy, bucket_sell):
+        sec = int(ts)
+        if self.sec is None:
+            self.sec = sec
+        elif sec > self.sec:
+            self._on_seconds(sec, ts)
+
+        self.sec_volume += qty
+        self.last_price = price
+        self.last_cvd = cvd
+
+        # level crosses: levels in (prev, price] going up, [price, prev) going down
+        prev = self.prev_price
+        self.prev_price = price
+        if self.levels and prev is not None and price != prev:
+            if price > prev:
+                lo, hi = bisect_right(self.levels, prev), bisect_right(self.levels, price)
+            else:
+                lo, hi = bisect_left(self.levels, price), bisect_left(self.levels, prev)
+            for k in range(lo, hi):
+                direction = "above" if price > prev else "below"
+                self._fire(self.level_rules[k], ts, "level",
+                           f"Price crossed {direction} {self.levels[k]:.2f} ({price:.2f})")
+
+        # imbalance on the bucket that just traded
+        if self.imb_ratio:
+            small = min(bucket_buy, bucket_sell)
+            big = max(bucket_buy, bucket_sell)
+            ratio = big / small if small > 0 else float("inf")
+            crossed = range(bisect_right(self.imb_ratio, ratio))
+            if small == 0:
+                # one-sided bucket: every ratio is "crossed". Count it once,
+                # on the strictest rule its volume qualifies for, instead of
+                # walking all rules on every trade
+                k = next((k for k in reversed(crossed) if big >= self.imb_min[k]), None)
+                crossed = () if k is None else (k,)
+            for k in crossed:
+                if big + small < self.imb_min[k] or self.imb_bucket[k] == bucket:
+                    continue
+                self.imb_bucket[k] = bucket
+                who = "Buy" if bucket_buy > bucket_sell else "Sell"
+                self._fire(self.imb_rules[k], ts, "imbalance",
+                           f"{who} imbalance at {bucket:.2f}: {min(ratio, 999):.1f}x "
+                           f"({bucket_buy:.1f} / {bucket_sell:.1f})")
+
+    # ---------------- per second ----------------
+
+    def _on_seconds(self, sec, ts):
+        n = len(self.price_hist)
+        elapsed = sec - self.sec
+
+        # carry the last values over the seconds that had no trades
+        for s in range(self.sec + 1, min(sec, self.sec + n) + 1):
+            self.price_hist[s % n] = self.last_price
+            self.cvd_hist[s % n] = self.last_cvd
+        self.seconds += elapsed
+
+        # volume/sec EWMAs (the quiet seconds count as zero volume)
+        if len(self.spk_ratio):
+            vol = self.sec_volume
+            for _ in range(min(elapsed, 600)):
+                self.spk_short += self.spk_a_short * (vol - self.spk_short)
+                self.spk_long += self.spk_a_long * (vol - self.spk_long)
+                vol = 0.0
+            ratio = np.divide(self.spk_short, self.spk_long,
+                              out=np.zeros_like(self.spk_short), where=self.spk_long > 0)
+            # the long average needs its own window before it means anything
+            hot = self.spk_armed & (ratio >= self.spk_ratio) & (self.seconds >= self.spk_warmup)
+            for k in np.flatnonzero(hot):
+                self.spk_armed[k] = False
+                self._fire(self.spk_rules[k], ts, "volume_spike",
+                           f"Volume spike: {self.spk_short[k]:.1f}/s vs {self.spk_long[k]:.1f}/s "
+                           f"({ratio[k]:.1f}x)", "warning")
+            self.spk_armed |= ratio < self.spk_ratio * REARM
+
+        self.sec_volume = 0.0
+        self.sec = sec
+
+        # divergence: price and CVD moving in opposite directions
+        if len(self.div_windows):
+            ready = self.div_windows < self.seconds
+            past = (sec - self.div_windows) % n
+            price_slope = self.price_hist[sec % n] - self.price_hist[past]
+            cvd_slope = self.cvd_hist[sec % n] - self.cvd_hist[past]
+            state = np.where(
+                ready & (price_slope < 0) & (cvd_slope > 0), 1,
+                np.where(ready & (price_slope > 0) & (cvd_slope < 0), -1, 0)
+            ).astype(np.int8)
+
+            for k in np.flatnonzero((state != self.div_state) & (state != 0)):
+                kind = "Bullish" if state[k] > 0 else "Bearish"
+                self._fire(self.div_rules[k], ts, "divergence",
+                           f"{kind} divergence over {self.div_windows[k]} s", "warning")
+            self.div_state = state
+
+            first = int(state[0])
+            DIVERGENCE[self.symbol] = (
+                int(self.div_windows[0]),
+                "bullish" if first > 0 else "bearish" if first < 0 else None,
+            )
+
+
+    def series(self):
+        """(second ts, price, CVD) oldest first, as used by the divergence rules."""
+        if self.sec is None:
+            return np.empty(0), np.empty(0), np.empty(0)
+        n = len(self.price_hist)
+        ts = np.arange(self.sec - min(self.seconds, n - 1) + 1, self.sec + 1)
+        return ts.astype(float), self.price_hist[ts % n], self.cvd_hist[ts % n]
+
+
+# ============================================================
+# MODULE API
+# ============================================================
+
+ENGINES = {}        # symbol → AlertEngine
+
+
+def configure(symbol, rules=None):
+    with lock:
+        ENGINES[symbol] = AlertEngine(symbol, rules if rules is not None else RULES)
+
+
+def on_trade(symbol, ts, price, qty, side, cvd, bucket, bucket_buy, bucket_sell):
+    """Called by ws_client for every applied trade."""
+    engine = ENGINES.get(symbol)
+    if engine is None:
+        configure(symbol)
+        engine = ENGINES[symbol]
+    with lock:
+        engine.on_trade(ts, price, qty, side, cvd, bucket, bucket_buy, bucket_sell)
+
+
+def divergence(symbol):
+    """(window seconds, "bullish" | "bearish" | None) for the first divergence rule."""
+    return DIVERGENCE.get(symbol, (None, None))
+
+
+def series(symbol):
+    """Per-second (ts, price, CVD) the divergence rules evaluate (panel 4)."""
+    with lock:
+        engine = ENGINES.get(symbol)
+        if engine is not None:
+            return engine.series()
+        return SERIES.get(symbol, (np.empty(0), np.empty(0), np.empty(0)))
+
+
+def recent(after=None, limit=5):
+    """Newest `limit` UI alerts with id > after, oldest first."""
+    alerts = [a for a in list(RECENT) if after is None or a["id"] > after]
+    return alerts[-limit:]
+
+
+def latest_id():
+    return RECENT[-1]["id"] if RECENT else 0
+
+
+# ============================================================
+# SNAPSHOT (ingest process → Dash workers)
+# ============================================================
+
+def snapshot():
+    with lock:
+        series = {symbol: engine.series() for symbol, engine in ENGINES.items()}
+        return list(RECENT), dict(DIVERGENCE), dict(STATS), series
+
+
+def restore(state):
+    recent_alerts, div, stats, series = state
+    with lock:
+        SERIES.clear()
+        SERIES.update(series)
+        RECENT.clear()
+        RECENT.extend(recent_alerts)
+        DIVERGENCE.clear()
+        DIVERGENCE.update(div)
+        STATS.update(stats)
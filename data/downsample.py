@@ -0,0 +1,99 @@
+# data/downsample.py
+import numpy as np
+
+
+# ============================================================
+# POINT BUDGET
+# ============================================================
+# ~1 point per horizontal pixel is all Plotly can show anyway.
+
+DEFAULT_WIDTH = 600
+MIN_POINTS = 100
+MAX_POINTS = 4000
+
+
+def point_budget(width_px=None):
+    """Number of points to send for a graph `width_px` pixels wide."""
+    if not width_px:
+        width_px = DEFAULT_WIDTH
+    return int(min(MAX_POINTS, max(MIN_POINTS, width_px)))
+
+
+# ============================================================
+# LTTB — Largest-Triangle-Three-Buckets (keeps the visual shape)
+# ============================================================
+
+def lttb(x, y, n_out):
+    """
+    Downsample (x, y) to n_out points. First and last points are kept;
+    each bucket in between contributes the point forming the largest
+    triangle with the previous pick and the next bucket's mean.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+
+    if n_out >= n or n_out < 3:
+        return x, y
+
+    # n_out - 2 buckets over the interior points
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    sizes = np.diff(edges)
+    mean_x = np.add.reduceat(x[:n - 1], edges[:-1]) / sizes
+    mean_y = np.add.reduceat(y[:n - 1], edges[:-1]) / sizes
+
+    idx = np.empty(n_out, dtype=int)
+    idx[0] = 0
+    idx[-1] = n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+
+        if i + 1 < len(mean_x):
+            nx, ny = mean_x[i + 1], mean_y[i + 1]
+        else:
+            nx, ny = x[-1], y[-1]
+
+        area = np.abs(
+            (x[a] - nx) * (y[lo:hi] - y[a])
+            - (x[a] - x[lo:hi]) * (ny - y[a])
+        )
+        a = lo + int(area.argmax())
+        idx[i + 1] = a
+
+    return x[idx], y[idx]
+
+
+# ============================================================
+# MIN/MAX PER BUCKET (never drops a spike)
+# ============================================================
+
+def minmax(x, y, n_out):
+    """
+    Keep the min and max of each of n_out // 2 buckets, in original
+    order. Fully vectorized; NaNs are ignored, and a bucket that is all
+    NaN keeps one NaN point so the line still shows the gap.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+
+    if n_out >= n or n_out < 4:
+        return x, y
+
+    # bucket sizes differ by at most one and none is empty (n > n_buckets)
+    n_buckets = n_out // 2
+    edges = np.linspace(0, n, n_buckets + 1).astype(int)
+    starts = edges[:-1]
+    sizes = np.diff(edges)
+
+    cols = np.arange(sizes.max())
+    rows = y[np.minimum(starts[:, None] + cols, n - 1)]
+    missing = (cols >= sizes[:, None]) | np.isnan(rows)
+
+    lo = starts + np.where(missing, np.inf, rows).argmin(axis=1)
+    hi = starts + np.where(missing, -np.inf, rows).argmax(axis=1)
+
+    idx = np.unique(np.concatenate((lo, hi, [0, n - 1])))
+    return x[idx], y[idx]
@@ -0,0 +1,19 @@
+# data/encoding.py
+import base64
+
+import numpy as np
+
+
+# ============================================================
+# TYPED ARRAYS FOR PLOTLY
+# ============================================================
+# Plotly figures already serialize numpy arrays as base64 typed arrays
+# ({"dtype": "f4", "bdata": ...}); Patch() assignments do not, so
+# partial updates wrap their arrays with typed_array().
+
+def typed_array(values, dtype="f4"):
+    arr = np.ascontiguousarray(values, dtype=dtype)
+    return {
+        "dtype": arr.dtype.str.lstrip("<>|="),
+        "bdata": base64.b64encode(arr.tobytes()).decode("ascii"),
+    }
@@ -0,0 +1,117 @@
+# data/latency.py
+import time
+from bisect import bisect_left
+
+
+# ============================================================
+# LATENCY HISTOGRAMS
+# ============================================================
+# Stages:
+#   exchange_to_ingest   : exchange trade time  → socket receive
+#   ingest_to_aggregate  : socket receive       → aggregates updated
+#   aggregate_to_render  : aggregates updated   → panel callback rendering it
+#
+# Observing is one bisect + two adds, cheap enough for the ingest path.
+
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+           0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)   # last slot = +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds):
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+
+HISTOGRAMS = {}        # (stage, panel or None) → Histogram
+
+# Last state version rendered by each panel
+RENDER_VERSION = {}
+
+
+def observe(stage, seconds, panel=None):
+    h = HISTOGRAMS.get((stage, panel))
+    if h is None:
+        h = HISTOGRAMS[(stage, panel)] = Histogram()
+    h.observe(max(seconds, 0.0))
+
+
+def observe_trade(exchange_ts, recv_ts, apply_ts):
+    """Called by ws_client once a live trade has been applied."""
+    if exchange_ts is not None:
+        observe("exchange_to_ingest", recv_ts - exchange_ts)
+    observe("ingest_to_aggregate", apply_ts - recv_ts)
+
+
+def mark_render(panel, version, apply_ts):
+    """
+    Tag a panel render with the state version it used.
+    Aggregate→render latency is only recorded the first time a panel
+    sees a new version, so quiet markets do not inflate it.
+    """
+    if version != RENDER_VERSION.get(panel):
+        RENDER_VERSION[panel] = version
+        if apply_ts is not None:
+            observe("aggregate_to_render", time.time() - apply_ts, panel)
+    return version
+
+
+# ============================================================
+# PROMETHEUS TEXT FORMAT
+# ============================================================
+
+def _labels(**labels):
+    parts = [f'{k}="{v}"' for k, v in labels.items() if v is not None]
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def prometheus_text(counters=None, labeled=None):
+    """
+    Render all histograms (plus optional {name: value} counters and
+    {name: [(labels dict, value)]} labeled gauges) in Prometheus text
+    exposition format.
+    """
+    lines = [
+        "# HELP futures_dash_latency_seconds Pipeline stage latency.",
+        "# TYPE futures_dash_latency_seconds histogram",
+    ]
+
+    for (stage, panel), h in sorted(HISTOGRAMS.items(), key=lambda kv: (kv[0][0], kv[0][1] or "")):
+        cumulative = 0
+        for bound, n in zip(BUCKETS + ("+Inf",), h.counts):
+            cumulative += n
+            lines.append(
+                "futures_dash_latency_seconds_bucket"
+                f"{_labels(stage=stage, panel=panel, le=bound)} {cumulative}"
+            )
+        lines.append(f"futures_dash_latency_seconds_sum{_labels(stage=stage, panel=panel)} {h.sum}")
+        lines.append(f"futures_dash_latency_seconds_count{_labels(stage=stage, panel=panel)} {h.count}")
+
+    lines.append("# TYPE futures_dash_render_state_version gauge")
+    for panel, version in sorted(RENDER_VERSION.items()):
+        lines.append(f"futures_dash_render_state_version{_labels(panel=panel)} {version}")
+
+    for name, value in (counters or {}).items():
+        if value is None:
+            continue
+        lines.append(f"# TYPE futures_dash_{name} gauge")
+        lines.append(f"futures_dash_{name} {value}")
+
+    # one metric per name; panels / venues are labels, not name suffixes
+    for name, samples in (labeled or {}).items():
+        samples = [(labels, value) for labels, value in samples if value is not None]
+        if not samples:
+            continue
+        lines.append(f"# TYPE futures_dash_{name} gauge")
+        for labels, value in samples:
+            lines.append(f"futures_dash_{name}{_labels(**labels)} {value}")
+
+    return "\n".join(lines) + "\n"
@@ -1,59 +1,157 @@
 # data/metrics_engine.py
-import time
+from datetime import datetime
 from threading import Lock
 
-# Stores 24 hourly buckets
-metrics = {}
+import numpy as np
+
+
+# ============================================================
+# HOURLY ENGINE (panels 2, 8, 9)
+# ============================================================
+# One row per hour, fed by every trade. Only the open hour changes;
+# when it closes, the last KEEP_HOURS closed rows are frozen into a
+# ready-to-plot payload (arrays, labels, arrows) that is reused until
+# the next hour closes. Panels then only convert the open hour.
+
+KEEP_HOURS = 24
+
+FIELDS = [
+    "open", "high", "low", "close",
+    "buy_vol", "sell_vol", "buy_cost", "sell_cost",
+    "buy_count", "sell_count",
+]
+
 lock = Lock()
 
+_open_hour = None
+_open_row = None
+_closed = {}          # hour_ts → row (no longer written, except late trades)
+_frozen = None        # build_payload(_closed)
+
 
 def _hour(ts):
     """Round unix timestamp to hour."""
     return int(ts // 3600 * 3600)
 
 
+def _new_row(price):
+    row = dict.fromkeys(FIELDS, 0.0)
+    row["open"] = row["high"] = row["low"] = row["close"] = price
+    return row
+
+
+def _fold(row, price, volume, side):
+    row["close"] = price
+    if price > row["high"]:
+        row["high"] = price
+    if price < row["low"]:
+        row["low"] = price
+
+    if side == "buy":
+        row["buy_vol"] += volume
+        row["buy_cost"] += price * volume
+        row["buy_count"] += 1
+    else:
+        row["sell_vol"] += volume
+        row["sell_cost"] += price * volume
+        row["sell_count"] += 1
+
+
+def _freeze():
+    """Rebuild the closed-hours payload (once per hour)."""
+    global _frozen
+    for h in sorted(_closed)[:-KEEP_HOURS]:
+        del _closed[h]
+    _frozen = build_payload(_closed)
+
+
 def add_trade(price, volume, side, ts):
     """Called for each trade from ws_client."""
+    global _open_hour, _open_row
+
     hour = _hour(ts)
 
     with lock:
-        if hour not in metrics:
-            metrics[hour] = {
-                "buy_volume": 0.0,
-                "sell_volume": 0.0,
-                "buy_cost": 0.0,
-                "sell_cost": 0.0,
-                "buy_count": 0,
-                "sell_count": 0,
-                "trade_count": 0
-            }
-
-        m = metrics[hour]
-
-        # update metrics
-        if side == "buy":
-            m["buy_volume"] += volume
-            m["buy_cost"] += price * volume
-            m["buy_count"] += 1
-        else:
-            m["sell_volume"] += volume
-            m["sell_cost"] += price * volume
-            m["sell_count"] += 1
-
-        m["trade_count"] += 1
-
-        cleanup_old()
-
-
-def cleanup_old():
-    """Keep last 24 hours only."""
-    cutoff = time.time() - 24 * 3600
-    old = [h for h in metrics if h < cutoff]
-    for h in old:
-        del metrics[h]
-
-
-def get_hourly_metrics():
-    """Returns {hour_timestamp: metrics} sorted by hour."""
+        if _open_hour is None or hour > _open_hour:
+            if _open_row is not None:
+                _closed[_open_hour] = _open_row
+                _freeze()
+            _open_hour, _open_row = hour, _new_row(price)
+
+        if hour == _open_hour:
+            _fold(_open_row, price, volume, side)
+        elif hour in _closed:
+            # late trade for an already closed hour
+            _fold(_closed[hour], price, volume, side)
+            _freeze()
+
+
+# ============================================================
+# PAYLOADS
+# ============================================================
+
+def _arrow(o, c):
+    if c > o:
+        return "↑"
+    if c < o:
+        return "↓"
+    return "→"
+
+
+def build_payload(rows):
+    """
+    {hour_ts: row} → column arrays sorted by hour, plus the per-hour
+    labels / datetimes / direction arrows the panels plot. Missing
+    fields (e.g. cost in store-backed days) come out as zeros.
+    """
+    hours = sorted(rows)[-KEEP_HOURS:]
+    payload = {"hours": np.array(hours, dtype=np.int64)}
+    for f in FIELDS:
+        payload[f] = np.array([rows[h].get(f, 0.0) for h in hours], dtype=float)
+
+    times = [datetime.fromtimestamp(h) for h in hours]
+    payload["times"] = times
+    payload["labels"] = [t.strftime("%H:%M") for t in times]
+    payload["arrows"] = [_arrow(rows[h]["open"], rows[h]["close"]) for h in hours]
+    return payload
+
+
+def _concat(a, b):
+    out = {}
+    for k in a:
+        merged = np.concatenate((a[k], b[k])) if isinstance(a[k], np.ndarray) else a[k] + b[k]
+        out[k] = merged[-KEEP_HOURS:]
+    return out
+
+
+def hourly_payload():
+    """Last KEEP_HOURS hours (closed + open) as a payload."""
+    with lock:
+        frozen = _frozen if _frozen is not None else build_payload({})
+        if _open_row is None:
+            return frozen
+        current = build_payload({_open_hour: dict(_open_row)})
+    return _concat(frozen, current)
+
+
+# ============================================================
+# SNAPSHOT (ingest process → Dash workers)
+# ============================================================
+
+def snapshot():
+    with lock:
+        return {
+            "open_hour": _open_hour,
+            "open_row": dict(_open_row) if _open_row else None,
+            "closed": {h: dict(r) for h, r in _closed.items()},
+            "frozen": _frozen,
+        }
+
+
+def restore(state):
+    global _open_hour, _open_row, _closed, _frozen
     with lock:
-        return dict(sorted(metrics.items()))
+        _open_hour = state["open_hour"]
+        _open_row = state["open_row"]
+        _closed = state["closed"]
+        _frozen = state["frozen"]
@@ -0,0 +1,304 @@
+# data/orderflow.py
+import copy
+import threading
+from collections import deque
+
+import numpy as np
+
+
+# ============================================================
+# ORDER-FLOW ANALYTICS OVER PRICE BUCKETS (panel 3 overlays)
+# ============================================================
+# Mirrors ws_client.PRICE_BUCKETS in dense arrays indexed by bucket
+# number (price / BUCKET_SIZE), updated per trade:
+#
+#   point of control   volume only grows, so one compare per trade
+#   value area (70%)   bounds kept between reads; each read only widens
+#                      or trims the edges (regrown when the POC moves), so
+#                      it always holds the POC and >= 70% of the volume
+#   imbalances         diagonal buy[i] vs sell[i-1] / sell[i] vs buy[i+1];
+#                      a trade can only flip the flags next to its bucket
+#   absorption         rolling window with running sums: volume well above
+#                      its baseline while the net displacement (from
+#                      ws_client's PRICE_DISPLACEMENT deltas) stays inside
+#                      one bucket
+#
+# Stacked-imbalance runs are a vectorized pass over the flag arrays,
+# cached per update count.
+
+BUCKET_SIZE = 0.5
+VALUE_AREA = 0.70
+IMBALANCE_RATIO = 3.0          # diagonal buy/sell ratio for one level
+IMBALANCE_MIN = 1.0            # ignore levels thinner than this
+STACK_MIN = 3                  # consecutive imbalanced levels = a stack
+
+ABSORB_SECONDS = 30            # rolling window
+ABSORB_MULT = 2.0              # window volume vs its baseline
+ABSORB_WARMUP = 60             # baseline samples (seconds) before firing
+ABSORB_BASELINE = 600          # baseline EWMA span (seconds)
+ABSORB_KEEP = 900              # events shown for this long (seconds)
+
+lock = threading.Lock()
+
+
+class BucketProfile:
+
+    def __init__(self, bucket_size=BUCKET_SIZE, capacity=256, imbalances=True):
+        self.bucket_size = bucket_size
+        self.imbalances = imbalances          # off for plain volume profiles
+        self.base = None                      # bucket number of index 0
+        self.buy = np.zeros(capacity)
+        self.sell = np.zeros(capacity)
+        self.buy_imb = np.zeros(capacity, dtype=bool)
+        self.sell_imb = np.zeros(capacity, dtype=bool)
+        self.lo = 0                           # used index range
+        self.hi = -1
+        self.total = 0.0
+        self.updates = 0
+
+        self.poc = None                       # index
+        self.va_lo = self.va_hi = None        # indices
+        self.va_poc = None                    # POC the range was grown from
+        self.va_covered = 0.0
+
+        self._stacks = None
+        self._stacks_at = -1
+
+    # ---------------- storage ----------------
+
+    def _index(self, bucket):
+        n = int(round(bucket / self.bucket_size))
+        if self.base is None:
+            self.base = n - len(self.buy) // 2
+        i = n - self.base
+        if i < 0 or i >= len(self.buy):
+            i = self._grow(i)
+        return i
+
+    def _grow(self, i):
+        size = len(self.buy)
+        new_size = size * 2
+        while not (-(new_size - size) <= i < new_size):
+            new_size *= 2
+        shift = (new_size - size) if i < 0 else 0
+
+        for name in ("buy", "sell", "buy_imb", "sell_imb"):
+            old = getattr(self, name)
+            arr = np.zeros(new_size, dtype=old.dtype)
+            arr[shift:shift + size] = old
+            setattr(self, name, arr)
+
+        self.base -= shift
+        self.lo += shift
+        self.hi += shift
+        if self.poc is not None:
+            self.poc += shift
+        if self.va_lo is not None:
+            self.va_lo += shift
+            self.va_hi += shift
+            self.va_poc += shift
+        return i + shift
+
+    def price(self, i):
+        return float((self.base + i) * self.bucket_size)
+
+    def copy(self):
+        new = copy.copy(self)
+        for name in ("buy", "sell", "buy_imb", "sell_imb"):
+            setattr(new, name, getattr(self, name).copy())
+        return new
+
+    # ---------------- per trade ----------------
+
+    def add(self, bucket, qty, side):
+        i = self._index(bucket)
+        if side == "buy":
+            self.buy[i] += qty
+        else:
+            self.sell[i] += qty
+        self.total += qty
+        self.updates += 1
+
+        if self.hi < self.lo:
+            self.lo = self.hi = i
+        else:
+            self.lo = min(self.lo, i)
+            self.hi = max(self.hi, i)
+
+        # point of control
+        vol = self.buy[i] + self.sell[i]
+        if self.poc is None or vol > self.buy[self.poc] + self.sell[self.poc]:
+            self.poc = i
+
+        if self.va_lo is not None and self.va_lo <= i <= self.va_hi:
+            self.va_covered += qty
+
+        # only the flags around i depend on this bucket
+        if not self.imbalances:
+            return
+        for j in (i - 1, i, i + 1):
+            if 0 < j < len(self.buy) - 1:
+                self._flag(j)
+
+    def _flag(self, j):
+        buy, sell = self.buy, self.sell
+        self.buy_imb[j] = buy[j] >= IMBALANCE_MIN and buy[j] >= IMBALANCE_RATIO * sell[j - 1]
+        self.sell_imb[j] = sell[j] >= IMBALANCE_MIN and sell[j] >= IMBALANCE_RATIO * buy[j + 1]
+
+    # ---------------- reads ----------------
+
+    def value_area(self):
+        """(low price, high price, POC price) or None."""
+        if self.poc is None or self.total <= 0:
+            return None
+        vol = self.buy + self.sell
+
+        # POC moved: grow the range again from it
+        if self.va_poc != self.poc:
+            self.va_lo = self.va_hi = self.va_poc = self.poc
+            self.va_covered = float(vol[self.poc])
+
+        target = VALUE_AREA * self.total
+        lo, hi, covered = self.va_lo, self.va_hi, self.va_covered
+
+        # widen towards the heavier neighbour
+        while covered < target and (lo > self.lo or hi < self.hi):
+            down = vol[lo - 1] if lo > self.lo else -1.0
+            up = vol[hi + 1] if hi < self.hi else -1.0
+            if up >= down:
+                hi += 1
+                covered += up
+            else:
+                lo -= 1
+                covered += down
+
+        # trim the lighter edge while the rest still covers the target
+        while lo < hi:
+            edge = lo if vol[lo] <= vol[hi] else hi
+            if edge == self.poc or covered - vol[edge] < target:
+                break
+            covered -= vol[edge]
+            if edge == lo:
+                lo += 1
+            else:
+                hi -= 1
+
+        self.va_lo, self.va_hi, self.va_covered = lo, hi, covered
+        return self.price(lo), self.price(hi), self.price(self.poc)
+
+    def stacked_imbalances(self):
+        """[(side, low price, high price, levels)] for runs of STACK_MIN+ imbalanced levels."""
+        if self._stacks_at == self.updates:
+            return self._stacks
+
+        stacks = []
+        for side, flags in (("buy", self.buy_imb), ("sell", self.sell_imb)):
+            f = flags[self.lo:self.hi + 1].astype(np.int8)
+            edges = np.diff(np.concatenate(([0], f, [0])))
+            starts = np.flatnonzero(edges == 1)
+            ends = np.flatnonzero(edges == -1)
+            for s, e in zip(starts, ends):
+                if e - s >= STACK_MIN:
+                    stacks.append((side, self.price(self.lo + s), self.price(self.lo + e - 1), int(e - s)))
+
+        self._stacks, self._stacks_at = stacks, self.updates
+        return stacks
+
+
+class Absorption:
+    """High volume with little price displacement over a rolling window."""
+
+    def __init__(self):
+        self.window = deque()                 # (ts, qty, signed qty, Δprice)
+        self.volume = 0.0
+        self.delta = 0.0
+        self.displacement = 0.0
+        self.baseline = 0.0
+        self.samples = 0
+        self.sec = None
+        self.last_bucket = None
+        self.last_ts = 0.0
+        self.events = deque(maxlen=50)        # (ts, bucket, side, volume, delta)
+
+    def copy(self):
+        new = copy.copy(self)
+        new.window = deque(self.window)
+        new.events = deque(self.events, maxlen=self.events.maxlen)
+        return new
+
+    def add(self, ts, bucket, qty, side, dp):
+        signed = qty if side == "buy" else -qty
+        self.window.append((ts, qty, signed, dp))
+        self.volume += qty
+        self.delta += signed
+        self.displacement += dp
+
+        cutoff = ts - ABSORB_SECONDS
+        while self.window and self.window[0][0] < cutoff:
+            _, q, s, d = self.window.popleft()
+            self.volume -= q
+            self.delta -= s
+            self.displacement -= d
+
+        sec = int(ts)
+        if sec == self.sec:
+            return
+        self.sec = sec
+
+        # once a second: compare with the baseline, then update it
+        if (
+            self.samples >= ABSORB_WARMUP
+            and self.volume >= ABSORB_MULT * self.baseline
+            and abs(self.displacement) <= BUCKET_SIZE
+            and not (bucket == self.last_bucket and ts - self.last_ts < ABSORB_SECONDS)
+        ):
+            # sellers hitting a level that holds = bids absorbing, and vice versa
+            side = "bid" if self.delta < 0 else "ask"
+            self.events.append((ts, bucket, side, self.volume, self.delta))
+            self.last_bucket, self.last_ts = bucket, ts
+
+        alpha = 2.0 / (ABSORB_BASELINE + 1)
+        self.baseline += alpha * (self.volume - self.baseline) if self.samples else self.volume
+        self.samples += 1
+
+
+PROFILE = BucketProfile()
+ABSORPTION = Absorption()
+
+
+def add_trade(ts, bucket, qty, side, dp=None):
+    """
+    Called from ws_client._update_price_bucket. The profile takes every
+    venue's volume; absorption needs the Δprice of one price series, so
+    only primary-venue trades pass dp.
+    """
+    with lock:
+        PROFILE.add(bucket, qty, side)
+        if dp is not None:
+            ABSORPTION.add(ts, bucket, qty, side, dp)
+
+
+def overlays(now):
+    """Everything panel 3 draws on top of the bars."""
+    with lock:
+        return {
+            "value_area": PROFILE.value_area(),
+            "stacks": PROFILE.stacked_imbalances(),
+            "absorption": [e for e in ABSORPTION.events if now - e[0] <= ABSORB_KEEP],
+        }
+
+
+# ============================================================
+# SNAPSHOT (ingest process → Dash workers)
+# ============================================================
+
+def snapshot():
+    # copied under the lock: ingest keeps updating them
+    with lock:
+        return PROFILE.copy(), ABSORPTION.copy()
+
+
+def restore(state):
+    global PROFILE, ABSORPTION
+    with lock:
+        PROFILE, ABSORPTION = state
@@ -0,0 +1,188 @@
+# data/replay.py
+#
+# Local websocket stand-in for a venue feed (Kraken futures by default),
+# for benchmarks and adapter checks:
+#
+#   python -m data.replay --port 8765 --rate 2000 --count 20000 [--from-log]
+#   python -m data.replay --venue binance_futures --product SOLUSDT
+#
+# Every client gets `count` trade messages in the venue's own format
+# (data/venues.py fixture()) once it has sent its subscriptions, paced
+# at `rate` per second (Kraken: plus a ticker every --ticker-every
+# trades), stamped with the current time so latency stages are
+# meaningful.
+#
+# --rebuild instead re-aggregates the on-disk trade log in-process as
+# fast as possible, on a simulated clock driven by the exchange
+# timestamps (backtests, benchmarks, rebuilding frozen sessions):
+#
+#   python -m data.replay --rebuild [--day 2026-10-18]
+import argparse
+import asyncio
+import json
+import random
+import time
+from datetime import datetime, timezone
+
+import websockets
+
+from data import clock
+from data import trade_log
+from data import venues
+
+TICK = 0.01          # pacing granularity (seconds)
+
+
+def synthetic(count, price=100.0):
+    """Random-walk (price, qty, side) tuples."""
+    out = []
+    for _ in range(count):
+        price = max(0.01, price + random.choice((-0.05, 0.0, 0.05)))
+        out.append((round(price, 2), round(random.lognormvariate(0, 1.2), 3),
+                    "buy" if random.random() < 0.5 else "sell"))
+    return out
+
+
+def from_log(count):
+    """The newest `count` primary-venue trades of the on-disk trade log."""
+    recs = trade_log.tail(count)
+    recs = recs[recs["venue"] == venues.VENUE_IDS[venues.PRIMARY]]
+    return [
+        (float(r["price"]), float(r["qty"]), "buy" if r["side"] > 0 else "sell")
+        for r in recs
+    ]
+
+
+def rebuild(start_ts=0.0, end_ts=float("inf"), directory=None):
+    """
+    Feed recorded trades through the normal aggregation path with the
+    clock following their timestamps. Returns (trades, seconds taken,
+    seconds of market time).
+    Run it in its own process: it must not re-append to a live log.
+    The Parquet store is left alone (it already holds the live data).
+    """
+    import data.ws_client as ws
+    from data import alerts, sessions, ts_store, velocity
+
+    if trade_log.WRITER is not None:
+        raise RuntimeError("rebuild would re-append to the open trade log")
+
+    previous = clock.use(clock.SimClock(start_ts))
+    # alerts still fire (counted, kept for the UI), but nothing is sent out
+    sinks = alerts.SINKS[:]
+    alerts.SINKS[:] = [alerts.ui_sink]
+    recording, ts_store.RECORDING = ts_store.RECORDING, False
+
+    n = 0
+    first_ts = None
+    last_second = None
+    t0 = time.perf_counter()
+    try:
+        for recs in trade_log.iter_range(start_ts, end_ts, directory):
+            # plain Python scalars: one tolist() per segment, not per field
+            for ts, price, qty, seq, side, venue in zip(
+                recs["ts"].tolist(), recs["price"].tolist(), recs["qty"].tolist(),
+                recs["seq"].tolist(), recs["side"].tolist(), recs["venue"].tolist()
+            ):
+                if first_ts is None:
+                    first_ts = ts
+                clock.advance(ts)
+                ws._ingest(price, qty, "buy" if side > 0 else "sell", ts, seq, venues.VENUE_NAMES[venue])
+                second = int(ts)
+                if second != last_second:
+                    velocity.sample(ts)
+                    last_second = second
+                n += 1
+        market = clock.now() - first_ts if n else 0.0
+    finally:
+        clock.use(previous)
+        alerts.SINKS[:] = sinks
+        ts_store.RECORDING = recording
+        sessions.wait_writes()
+    return n, time.perf_counter() - t0, market
+
+
+async def _client(ws, trades, rate, product, ticker_every, adapter):
+    # wait for the subscriptions, like the real feed
+    expected = len(adapter.subscribe(product))
+    if expected:
+        async for _ in ws:
+            expected -= 1
+            if not expected:
+                break
+
+    per_tick = max(1, int(rate * TICK))
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+
+    kraken = adapter.name == venues.KrakenFutures.name
+    for i, (price, qty, side) in enumerate(trades):
+        await ws.send(adapter.fixture(
+            venues.Trade(adapter.name, product, time.time(), price, qty, side, i, None), i
+        ))
+        if kraken and ticker_every and i % ticker_every == 0:
+            await ws.send(json.dumps({
+                "feed": "ticker",
+                "product_id": product,
+                "time": int(time.time() * 1000),
+                "markPrice": price,
+                "index": price,
+                "last": price,
+            }))
+
+        if (i + 1) % per_tick == 0:
+            # pace against the schedule, not the previous send
+            delay = start + (i + 1) / rate - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+    await ws.wait_closed()
+
+
+async def serve(host="127.0.0.1", port=8765, rate=1000, trades=None,
+                product="PF_SOLUSD", ticker_every=10, venue=venues.KrakenFutures.name):
+    trades = trades or synthetic(20000)
+    adapter = venues.ADAPTERS[venue]
+
+    async def handler(ws):
+        await _client(ws, trades, rate, product, ticker_every, adapter)
+
+    async with websockets.serve(handler, host, port):
+        print(f"Replay: {len(trades)} {venue} trades at {rate}/s on ws://{host}:{port}", flush=True)
+        await asyncio.Future()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--rate", type=float, default=1000)
+    parser.add_argument("--count", type=int, default=20000)
+    parser.add_argument("--product", default="PF_SOLUSD")
+    parser.add_argument("--ticker-every", type=int, default=10)
+    parser.add_argument("--venue", default=venues.KrakenFutures.name, choices=list(venues.ADAPTERS))
+    parser.add_argument("--from-log", action="store_true", help="replay the on-disk trade log")
+    parser.add_argument("--rebuild", action="store_true", help="re-aggregate the trade log in-process")
+    parser.add_argument("--day", help="UTC day to rebuild (YYYY-MM-DD, default: whole log)")
+    args = parser.parse_args()
+
+    if args.rebuild:
+        from config import configure
+        configure()             # product / venues / sessions / alert rules
+        start, end = 0.0, float("inf")
+        if args.day:
+            start = datetime.strptime(args.day, "%Y-%m-%d").replace(tzinfo=timezone.utc).timestamp()
+            end = start + 86400
+        n, took, market = rebuild(start, end)
+
+        import data.ws_client as ws
+        from data import alerts, sessions
+        print(f"Rebuilt {n} trades ({market / 3600:.1f} h of market time) in {took:.2f} s "
+              f"({n / max(took, 1e-9):,.0f} trades/s, {market / max(took, 1e-9):,.0f}x real time)")
+        print(f"CVD {ws.CVD:,.2f}  buckets {len(ws.PRICE_BUCKETS)}  "
+              f"alerts {alerts.STATS['alerts_fired']}  open sessions {sorted(sessions.OPEN)}")
+        raise SystemExit
+
+    trades = from_log(args.count) if args.from_log else synthetic(args.count)
+    asyncio.run(serve(args.host, args.port, args.rate, trades, args.product,
+                      args.ticker_every, args.venue))
@@ -0,0 +1,72 @@
+# data/runtime.py
+import asyncio
+import os
+import threading
+
+# uvloop is optional: without it the stock asyncio loop is used
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+
+# ============================================================
+# INGEST RUNTIME OPTIONS
+# ============================================================
+#   INGEST_UVLOOP=auto|1|0   use uvloop when installed (default auto)
+#   INGEST_CPUS=2,3          pin the ingest thread to these cores
+#   INGEST_NICE=-5           ingest thread niceness (< 0 needs CAP_SYS_NICE)
+#
+# Affinity and niceness are per-thread on Linux, so only the ingest
+# thread is moved; Flask request threads keep the remaining cores.
+
+UVLOOP = os.environ.get("INGEST_UVLOOP", "auto")
+CPUS = os.environ.get("INGEST_CPUS", "")
+NICE = os.environ.get("INGEST_NICE", "")
+
+
+def new_event_loop():
+    if uvloop is not None and UVLOOP != "0":
+        return uvloop.new_event_loop()
+    if UVLOOP == "1":
+        print("Ingest runtime: uvloop requested but not installed, using asyncio")
+    return asyncio.new_event_loop()
+
+
+def _parse_cpus(spec):
+    cpus = set()
+    for part in spec.split(","):
+        part = part.strip()
+        if "-" in part:
+            lo, hi = part.split("-")
+            cpus.update(range(int(lo), int(hi) + 1))
+        elif part:
+            cpus.add(int(part))
+    return cpus
+
+
+def tune_current_thread():
+    """Apply INGEST_CPUS / INGEST_NICE to the calling thread; returns a summary."""
+    applied = []
+    tid = threading.get_native_id()
+
+    if CPUS and hasattr(os, "sched_setaffinity"):
+        cpus = _parse_cpus(CPUS) & os.sched_getaffinity(0)
+        if cpus:
+            os.sched_setaffinity(tid, cpus)
+            applied.append(f"cpus={sorted(cpus)}")
+        else:
+            print(f"Ingest runtime: none of INGEST_CPUS={CPUS} are available")
+
+    if NICE and hasattr(os, "setpriority"):
+        try:
+            os.setpriority(os.PRIO_PROCESS, tid, int(NICE))
+            applied.append(f"nice={NICE}")
+        except PermissionError:
+            print(f"Ingest runtime: no permission for INGEST_NICE={NICE}")
+
+    return applied
+
+
+def describe(loop):
+    return "uvloop" if uvloop is not None and isinstance(loop, uvloop.Loop) else "asyncio"
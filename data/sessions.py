@@ -0,0 +1,410 @@
+# data/sessions.py
+import copy
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+import numpy as np
+
+from data import clock
+from data import trade_log
+from data import venues
+from data.orderflow import BucketProfile, BUCKET_SIZE
+
+
+# ============================================================
+# SESSION VOLUME PROFILES
+# ============================================================
+# One profile + stats per trading session, keyed by exchange trade time
+# (UTC). Session windows are "HH:MM"–"HH:MM" in UTC; an end before the
+# start wraps over midnight. Sessions may overlap (a trade at 14:00 UTC
+# counts for "utc_day", "eu" and "us").
+#
+# When a session ends it is frozen to
+#
+#   {SESSION_DIR}/{name}/{YYYY-MM-DD}.npz
+#
+# (bucket volumes over the traded range, stats, cumulative volume per
+# minute) from a background thread. Frozen sessions are only read when a
+# comparison asks for them, and kept in a small cache.
+#
+# Sessions already running at startup are caught up from the trade log
+# (catch_up, before the feed connects). The venue's first trade
+# snapshot re-sends trades that are already in the log; add_trade skips
+# those by (ts, price, qty, seq).
+
+SESSION_DIR = os.environ.get("SESSION_DIR", os.path.join(os.getcwd(), "sessions"))
+
+DEFAULT_SESSIONS = [
+    {"name": "utc_day", "start": "00:00", "end": "24:00"},
+    {"name": "asia", "start": "00:00", "end": "08:00"},
+    {"name": "eu", "start": "07:00", "end": "16:00"},
+    {"name": "us", "start": "13:30", "end": "20:00"},
+]
+SESSIONS = DEFAULT_SESSIONS        # replaced from the dashboard config ("sessions")
+
+STATS = ["open", "high", "low", "close", "buy_vol", "sell_vol", "trades",
+         "notional", "poc", "va_low", "va_high"]
+S = {name: i for i, name in enumerate(STATS)}
+
+CACHE_SIZE = 64
+CATCH_UP_OVERLAP = 600     # seconds of caught-up records kept for de-dup
+
+lock = threading.Lock()
+
+
+def _minutes(hhmm):
+    h, m = hhmm.split(":")
+    return int(h) * 60 + int(m)
+
+
+def window(defn, ts):
+    """(start, end) of the session occurrence containing ts, or the next one."""
+    start_min, end_min = _minutes(defn["start"]), _minutes(defn["end"])
+    length = (end_min - start_min) % 1440 or 1440
+    day = int(ts // 86400) * 86400
+    # the occurrence that started yesterday may still be running
+    for start in (day - 86400 + start_min * 60, day + start_min * 60, day + 86400 + start_min * 60):
+        if ts < start + length * 60:
+            return start, start + length * 60
+    return None
+
+
+class Session:
+
+    def __init__(self, name, start, end):
+        self.name = name
+        self.start = start
+        self.end = end
+        self.profile = BucketProfile(imbalances=False)
+        self.stats = np.zeros(len(STATS))
+        self.stats[S["high"]] = -np.inf
+        self.stats[S["low"]] = np.inf
+        self.by_minute = np.zeros((end - start) // 60 + 1)
+        self.last_ts = start
+
+    @property
+    def label(self):
+        return datetime.fromtimestamp(self.start, tz=timezone.utc).strftime("%Y-%m-%d")
+
+    def add(self, ts, price, bucket, qty, side):
+        st = self.stats
+        if not st[S["trades"]]:
+            st[S["open"]] = price
+        st[S["close"]] = price
+        self.last_ts = ts
+        if price > st[S["high"]]:
+            st[S["high"]] = price
+        if price < st[S["low"]]:
+            st[S["low"]] = price
+        st[S["buy_vol" if side == "buy" else "sell_vol"]] += qty
+        st[S["trades"]] += 1
+        st[S["notional"]] += price * qty
+        self.by_minute[int(ts - self.start) // 60] += qty
+        self.profile.add(bucket, qty, side)
+
+    def fold(self, recs):
+        """Add trade-log records in bulk (vectorized; used after a restart)."""
+        if not len(recs):
+            return
+        st, p = self.stats, self.profile
+        ts, price, qty = recs["ts"], recs["price"], recs["qty"]
+        buy = recs["side"] > 0
+
+        if not st[S["trades"]]:
+            st[S["open"]] = price[0]
+        st[S["close"]] = price[-1]
+        st[S["high"]] = max(st[S["high"]], price.max())
+        st[S["low"]] = min(st[S["low"]], price.min())
+        st[S["buy_vol"]] += qty[buy].sum()
+        st[S["sell_vol"]] += qty[~buy].sum()
+        st[S["trades"]] += len(recs)
+        st[S["notional"]] += (price * qty).sum()
+        np.add.at(self.by_minute, ((ts - self.start) // 60).astype(int), qty)
+        self.last_ts = max(self.last_ts, float(ts.max()))
+
+        buckets = np.round(price / p.bucket_size)
+        p._index(buckets.min() * p.bucket_size)
+        p._index(buckets.max() * p.bucket_size)     # grow once for the whole range
+        idx = buckets.astype(int) - p.base
+        np.add.at(p.buy, idx[buy], qty[buy])
+        np.add.at(p.sell, idx[~buy], qty[~buy])
+        p.total += float(qty.sum())
+        p.updates += len(recs)
+        p.lo = min(p.lo, int(idx.min())) if p.hi >= p.lo else int(idx.min())
+        p.hi = max(p.hi, int(idx.max()))
+        p.poc = int(np.argmax(p.buy + p.sell))
+
+    def copy(self):
+        new = copy.copy(self)
+        new.stats = self.stats.copy()
+        new.by_minute = self.by_minute.copy()
+        new.profile = self.profile.copy()
+        return new
+
+    def summary(self):
+        st = self.stats
+        volume = st[S["buy_vol"]] + st[S["sell_vol"]]
+        va = self.profile.value_area()
+        out = {
+            "name": self.name, "label": self.label, "start": self.start, "end": self.end,
+            "volume": float(volume),
+            "delta": float(st[S["buy_vol"]] - st[S["sell_vol"]]),
+            "trades": int(st[S["trades"]]),
+            "vwap": float(st[S["notional"]] / volume) if volume else None,
+        }
+        for k in ("open", "high", "low", "close"):
+            out[k] = float(st[S[k]]) if st[S["trades"]] else None
+        out["va_low"], out["va_high"], out["poc"] = va if va else (None, None, None)
+        return out
+
+    def levels(self):
+        """(bucket prices, volume) over the traded range."""
+        p = self.profile
+        if p.hi < p.lo:
+            return np.empty(0), np.empty(0)
+        prices = (p.base + np.arange(p.lo, p.hi + 1)) * p.bucket_size
+        return prices, p.buy[p.lo:p.hi + 1] + p.sell[p.lo:p.hi + 1]
+
+
+# ============================================================
+# FREEZE / LAZY LOAD
+# ============================================================
+
+def _path(name, label):
+    return os.path.join(SESSION_DIR, name, f"{label}.npz")
+
+
+def _freeze(session):
+    summary = session.summary()
+    stats = session.stats.copy()
+    stats[S["poc"]], stats[S["va_low"]], stats[S["va_high"]] = (
+        summary["poc"], summary["va_low"], summary["va_high"]
+    ) if summary["poc"] is not None else (np.nan, np.nan, np.nan)
+    prices, volume = session.levels()
+    path = _path(session.name, session.label)
+
+    def write():
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + ".tmp.npz"
+        np.savez_compressed(
+            tmp, start=session.start, end=session.end, stats=stats,
+            prices=prices, volume=volume, by_minute=session.by_minute
+        )
+        os.replace(tmp, path)
+        print(f"Session frozen: {session.name} {session.label} ({summary['trades']} trades)")
+
+    thread = threading.Thread(target=write, daemon=True)
+    thread.start()
+    _writers.append(thread)
+
+
+_writers = []
+
+
+def wait_writes():
+    """Block until every frozen session is on disk (replay / shutdown)."""
+    while _writers:
+        _writers.pop().join()
+
+
+_cache = OrderedDict()      # path → loaded dict
+
+
+def load(name, label):
+    """A frozen session as a dict of arrays (cached), or None."""
+    path = _path(name, label)
+    with lock:
+        if path in _cache:
+            _cache.move_to_end(path)
+            return _cache[path]
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as f:
+        data = {k: f[k] for k in f.files}
+    with lock:
+        _cache[path] = data
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return data
+
+
+def frozen_labels(name):
+    """Dates of the frozen sessions of one definition, oldest first."""
+    directory = os.path.join(SESSION_DIR, name)
+    if not os.path.isdir(directory):
+        return []
+    return sorted(f[:-4] for f in os.listdir(directory) if f.endswith(".npz") and ".tmp" not in f)
+
+
+def _frozen_summary(name, label, data):
+    st = data["stats"]
+    volume = st[S["buy_vol"]] + st[S["sell_vol"]]
+    value = lambda k: None if np.isnan(st[S[k]]) else float(st[S[k]])
+    return {
+        "name": name, "label": label, "start": float(data["start"]), "end": float(data["end"]),
+        "volume": float(volume), "delta": float(st[S["buy_vol"]] - st[S["sell_vol"]]),
+        "trades": int(st[S["trades"]]),
+        "vwap": float(st[S["notional"]] / volume) if volume else None,
+        "open": float(st[S["open"]]), "high": float(st[S["high"]]),
+        "low": float(st[S["low"]]), "close": float(st[S["close"]]),
+        "poc": value("poc"), "va_low": value("va_low"), "va_high": value("va_high"),
+    }
+
+
+# ============================================================
+# MANAGER
+# ============================================================
+
+OPEN = {}           # name → Session currently running
+_next_start = {}    # name → start of the next occurrence (while none is running)
+
+_folded_until = None    # newest trade-log ts folded in by catch_up
+_folded = set()         # (ts, price, qty, seq) of the last CATCH_UP_OVERLAP s of it
+
+
+def catch_up(now=None):
+    """
+    Fold the trade log into the sessions running at startup. Called once
+    by ws_client.start_ws_thread before the feed connects, so the bulk
+    read stays off the ingest path.
+    """
+    global _folded_until
+    now = clock.now() if now is None else now
+    running = {}
+    for defn in SESSIONS:
+        w = window(defn, now)
+        if w and w[0] <= now:
+            running[defn["name"]] = w
+    if not running:
+        return
+
+    recs = trade_log.read_range(min(start for start, _ in running.values()), float("inf"))
+    recs = recs[recs["venue"] == venues.VENUE_IDS[venues.PRIMARY]]      # sessions follow the main feed
+    ts = recs["ts"]         # log order: not strictly sorted across reconnects
+    with lock:
+        for name, (start, end) in running.items():
+            OPEN[name] = Session(name, start, end)
+            OPEN[name].fold(recs[(ts >= start) & (ts < end)])
+        if len(recs):
+            _folded_until = float(ts.max())
+            tail = recs[ts >= _folded_until - CATCH_UP_OVERLAP]
+            _folded.update(zip(tail["ts"].tolist(), tail["price"].tolist(),
+                               tail["qty"].tolist(), tail["seq"].tolist()))
+    print(f"Sessions: caught up {len(recs)} logged trades into {', '.join(running)}")
+
+
+def add_trade(ts, price, bucket, qty, side, seq=-1):
+    """Called by ws_client for every trade (exchange time)."""
+    with lock:
+        # already folded in from the trade log (replayed snapshot)
+        if _folded_until is not None and ts <= _folded_until:
+            if ts < _folded_until - CATCH_UP_OVERLAP or (ts, price, qty, seq) in _folded:
+                return
+
+        for defn in SESSIONS:
+            name = defn["name"]
+            s = OPEN.get(name)
+            if s is None or ts >= s.end:
+                if s is not None:
+                    _freeze(s)
+                    del OPEN[name]
+                elif ts < _next_start.get(name, 0):
+                    continue                  # between occurrences
+                w = window(defn, ts)
+                if ts < w[0]:
+                    _next_start[name] = w[0]
+                    continue
+                s = OPEN[name] = Session(name, *w)
+            elif ts < s.start:
+                continue                      # late trade from before this session
+            s.add(ts, price, bucket, qty, side)
+
+
+def names():
+    return [d["name"] for d in SESSIONS]
+
+
+def compare(name, n=5):
+    """
+    Current session of `name` against the N previous frozen ones:
+    {"current": summary, "previous": [summaries], "relative_volume",
+     "prices", "volume", "avg_volume"} — the last three aligned on one
+    price axis (bucket prices).
+    """
+    with lock:
+        s = OPEN.get(name)
+        current = s.summary() if s else None
+        cur_prices, cur_volume = s.levels() if s else (np.empty(0), np.empty(0))
+        elapsed_min = int((s.last_ts - s.start) // 60) if s else None
+
+    labels = [l for l in frozen_labels(name) if not current or l != current["label"]]
+    previous, profiles, cumulative = [], [], []
+    for label in labels[-n:]:
+        data = load(name, label)
+        if data is None:
+            continue
+        previous.append(_frozen_summary(name, label, data))
+        profiles.append((data["prices"], data["volume"]))
+        if elapsed_min is not None:
+            cumulative.append(data["by_minute"][:elapsed_min + 1].sum())
+
+    # no running session (e.g. outside its hours): the last frozen one is "current"
+    if current is None and previous:
+        current = previous.pop()
+        cur_prices, cur_volume = profiles.pop()
+
+    # one price axis for today and the average of the previous sessions
+    all_prices = [p for p, _ in profiles] + [cur_prices]
+    if any(len(p) for p in all_prices):
+        bucket = BUCKET_SIZE
+        lo = min(p.min() for p in all_prices if len(p))
+        hi = max(p.max() for p in all_prices if len(p))
+        prices = np.arange(round(lo / bucket), round(hi / bucket) + 1) * bucket
+        index = lambda p: np.rint((p - lo) / bucket).astype(int)
+        volume = np.zeros(len(prices))
+        volume[index(cur_prices)] = cur_volume
+        avg = np.zeros(len(prices))
+        for p, v in profiles:
+            avg[index(p)] += v
+        if profiles:
+            avg /= len(profiles)
+    else:
+        prices = volume = avg = np.empty(0)
+
+    relative = None
+    if current and cumulative and np.mean(cumulative) > 0 and s is not None:
+        relative = current["volume"] / float(np.mean(cumulative))
+
+    return {
+        "current": current,
+        "previous": previous,
+        "relative_volume": relative,
+        "prices": prices,
+        "volume": volume,
+        "avg_volume": avg,
+    }
+
+
+def freeze_all():
+    """Write every running session (shutdown / tests); they keep running."""
+    with lock:
+        for s in OPEN.values():
+            _freeze(s)
+
+
+# ============================================================
+# SNAPSHOT (ingest process → Dash workers)
+# ============================================================
+
+def snapshot():
+    # copied under the lock: ingest keeps adding to the running sessions
+    with lock:
+        return {name: s.copy() for name, s in OPEN.items()}
+
+
+def restore(state):
+    with lock:
+        OPEN.clear()
+        OPEN.update(state)
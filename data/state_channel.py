@@ -0,0 +1,123 @@
+# data/state_channel.py
+import os
+import stat
+import threading
+import time
+from multiprocessing.connection import Client, Listener
+
+import data.ws_client as ws
+from data import ticker
+
+
+# ============================================================
+# LOCAL SNAPSHOT CHANNEL (ingest process ⇄ Dash workers)
+# ============================================================
+# Protocol: the worker sends the state version it already has;
+# the ingest side answers with b"" (unchanged) or a pickled snapshot.
+#
+# Workers unpickle what they receive, so the peer must be trusted:
+# both ends authenticate with the INGEST_AUTHKEY secret (required, no
+# default), and the socket lives in a directory only this user can
+# enter (created 0700, refused if anyone else could reach it).
+
+INGEST_SOCKET = os.environ.get("INGEST_SOCKET")          # unset → in-process ingest
+POLL_INTERVAL = float(os.environ.get("INGEST_POLL", "0.25"))
+
+
+def _authkey():
+    key = os.environ.get("INGEST_AUTHKEY")
+    if not key:
+        raise RuntimeError("INGEST_AUTHKEY must be set (a shared secret) to use INGEST_SOCKET")
+    return key.encode()
+
+
+def _private_dir(address):
+    """Create / check the socket's directory: ours, and no group/other access."""
+    directory = os.path.dirname(os.path.abspath(address))
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    st = os.stat(directory)
+    if st.st_uid != os.getuid() or stat.S_IMODE(st.st_mode) & 0o077:
+        raise RuntimeError(f"{directory} must be owned by this user with mode 0700")
+
+
+# ------------------------------------------------------------
+# SERVER (runs in the ingest process)
+# ------------------------------------------------------------
+_cache = {"version": None, "blob": None}
+_cache_lock = threading.Lock()
+
+
+def _version():
+    # trades and ticker messages are versioned separately
+    return ws.STATE_VERSION, ticker.VERSION
+
+
+def _current_blob():
+    """Serialize at most once per state version, whatever the worker count."""
+    with _cache_lock:
+        version = _version()
+        if _cache["version"] != version or _cache["blob"] is None:
+            _cache["version"] = version
+            _cache["blob"] = ws.snapshot_state()
+        return _cache["version"], _cache["blob"]
+
+
+def _serve_conn(conn):
+    with conn:
+        try:
+            while True:
+                have = conn.recv()
+                version, blob = _current_blob()
+                conn.send_bytes(b"" if have == version else blob)
+        except (EOFError, OSError):
+            pass
+
+
+def serve_snapshots(address=None):
+    """Blocking accept loop, one thread per connected worker."""
+    address = address or INGEST_SOCKET
+    if not address:
+        raise RuntimeError("INGEST_SOCKET is not set")
+    authkey = _authkey()
+    _private_dir(address)
+
+    if os.path.exists(address):
+        os.unlink(address)
+
+    with Listener(address, family="AF_UNIX", authkey=authkey) as listener:
+        print(f"Ingest: serving snapshots on {address}")
+        while True:
+            try:
+                conn = listener.accept()
+            except Exception as e:
+                print("Ingest: accept failed:", e)
+                continue
+            threading.Thread(target=_serve_conn, args=(conn,), daemon=True).start()
+
+
+# ------------------------------------------------------------
+# CLIENT (runs in every Dash worker)
+# ------------------------------------------------------------
+
+def _mirror_loop(address, authkey):
+    while True:
+        try:
+            _private_dir(address)
+            with Client(address, family="AF_UNIX", authkey=authkey) as conn:
+                print(f"Mirror: connected to ingest at {address}")
+                while True:
+                    conn.send(_version() if ws.STATE_READY.is_set() else None)
+                    blob = conn.recv_bytes()
+                    if blob:
+                        ws.apply_snapshot(blob)
+                    time.sleep(POLL_INTERVAL)
+        except Exception as e:
+            print("Mirror: ingest unavailable:", e)
+            time.sleep(2)
+
+
+def start_mirror_thread(address=None):
+    address = address or INGEST_SOCKET
+    # fail at startup, not in the background thread
+    thread = threading.Thread(target=_mirror_loop, args=(address, _authkey()), daemon=True)
+    thread.start()
@@ -0,0 +1,77 @@
+# data/tape.py
+import os
+import threading
+from collections import deque
+
+
+# ============================================================
+# AGGREGATED TAPE (panel 5)
+# ============================================================
+# A sweep arrives as dozens of fills with the same exchange timestamp,
+# side and price. Consecutive same-side fills within MERGE_SECONDS and
+# MERGE_PRICE of the previous fill are folded into one print carrying
+# the summed quantity, fill count, VWAP and price range.
+
+MERGE_SECONDS = float(os.environ.get("TAPE_MERGE_SECONDS", "0.05"))
+MERGE_PRICE = float(os.environ.get("TAPE_MERGE_PRICE", "0.0"))     # 0 → same price only
+MAX_PRINTS = 500
+
+lock = threading.Lock()
+PRINTS = deque(maxlen=MAX_PRINTS)
+
+
+def add_trade(ts, price, qty, side):
+    """Called by ws_client per trade (exchange timestamp)."""
+    with lock:
+        last = PRINTS[-1] if PRINTS else None
+        if (
+            last is not None
+            and last["side"] == side
+            and ts - last["time"] <= MERGE_SECONDS
+            and abs(price - last["last_price"]) <= MERGE_PRICE
+        ):
+            last["volume"] += qty
+            last["notional"] += price * qty
+            last["count"] += 1
+            last["price"] = last["notional"] / last["volume"] if last["volume"] else price
+            last["last_price"] = price
+            last["low"] = min(last["low"], price)
+            last["high"] = max(last["high"], price)
+            last["time"] = ts
+            return
+
+        PRINTS.append({
+            "time": ts,
+            "first_time": ts,
+            "price": price,          # VWAP once merged
+            "last_price": price,
+            "low": price,
+            "high": price,
+            "volume": qty,
+            "notional": price * qty,
+            "count": 1,
+            "side": side,
+        })
+
+
+def latest(n=20):
+    """Newest-first copies of the last n aggregated prints."""
+    with lock:
+        prints = [dict(p) for p in list(PRINTS)[-n:]]
+    prints.reverse()
+    return prints
+
+
+# ============================================================
+# SNAPSHOT (ingest process → Dash workers)
+# ============================================================
+
+def snapshot():
+    with lock:
+        return [dict(p) for p in PRINTS]
+
+
+def restore(prints):
+    with lock:
+        PRINTS.clear()
+        PRINTS.extend(prints)
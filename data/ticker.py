@@ -0,0 +1,135 @@
+# data/ticker.py
+import threading
+
+import numpy as np
+
+
+# ============================================================
+# TICKER ENGINE (funding, mark/index basis, open interest)
+# ============================================================
+# Each ticker message (already normalized to FIELDS names by its venue
+# adapter, see data/venues.py) is reduced to a few floats written into a
+# fixed ring of RESOLUTION-second rows (last value in the slot wins). CVD
+# is sampled into the same row so OI and CVD share one time axis.
+
+RESOLUTION = 5                  # seconds per row
+CAPACITY = 6 * 3600 // RESOLUTION
+
+FIELDS = [
+    "mark", "index", "last", "bid", "ask",
+    "funding_rate", "open_interest", "basis", "cvd",
+]
+COL = {name: i for i, name in enumerate(FIELDS)}
+
+class TickerRing:
+
+    def __init__(self):
+        self.ts = np.zeros(CAPACITY, dtype=np.int64)
+        self.rows = np.full((CAPACITY, len(FIELDS)), np.nan)
+        self.count = 0
+        self.slot = None
+        self.latest = {}
+
+    def update(self, fields, ts, cvd=None):
+        slot = int(ts // RESOLUTION)
+        if slot != self.slot:
+            # new row, carrying the previous values forward
+            prev = self.rows[(self.count - 1) % CAPACITY] if self.count else None
+            i = self.count % CAPACITY
+            self.rows[i] = prev if prev is not None else np.nan
+            self.ts[i] = slot * RESOLUTION
+            self.count += 1
+            self.slot = slot
+        row = self.rows[(self.count - 1) % CAPACITY]
+
+        for field, value in fields.items():
+            row[COL[field]] = value
+            self.latest[field] = value
+        row[COL["basis"]] = row[COL["mark"]] - row[COL["index"]]
+        if cvd is not None:
+            row[COL["cvd"]] = cvd
+
+        self.latest["basis"] = float(row[COL["basis"]])
+        self.latest["time"] = ts
+
+    def series(self):
+        """(ts, rows) oldest first; rows is (n, len(FIELDS))."""
+        n = min(self.count, CAPACITY)
+        start = self.count % CAPACITY if self.count > CAPACITY else 0
+        order = (np.arange(n) + start) % CAPACITY
+        return self.ts[order], self.rows[order]
+
+
+lock = threading.Lock()
+RINGS = {}          # product_id → TickerRing
+VERSION = 0         # bumped per ticker message (trades bump ws.STATE_VERSION)
+
+
+def update(product, fields, ts, cvd=None):
+    """Called by ws_client for every (normalized) ticker message."""
+    global VERSION
+    if product is None:
+        return
+    with lock:
+        ring = RINGS.get(product)
+        if ring is None:
+            ring = RINGS[product] = TickerRing()
+        ring.update(fields, ts, cvd)
+        VERSION += 1
+
+
+def latest(product):
+    """Latest parsed fields for `product` ({} before the first message)."""
+    with lock:
+        ring = RINGS.get(product)
+        return dict(ring.latest) if ring else {}
+
+
+def series(product, fields=None):
+    """(ts, {field: array}) for `product`, oldest first."""
+    with lock:
+        ring = RINGS.get(product)
+        if ring is None:
+            return np.array([], dtype=np.int64), {f: np.array([]) for f in fields or FIELDS}
+        ts, rows = ring.series()
+    return ts, {f: rows[:, COL[f]] for f in fields or FIELDS}
+
+
+def oi_change(product, candle_seconds=60):
+    """(candle_ts, ΔOI) — last open interest per candle minus the previous candle's."""
+    ts, cols = series(product, ["open_interest"])
+    oi = cols["open_interest"]
+    keep = ~np.isnan(oi)
+    ts, oi = ts[keep], oi[keep]
+    if len(ts) < 2:
+        return np.array([]), np.array([])
+
+    candles = ts // candle_seconds * candle_seconds
+    last = np.flatnonzero(np.r_[candles[1:] != candles[:-1], True])
+    return candles[last][1:], np.diff(oi[last])
+
+
+# ============================================================
+# SNAPSHOT (ingest process → Dash workers)
+# ============================================================
+
+def snapshot():
+    with lock:
+        return VERSION, {
+            product: (ring.ts.copy(), ring.rows.copy(), ring.count, ring.slot, dict(ring.latest))
+            for product, ring in RINGS.items()
+        }
+
+
+def restore(state):
+    global VERSION
+    version, state = state
+    rings = {}
+    for product, (ts, rows, count, slot, last) in state.items():
+        ring = TickerRing()
+        ring.ts, ring.rows, ring.count, ring.slot, ring.latest = ts, rows, count, slot, last
+        rings[product] = ring
+    with lock:
+        RINGS.clear()
+        RINGS.update(rings)
+        VERSION = version
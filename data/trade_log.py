@@ -0,0 +1,260 @@
+# data/trade_log.py
+import mmap
+import os
+import struct
+import threading
+import time
+
+import numpy as np
+
+
+# ============================================================
+# MEMORY-MAPPED TRADE LOG
+# ============================================================
+# Fixed 40-byte records in rotating segment files:
+#
+#   {LOG_DIR}/seg-<first trade ts in ms>.bin
+#   [64-byte header][record 0][record 1]...
+#
+# The writer copies each record into the mapped file and only then
+# bumps the header count, so readers (and a restarted process) never
+# see a half-written record. Readers np.memmap the file: no parsing,
+# no copies.
+#
+# Venues interleave in one log, so ts is only roughly increasing. The
+# header also keeps each segment's ts range and whether its ts column
+# went backwards; readers prune on the range and fall back from a binary
+# search to a mask for such segments.
+
+LOG_DIR = os.environ.get("TRADE_LOG_DIR", os.path.join(os.getcwd(), "tradelog"))
+SEGMENT_RECORDS = 1_000_000          # 40 MB per segment
+SYNC_SECONDS = 1.0                   # msync cadence
+
+MAGIC = b"FDTLOG1\0"
+HEADER = struct.Struct("<8sIQQddB")  # magic, record size, capacity, count, min ts, max ts, flags
+HEADER_SIZE = 64
+COUNT_OFFSET = 8 + 4 + 8
+RANGE = struct.Struct("<ddB")         # min ts, max ts, flags
+RANGE_OFFSET = COUNT_OFFSET + 8
+HAS_RANGE = 1                         # flags; segments from older writers have 0
+UNSORTED = 2
+
+# ts, price, qty, seq, side (+1 buy / -1 sell), venue (data/venues.py
+# VENUE_IDS; 0 in records written before it existed)
+RECORD = struct.Struct("<dddqbB6x")
+RECORD_DTYPE = np.dtype([
+    ("ts", "<f8"), ("price", "<f8"), ("qty", "<f8"),
+    ("seq", "<i8"), ("side", "i1"), ("venue", "u1"), ("_pad", "V6"),
+])
+assert RECORD.size == RECORD_DTYPE.itemsize == 40
+
+
+# ============================================================
+# WRITER (ingest side)
+# ============================================================
+
+class TradeLogWriter:
+
+    def __init__(self, directory=LOG_DIR, segment_records=SEGMENT_RECORDS):
+        self.directory = directory
+        self.segment_records = segment_records
+        self.mm = None
+        self.file = None
+        self.count = 0
+        self.min_ts, self.max_ts, self.flags = float("inf"), float("-inf"), HAS_RANGE
+        self.last_sync = time.monotonic()
+        os.makedirs(directory, exist_ok=True)
+        self._resume()
+
+    def _resume(self):
+        """Reopen the newest segment if it still has room."""
+        segs = segments(self.directory)
+        if not segs:
+            return
+        path = segs[-1]
+        with open(path, "rb") as f:
+            magic, _, capacity, count, min_ts, max_ts, flags = HEADER.unpack(f.read(HEADER.size))
+        # a segment without a ts range is left alone: the next append rotates
+        if magic == MAGIC and count < capacity and flags & HAS_RANGE:
+            self._map(path, capacity)
+            self.count = count
+            self.min_ts, self.max_ts, self.flags = min_ts, max_ts, flags
+
+    def _map(self, path, capacity):
+        self.file = open(path, "r+b")
+        self.mm = mmap.mmap(self.file.fileno(), HEADER_SIZE + capacity * RECORD.size)
+        self.capacity = capacity
+
+    def _rotate(self, ts):
+        self.close()
+        path = os.path.join(self.directory, f"seg-{int(ts * 1000):013d}.bin")
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, RECORD.size, self.segment_records, 0,
+                                float("inf"), float("-inf"), HAS_RANGE).ljust(HEADER_SIZE, b"\0"))
+            f.truncate(HEADER_SIZE + self.segment_records * RECORD.size)
+        self._map(path, self.segment_records)
+        self.count = 0
+        self.min_ts, self.max_ts, self.flags = float("inf"), float("-inf"), HAS_RANGE
+
+    def append(self, ts, price, qty, side, seq=-1, venue=0):
+        if self.mm is None or self.count >= self.capacity:
+            self._rotate(ts)
+
+        RECORD.pack_into(
+            self.mm, HEADER_SIZE + self.count * RECORD.size,
+            ts, price, qty, seq, 1 if side == "buy" else -1, venue
+        )
+        if ts < self.max_ts:
+            self.flags |= UNSORTED
+        self.min_ts = min(self.min_ts, ts)
+        self.max_ts = max(self.max_ts, ts)
+        RANGE.pack_into(self.mm, RANGE_OFFSET, self.min_ts, self.max_ts, self.flags)
+        self.count += 1
+        # commit point: readers only look at the first `count` records
+        struct.pack_into("<Q", self.mm, COUNT_OFFSET, self.count)
+
+        # wall cadence: trade ts may be replayed, old or skewed
+        now = time.monotonic()
+        if now - self.last_sync >= SYNC_SECONDS:
+            self.mm.flush()
+            self.last_sync = now
+
+    def close(self):
+        if self.mm is not None:
+            self.mm.flush()
+            self.mm.close()
+            self.file.close()
+            self.mm = None
+
+
+WRITER = None
+_writer_lock = threading.Lock()
+
+
+def open_writer(directory=None):
+    global WRITER
+    with _writer_lock:
+        if WRITER is None:
+            WRITER = TradeLogWriter(directory or LOG_DIR)
+    return WRITER
+
+
+def append(ts, price, qty, side, seq=-1, venue=0):
+    """Called by ws_client per trade; no-op until open_writer()."""
+    if WRITER is not None:
+        WRITER.append(ts, price, qty, side, seq, venue)
+
+
+# ============================================================
+# READERS (panels, notebooks, replay)
+# ============================================================
+
+def segments(directory=None):
+    directory = directory or LOG_DIR
+    if not os.path.isdir(directory):
+        return []
+    return [
+        os.path.join(directory, f)
+        for f in sorted(os.listdir(directory))
+        if f.startswith("seg-") and f.endswith(".bin")
+    ]
+
+
+def _count(path):
+    with open(path, "rb") as f:
+        f.seek(COUNT_OFFSET)
+        return struct.unpack("<Q", f.read(8))[0]
+
+
+def _range(path):
+    """(min ts, max ts, flags) from the header; flags is 0 for old segments."""
+    with open(path, "rb") as f:
+        f.seek(RANGE_OFFSET)
+        return RANGE.unpack(f.read(RANGE.size))
+
+
+def open_segment(path):
+    """Zero-copy view of the committed records of one segment."""
+    count = _count(path)
+    if count == 0:
+        return np.empty(0, dtype=RECORD_DTYPE)
+    return np.memmap(path, dtype=RECORD_DTYPE, mode="r", offset=HEADER_SIZE, shape=(count,))
+
+
+def iter_range(start_ts, end_ts, directory=None):
+    """
+    Yield records with start_ts <= ts < end_ts, segment by segment in log
+    order. Sorted segments give zero-copy views; a segment whose ts went
+    backwards (venues interleaving) is masked, which copies.
+    """
+    for path in segments(directory):
+        min_ts, max_ts, flags = _range(path)
+        if flags & HAS_RANGE and (max_ts < start_ts or min_ts >= end_ts):
+            continue
+        recs = open_segment(path)
+        ts = recs["ts"]
+        if not flags & HAS_RANGE:
+            flags |= UNSORTED if np.any(ts[1:] < ts[:-1]) else 0
+        if flags & UNSORTED:
+            mask = (ts >= start_ts) & (ts < end_ts)
+            if mask.any():
+                yield recs[mask]
+            continue
+        lo, hi = np.searchsorted(ts, [start_ts, end_ts])
+        if hi > lo:
+            yield recs[lo:hi]
+
+
+def read_range(start_ts, end_ts, directory=None):
+    """Records in range as one array (copies only when spanning segments)."""
+    parts = list(iter_range(start_ts, end_ts, directory))
+    if not parts:
+        return np.empty(0, dtype=RECORD_DTYPE)
+    return parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+
+def tail(n, directory=None):
+    """The last n records (views; concatenated if they span segments)."""
+    parts = []
+    for path in reversed(segments(directory)):
+        recs = open_segment(path)
+        parts.insert(0, recs[-n:])
+        n -= len(parts[0])
+        if n <= 0:
+            break
+    if not parts:
+        return np.empty(0, dtype=RECORD_DTYPE)
+    return parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+
+def follow(poll=0.2, directory=None, from_start=False):
+    """
+    Generator yielding arrays of new records as the writer commits them,
+    across segment rotations. Near real time (poll seconds).
+    """
+    segs = segments(directory)
+    path = segs[-1] if segs and not from_start else (segs[0] if segs else None)
+    seen = 0 if from_start or path is None else _count(path)
+
+    while True:
+        if path is None:
+            segs = segments(directory)
+            if not segs:
+                time.sleep(poll)
+                continue
+            path, seen = segs[0], 0
+
+        count = _count(path)
+        if count > seen:
+            yield open_segment(path)[seen:count]
+            seen = count
+            continue
+
+        # current segment exhausted: move on once a newer one exists
+        segs = segments(directory)
+        newer = [s for s in segs if s > path]
+        if newer:
+            path, seen = newer[0], 0
+            continue
+
+        time.sleep(poll)
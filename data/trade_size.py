@@ -0,0 +1,228 @@
+# data/trade_size.py
+import math
+import pickle
+import threading
+from collections import deque
+
+import numpy as np
+
+from data import clock
+
+
+# ============================================================
+# TRADE-SIZE SKETCH (panel 5 large prints, panel 10 histogram)
+# ============================================================
+# Log-bucketed quantile sketch (DDSketch style): bucket i holds sizes
+# in (MIN_SIZE * GAMMA**(i-1), MIN_SIZE * GAMMA**i], so any quantile is
+# within ±ALPHA relative error. Adding a trade is one log() and one
+# counter increment; memory is fixed no matter how many trades arrive.
+#
+# Rolling windows are a ring of per-slice {bucket: count} maps plus a
+# running total. An expiring slice is subtracted bucket by bucket, so a
+# rollover costs the buckets its trades used, not N_BUCKETS. A late trade
+# older than the oldest live slice is left out of the window.
+
+ALPHA = 0.02                           # relative accuracy of quantiles
+GAMMA = (1 + ALPHA) / (1 - ALPHA)
+MIN_SIZE = 1e-6
+N_BUCKETS = 1024                       # MIN_SIZE .. ~1e11
+
+_LOG_GAMMA = math.log(GAMMA)
+
+WINDOWS = {                            # name → (seconds, slices)
+    "5m": (300, 10),
+    "1h": (3600, 12),
+}
+
+LARGE_PERCENTILE = 0.99                # dynamic "large print" cut-off
+LARGE_WINDOW = "1h"
+MIN_TRADES = 200                       # no flags until the window has this many
+REFRESH_TRADES = 64                    # recompute the cut-off every N trades
+LARGE_TAPE = 50                        # large prints kept per symbol
+
+
+def _index(qty):
+    if qty <= MIN_SIZE:
+        return 0
+    return min(N_BUCKETS - 1, int(math.ceil(math.log(qty / MIN_SIZE) / _LOG_GAMMA)))
+
+
+def bucket_size(idx):
+    """Representative size of bucket `idx` (works on arrays too)."""
+    return MIN_SIZE * 2 * GAMMA ** idx / (GAMMA + 1)
+
+
+class SizeSketch:
+
+    def __init__(self):
+        self.counts = np.zeros(N_BUCKETS, dtype=np.int64)
+        self.n = 0
+
+    def add(self, idx, ts=None):
+        self.counts[idx] += 1
+        self.n += 1
+
+    def quantile(self, q):
+        if self.n == 0:
+            return None
+        cum = np.cumsum(self.counts)
+        i = int(np.searchsorted(cum, q * (self.n - 1), side="right"))
+        return float(bucket_size(i))
+
+    def rank(self, idx):
+        """Fraction of trades at or below bucket `idx`."""
+        if self.n == 0:
+            return 0.0
+        return float(self.counts[:idx + 1].sum()) / self.n
+
+    def histogram(self, merge=5):
+        """(sizes, counts) over the occupied range, `merge` buckets per bar."""
+        nz = np.flatnonzero(self.counts)
+        if not len(nz):
+            return np.array([]), np.array([])
+        lo = nz[0] // merge * merge
+        hi = (nz[-1] // merge + 1) * merge
+        counts = self.counts[lo:hi].reshape(-1, merge).sum(axis=1)
+        sizes = bucket_size(np.arange(lo, hi, merge) + (merge - 1) / 2)
+        return sizes, counts
+
+
+class WindowedSketch(SizeSketch):
+
+    def __init__(self, seconds, slices):
+        super().__init__()
+        self.slice_seconds = seconds / slices
+        self.slices = [{} for _ in range(slices)]      # bucket → count
+        self.slice_ids = [-1] * slices
+        self.last_id = None
+
+    def _drop(self, pos):
+        for idx, c in self.slices[pos].items():
+            self.counts[idx] -= c
+            self.n -= c
+        self.slices[pos] = {}
+        self.slice_ids[pos] = -1
+
+    def expire(self, ts):
+        """Drop slices that fell out of the window ending at `ts`."""
+        sid = int(ts // self.slice_seconds)
+        if self.last_id is not None and sid <= self.last_id:
+            return                      # same slice, or late: never moves back
+        oldest = sid - len(self.slices) + 1
+        for pos, old in enumerate(self.slice_ids):
+            if 0 <= old < oldest:
+                self._drop(pos)
+        self.last_id = sid
+
+    def add(self, idx, ts=None):
+        self.expire(ts)
+        sid = int(ts // self.slice_seconds)
+        if sid <= self.last_id - len(self.slices):
+            return                      # older than the window: already expired
+        pos = sid % len(self.slices)
+        if self.slice_ids[pos] != sid:
+            self._drop(pos)
+            self.slice_ids[pos] = sid
+        self.slices[pos][idx] = self.slices[pos].get(idx, 0) + 1
+        super().add(idx)
+
+
+class SizeEngine:
+    """Session + rolling-window sketches and the large-print tape for one symbol."""
+
+    def __init__(self):
+        self.sketches = {"session": SizeSketch()}
+        for name, (seconds, slices) in WINDOWS.items():
+            self.sketches[name] = WindowedSketch(seconds, slices)
+        self.large = deque(maxlen=LARGE_TAPE)
+        self.threshold = None
+        self._since_refresh = 0
+
+    def add(self, ts, price, qty, side):
+        idx = _index(qty)
+        window = self.sketches[LARGE_WINDOW]
+
+        # compare against the cut-off from *earlier* trades
+        if self.threshold is not None and qty >= self.threshold:
+            self.large.append({
+                "time": ts,
+                "price": price,
+                "volume": qty,
+                "side": side,
+                "pct": window.rank(idx),
+            })
+
+        for sketch in self.sketches.values():
+            sketch.add(idx, ts)
+
+        self._since_refresh += 1
+        if self._since_refresh >= REFRESH_TRADES:
+            self._since_refresh = 0
+            self.threshold = (
+                window.quantile(LARGE_PERCENTILE) if window.n >= MIN_TRADES else None
+            )
+
+
+# ============================================================
+# MODULE API
+# ============================================================
+
+lock = threading.Lock()
+ENGINES = {}          # symbol → SizeEngine
+
+
+def add_trade(symbol, ts, price, qty, side):
+    """Called by ws_client per trade."""
+    with lock:
+        engine = ENGINES.get(symbol)
+        if engine is None:
+            engine = ENGINES[symbol] = SizeEngine()
+        engine.add(ts, price, qty, side)
+
+
+def large_prints(symbol, n=None):
+    """Newest-first large prints for `symbol`."""
+    with lock:
+        engine = ENGINES.get(symbol)
+        if engine is None:
+            return []
+        prints = list(engine.large)
+    prints.reverse()
+    return prints[:n] if n else prints
+
+
+def summary(symbol, window=LARGE_WINDOW, quantiles=(0.5, 0.9, 0.99)):
+    """{"n", "threshold", "quantiles": {q: size}, "sizes", "counts"} for one window."""
+    with lock:
+        engine = ENGINES.get(symbol)
+        if engine is None:
+            return None
+        sketch = engine.sketches[window]
+        if isinstance(sketch, WindowedSketch) and sketch.last_id is not None:
+            # quiet feed: age out slices even without new trades
+            sketch.expire(clock.now())
+        sizes, counts = sketch.histogram()
+        return {
+            "n": sketch.n,
+            "threshold": engine.threshold,
+            "quantiles": {q: sketch.quantile(q) for q in quantiles},
+            "sizes": sizes,
+            "counts": counts,
+        }
+
+
+# ============================================================
+# SNAPSHOT (ingest process → Dash workers)
+# ============================================================
+
+def snapshot():
+    # pickled under the lock: the ingest thread keeps mutating the engines
+    with lock:
+        return pickle.dumps(ENGINES, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def restore(blob):
+    engines = pickle.loads(blob)
+    with lock:
+        ENGINES.clear()
+        ENGINES.update(engines)
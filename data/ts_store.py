@@ -0,0 +1,411 @@
+# data/ts_store.py
+import json
+import math
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+# Parquet/Arrow is optional: without it the store is simply disabled
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as pads
+    import pyarrow.parquet as pq
+    STORE_ENABLED = True
+except ImportError:
+    STORE_ENABLED = False
+
+
+# ============================================================
+# TIERED TIME-SERIES STORE
+# ============================================================
+# Hot tier : unflushed trades + 1 s / 1 m bars, in memory
+# Cold tier: {STORE_DIR}/{kind}/date=YYYY-MM-DD/part-*.parquet
+#
+# Kinds: "trades" (raw), "bars_1s", "bars_1m" (pre-aggregated rollups).
+# Closed rows are flushed every FLUSH_SECONDS by a background thread;
+# a finished day is compacted into a single sorted file.
+
+STORE_DIR = os.environ.get("TS_STORE_DIR", os.path.join(os.getcwd(), "store"))
+FLUSH_SECONDS = 60
+LATE_SECONDS = 5          # rows younger than this stay hot (late trades)
+
+BAR_FIELDS = ["ts", "open", "high", "low", "close", "buy_vol", "sell_vol", "trades"]
+
+if STORE_ENABLED:
+    SCHEMAS = {
+        "trades": pa.schema([
+            ("ts", pa.float64()), ("price", pa.float64()),
+            ("qty", pa.float64()), ("side", pa.int8()),
+        ]),
+        "bars_1s": pa.schema([
+            ("ts", pa.int64()), ("open", pa.float64()), ("high", pa.float64()),
+            ("low", pa.float64()), ("close", pa.float64()),
+            ("buy_vol", pa.float64()), ("sell_vol", pa.float64()),
+            ("trades", pa.int32()),
+        ]),
+    }
+    SCHEMAS["bars_1m"] = SCHEMAS["bars_1s"]
+
+BAR_SECONDS = {"bars_1s": 1, "bars_1m": 60}
+
+# ---- Hot tier ----
+lock = threading.Lock()
+HOT_TRADES = []                         # (ts, price, qty, side)
+HOT_BARS = {"bars_1s": {}, "bars_1m": {}}   # bar_ts → [o, h, l, c, buy, sell, n]
+LATEST_TS = 0.0
+
+# Rows taken out of the hot tier by a running flush. Queries read them
+# until the part files are published; listing the files and copying the
+# in-memory rows both happen under publish_lock, so a row is always in
+# exactly one of the two
+IN_FLIGHT = {"trades": [], "bars_1s": {}, "bars_1m": {}}
+publish_lock = threading.Lock()
+
+# Off during a replay rebuild: the store already holds those days and
+# nothing would flush the hot tier (data/replay.py)
+RECORDING = True
+
+
+# ============================================================
+# INGEST
+# ============================================================
+
+def add_trade(ts, price, qty, side):
+    """Called by ws_client for every trade; O(1), no I/O."""
+    global LATEST_TS
+    if not RECORDING:
+        return
+
+    sign = 1 if side == "buy" else -1
+    with lock:
+        HOT_TRADES.append((ts, price, qty, sign))
+        for kind, seconds in BAR_SECONDS.items():
+            bar_ts = int(ts // seconds * seconds)
+            bar = HOT_BARS[kind].get(bar_ts)
+            if bar is None:
+                HOT_BARS[kind][bar_ts] = [price, price, price, price,
+                                          qty if sign > 0 else 0.0,
+                                          qty if sign < 0 else 0.0, 1]
+                continue
+            if price > bar[1]:
+                bar[1] = price
+            if price < bar[2]:
+                bar[2] = price
+            bar[3] = price
+            bar[4 if sign > 0 else 5] += qty
+            bar[6] += 1
+        if ts > LATEST_TS:
+            LATEST_TS = ts
+
+
+# ============================================================
+# FLUSH / COMPACT (background thread)
+# ============================================================
+
+def _day(ts):
+    return datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y-%m-%d")
+
+
+def _day_dir(kind, day):
+    return os.path.join(STORE_DIR, kind, f"date={day}")
+
+
+def _bars_table(bars):
+    cols = list(zip(*[(t, *b) for t, b in sorted(bars.items())]))
+    return pa.Table.from_arrays(
+        [pa.array(c, type=f.type) for c, f in zip(cols, SCHEMAS["bars_1s"])],
+        schema=SCHEMAS["bars_1s"]
+    )
+
+
+def _trades_table(rows):
+    cols = list(zip(*rows))
+    return pa.Table.from_arrays(
+        [pa.array(c, type=f.type) for c, f in zip(cols, SCHEMAS["trades"])],
+        schema=SCHEMAS["trades"]
+    )
+
+
+def _merge_bars(table):
+    """
+    Collapse bars sharing a ts into one. A trade arriving after its bar
+    was flushed opens a second bar for the same second/minute; `table`
+    must be stably sorted by ts with rows in write order, so the first
+    duplicate supplies the open and the last one the close.
+    """
+    if table.num_rows < 2:
+        return table
+    ts = table.column("ts").to_numpy()
+    starts = np.flatnonzero(np.r_[True, ts[1:] != ts[:-1]])
+    if len(starts) == len(ts):
+        return table
+    ends = np.r_[starts[1:], len(ts)] - 1
+
+    col = {name: table.column(name).to_numpy() for name in BAR_FIELDS[1:]}
+    merged = [
+        ts[starts],
+        col["open"][starts],
+        np.maximum.reduceat(col["high"], starts),
+        np.minimum.reduceat(col["low"], starts),
+        col["close"][ends],
+        np.add.reduceat(col["buy_vol"], starts),
+        np.add.reduceat(col["sell_vol"], starts),
+        np.add.reduceat(col["trades"], starts),
+    ]
+    return pa.Table.from_arrays(
+        [pa.array(c, type=f.type) for c, f in zip(merged, SCHEMAS["bars_1s"])],
+        schema=SCHEMAS["bars_1s"]
+    )
+
+
+def _write(kind, table):
+    """
+    Write one part file per UTC day touched by `table`, under a .tmp name
+    that queries ignore. Returns the (tmp, final) paths to publish.
+    Part names start with the write time, so sorting them gives write order.
+    """
+    ts = table.column("ts").to_numpy()
+    days = np.array([_day(t) for t in ts])
+    written = []
+    for day in np.unique(days):
+        part = table.filter(pa.array(days == day))
+        path = _day_dir(kind, day)
+        os.makedirs(path, exist_ok=True)
+        name = f"part-{time.time_ns():020d}-{uuid.uuid4().hex[:6]}.parquet"
+        final = os.path.join(path, name)
+        pq.write_table(part, final + ".tmp")
+        written.append((final + ".tmp", final))
+    return written
+
+
+def _unflush():
+    """Put in-flight rows back into the hot tier after a failed write."""
+    with lock:
+        HOT_TRADES[:0] = IN_FLIGHT["trades"]
+        IN_FLIGHT["trades"] = []
+        for kind in BAR_SECONDS:
+            for t, old in IN_FLIGHT[kind].items():
+                bar = HOT_BARS[kind].get(t)
+                if bar is None:
+                    HOT_BARS[kind][t] = old
+                else:
+                    HOT_BARS[kind][t] = [old[0], max(old[1], bar[1]), min(old[2], bar[2]),
+                                         bar[3], old[4] + bar[4], old[5] + bar[5],
+                                         old[6] + bar[6]]
+            IN_FLIGHT[kind] = {}
+
+
+def flush(force=False):
+    """Move closed rows from the hot tier to Parquet."""
+    with lock:
+        cutoff = float("inf") if force else LATEST_TS - LATE_SECONDS
+        IN_FLIGHT["trades"] = [r for r in HOT_TRADES if r[0] < cutoff]
+        HOT_TRADES[:] = [r for r in HOT_TRADES if r[0] >= cutoff]
+        for kind, seconds in BAR_SECONDS.items():
+            closed = [t for t in HOT_BARS[kind] if t + seconds <= cutoff]
+            IN_FLIGHT[kind] = {t: HOT_BARS[kind].pop(t) for t in closed}
+
+    written = []
+    try:
+        if IN_FLIGHT["trades"]:
+            written += _write("trades", _trades_table(IN_FLIGHT["trades"]))
+        for kind in BAR_SECONDS:
+            if IN_FLIGHT[kind]:
+                written += _write(kind, _bars_table(IN_FLIGHT[kind]))
+    except Exception:
+        for tmp, _ in written:
+            os.remove(tmp)
+        _unflush()
+        raise
+
+    # publish the parts and drop the in-flight rows in one step
+    with publish_lock:
+        for tmp, final in written:
+            os.replace(tmp, final)
+        with lock:
+            for kind in IN_FLIGHT:
+                IN_FLIGHT[kind] = [] if kind == "trades" else {}
+
+
+def _finish_compaction(path, day):
+    """Remove part files already merged into the day file (after a crash)."""
+    final = os.path.join(path, f"day-{day}.parquet")
+    if not os.path.exists(final):
+        return
+    metadata = pq.read_schema(final).metadata or {}
+    for f in json.loads(metadata.get(b"parts", b"[]")):
+        if f != os.path.basename(final) and os.path.exists(os.path.join(path, f)):
+            os.remove(os.path.join(path, f))
+
+
+def compact_day(day):
+    """Merge a finished day's part files into one sorted file per kind."""
+    for kind in SCHEMAS:
+        path = _day_dir(kind, day)
+        if not os.path.isdir(path):
+            continue
+        _finish_compaction(path, day)
+        # day-*.parquet sorts before part-*, and parts sort in write order
+        parts = sorted(f for f in os.listdir(path) if f.endswith(".parquet"))
+        if len(parts) <= 1:
+            continue
+        table = pa.concat_tables(
+            [pq.read_table(os.path.join(path, f), schema=SCHEMAS[kind]) for f in parts]
+        ).sort_by("ts")
+        if kind != "trades":
+            table = _merge_bars(table)
+        table = table.replace_schema_metadata({"parts": json.dumps(parts)})
+        tmp = os.path.join(path, f"day-{day}.parquet.tmp")
+        pq.write_table(table, tmp, row_group_size=65536)
+
+        # the day file is in place before any part goes; the merged part
+        # names live in its metadata, so a crash in between is undone by
+        # _finish_compaction instead of double-counting the day
+        with publish_lock:
+            os.replace(tmp, os.path.join(path, f"day-{day}.parquet"))
+            _finish_compaction(path, day)
+
+
+def _flush_loop():
+    last_day = None
+    while True:
+        time.sleep(FLUSH_SECONDS)
+        try:
+            flush()
+            today = _day(LATEST_TS) if LATEST_TS else None
+            if last_day and today and today != last_day:
+                compact_day(last_day)
+            last_day = today or last_day
+        except Exception as e:
+            print("Store flush error:", e)
+
+
+def start_flusher():
+    if not STORE_ENABLED:
+        print("Store: pyarrow not installed, history disabled")
+        return
+    # a compaction interrupted by a crash leaves merged parts behind
+    for kind in SCHEMAS:
+        root = os.path.join(STORE_DIR, kind)
+        for d in os.listdir(root) if os.path.isdir(root) else []:
+            if d.startswith("date="):
+                _finish_compaction(os.path.join(root, d), d[len("date="):])
+    threading.Thread(target=_flush_loop, daemon=True).start()
+
+
+# ============================================================
+# QUERIES
+# ============================================================
+
+def _hot_table(kind, start, end):
+    """In-flight rows, then hot rows: the newest data comes last."""
+    with lock:
+        if kind == "trades":
+            rows = [r for r in IN_FLIGHT["trades"] + HOT_TRADES if start <= r[0] < end]
+            return _trades_table(rows) if rows else None
+        parts = [{t: list(b) for t, b in bars.items() if start <= t < end}
+                 for bars in (IN_FLIGHT[kind], HOT_BARS[kind])]
+    tables = [_bars_table(bars) for bars in parts if bars]
+    return pa.concat_tables(tables) if tables else None
+
+
+def query(kind, start, end, columns=None):
+    """
+    Rows of `kind` with start <= ts < end, as a pyarrow Table sorted by ts.
+    Only the day directories in range are opened; the ts predicate is
+    pushed down to Parquet row-group statistics. Hot rows are appended,
+    and bars split across a flush are merged back into one.
+    """
+    if not STORE_ENABLED:
+        return None
+
+    if kind != "trades":
+        # integer bar timestamps: compare against whole seconds
+        start, end = math.ceil(start), math.ceil(end)
+
+    day = datetime.fromtimestamp(start, tz=timezone.utc).date()
+    last = datetime.fromtimestamp(end, tz=timezone.utc).date()
+    paths = []
+    with publish_lock:
+        while day <= last:
+            path = _day_dir(kind, day.isoformat())
+            if os.path.isdir(path):
+                paths += [os.path.join(path, f) for f in sorted(os.listdir(path))
+                          if f.endswith(".parquet")]
+            day += timedelta(days=1)
+        hot = _hot_table(kind, start, end)
+
+    tables = []
+    if paths:
+        dataset = pads.dataset(paths, format="parquet", schema=SCHEMAS[kind])
+        tables.append(dataset.to_table(
+            filter=(pc.field("ts") >= start) & (pc.field("ts") < end)
+        ))
+    if hot is not None:
+        tables.append(hot)
+
+    if not tables:
+        return SCHEMAS[kind].empty_table()
+
+    # sort_by is stable: rows sharing a ts keep write order
+    table = pa.concat_tables(tables).sort_by("ts")
+    if kind != "trades":
+        table = _merge_bars(table)
+    return table.select(columns) if columns else table
+
+
+def _day_range(day):
+    start = datetime.strptime(day, "%Y-%m-%d").replace(tzinfo=timezone.utc).timestamp()
+    return start, start + 86400
+
+
+def hourly_bars(day):
+    """
+    One UTC day rolled up from 1 m bars into metrics_engine rows:
+    {hour_ts: {open, close, high, low, buy_vol, sell_vol}}.
+    """
+    table = query("bars_1m", *_day_range(day))
+    if table is None or table.num_rows == 0:
+        return {}
+
+    ts = table.column("ts").to_numpy()
+    hours = ts // 3600 * 3600
+    starts = np.flatnonzero(np.r_[True, hours[1:] != hours[:-1]])
+    ends = np.r_[starts[1:], len(ts)] - 1
+
+    col = {name: table.column(name).to_numpy() for name in BAR_FIELDS[1:7]}
+    high = np.maximum.reduceat(col["high"], starts)
+    low = np.minimum.reduceat(col["low"], starts)
+    buy = np.add.reduceat(col["buy_vol"], starts)
+    sell = np.add.reduceat(col["sell_vol"], starts)
+
+    return {
+        int(hours[s]): {
+            "open": float(col["open"][s]),
+            "close": float(col["close"][e]),
+            "high": float(high[i]),
+            "low": float(low[i]),
+            "buy_vol": float(buy[i]),
+            "sell_vol": float(sell[i]),
+        }
+        for i, (s, e) in enumerate(zip(starts, ends))
+    }
+
+
+def cvd_series(day):
+    """Per-second (ts, cumulative volume delta, close) arrays for one UTC day."""
+    table = query("bars_1s", *_day_range(day), columns=["ts", "close", "buy_vol", "sell_vol"])
+    if table is None or table.num_rows == 0:
+        return np.array([]), np.array([]), np.array([])
+
+    delta = table.column("buy_vol").to_numpy() - table.column("sell_vol").to_numpy()
+    return (
+        table.column("ts").to_numpy(),
+        np.cumsum(delta),
+        table.column("close").to_numpy(),
+    )
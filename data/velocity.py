@@ -0,0 +1,147 @@
+# data/velocity.py
+import threading
+
+import numpy as np
+
+from data import clock
+
+
+# ============================================================
+# ROLLING-RATE ENGINE (panel 6)
+# ============================================================
+# Trades are appended to flat arrays holding running (cumulative)
+# sums. The rate over any horizon H is then two lookups:
+#
+#   i = searchsorted(ts, now - H)
+#   j = searchsorted(ts, now, side="right")
+#   rate = (cum[j] - cum[i]) / H
+#
+# so a back-filled second never counts trades that came after it.
+# Timestamps are clamped to be non-decreasing on append (a lagging
+# venue's trade counts at the newest ts) to keep the lookups valid.
+#
+# One sample per second (all horizons, all metrics) is kept here at
+# ingest time, so every viewer sees the same series.
+
+HORIZONS = np.array([1.0, 10.0, 60.0, 300.0])          # seconds
+HORIZON_LABELS = ["1s", "10s", "60s", "5m"]
+METRICS = ["buy_vol", "sell_vol", "trades", "notional"]  # all per second
+
+CAPACITY = 200_000            # trades kept for the rolling windows
+HISTORY_SECONDS = 3600
+
+lock = threading.Lock()
+
+# ---- Trade arrays (index 0 is a zero row so cum[i] is "sum before i") ----
+_ts = np.zeros(CAPACITY + 1)
+_cum = np.zeros((CAPACITY + 1, len(METRICS)))
+_n = 0
+
+# ---- Per-second history ring ----
+_hist_ts = np.zeros(HISTORY_SECONDS)
+_hist = np.zeros((HISTORY_SECONDS, len(HORIZONS), len(METRICS)))
+_hist_count = 0
+_last_sample = None
+
+
+def _compact():
+    """Drop the older half once full (amortized O(1) per trade)."""
+    global _n
+    keep = _n // 2
+    _ts[1:keep + 1] = _ts[_n - keep + 1:_n + 1]
+    _cum[1:keep + 1] = _cum[_n - keep + 1:_n + 1] - _cum[_n - keep]
+    _ts[0] = _ts[1]
+    _cum[0] = 0.0
+    _n = keep
+
+
+def add_trade(ts, price, qty, side):
+    global _n
+    with lock:
+        if _n >= CAPACITY:
+            _compact()
+        prev = _cum[_n]
+        row = _cum[_n + 1]
+        row[0] = prev[0] + (qty if side == "buy" else 0.0)
+        row[1] = prev[1] + (qty if side != "buy" else 0.0)
+        row[2] = prev[2] + 1.0
+        row[3] = prev[3] + qty * price
+        _ts[_n + 1] = max(ts, _ts[_n]) if _n else ts
+        _n += 1
+
+
+def _rates(now):
+    if _n == 0:
+        return np.zeros((len(HORIZONS), len(METRICS)))
+    ts = _ts[1:_n + 1]
+    lo = np.searchsorted(ts, now - HORIZONS)
+    hi = np.searchsorted(ts, now, side="right")
+    return (_cum[hi] - _cum[lo]) / HORIZONS[:, None]
+
+
+def rates(now=None):
+    """(len(HORIZONS), len(METRICS)) array of per-second rates at `now`."""
+    now = clock.now() if now is None else now
+    with lock:
+        return _rates(now)
+
+
+def sample(now=None):
+    """
+    Record one history row per whole second elapsed since the last call.
+    Called by the ingest publisher every PUBLISH_SECONDS (and by the
+    replay rebuild once per trade second); a no-op until a second
+    boundary is crossed.
+    """
+    global _hist_count, _last_sample
+
+    now = clock.now() if now is None else now
+    second = int(now)
+    with lock:
+        if _last_sample is None:
+            _last_sample = second - 1
+        if second <= _last_sample:
+            return
+
+        # fill every missed second (quiet feed), at most one full ring
+        for s in range(max(_last_sample + 1, second - HISTORY_SECONDS + 1), second + 1):
+            i = _hist_count % HISTORY_SECONDS
+            _hist_ts[i] = s
+            _hist[i] = _rates(s)
+            _hist_count += 1
+        _last_sample = second
+
+
+def samples():
+    """History rows recorded so far; changes once per sampled second."""
+    return _hist_count
+
+
+def history(horizon=0):
+    """(ts, rates) for one horizon index, oldest first; rates is (n, METRICS)."""
+    with lock:
+        n = min(_hist_count, HISTORY_SECONDS)
+        start = _hist_count % HISTORY_SECONDS if _hist_count > HISTORY_SECONDS else 0
+        order = (np.arange(n) + start) % HISTORY_SECONDS
+        return _hist_ts[order], _hist[order, horizon]
+
+
+# ============================================================
+# SNAPSHOT (ingest process → Dash workers)
+# ============================================================
+
+def snapshot():
+    with lock:
+        return {
+            "hist_ts": _hist_ts.copy(),
+            "hist": _hist.copy(),
+            "hist_count": _hist_count,
+        }
+
+
+def restore(state):
+    global _hist_count
+    with lock:
+        _hist_ts[:] = state["hist_ts"]
+        _hist[:] = state["hist"]
+        _hist_count = state["hist_count"]
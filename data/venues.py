@@ -0,0 +1,359 @@
+# data/venues.py
+import copy
+import json
+import threading
+from collections import namedtuple
+
+import numpy as np
+
+from data import velocity
+from data.orderflow import BucketProfile
+
+
+# ============================================================
+# NORMALIZED SCHEMA
+# ============================================================
+# Every venue adapter turns its own messages into these, so the
+# aggregation core (ws_client._aggregate) never sees venue formats.
+#
+#   Trade : ts / exchange_ts in seconds, side "buy" | "sell" (taker),
+#           uid namespaced by venue (dedupe), seq None when unsequenced
+#   Ticker: fields use data/ticker.py FIELDS names
+
+Trade = namedtuple("Trade", "venue symbol ts price qty side seq uid")
+Ticker = namedtuple("Ticker", "venue symbol ts fields seq")
+
+
+# ============================================================
+# ADAPTERS
+# ============================================================
+# An adapter is stateless: it knows the URL, what to send after
+# connecting, and how to decode one parsed JSON message into a list of
+# events ("trade", Trade) / ("snapshot", [Trade]) / ("ticker", Ticker).
+# fixture() is the inverse of decode for one trade; data/replay.py uses
+# it to stand in for any venue's websocket locally.
+
+class KrakenFutures:
+    name = "kraken_futures"
+    url = "wss://futures.kraken.com/ws/v1"
+    sequenced = True            # trade seq gaps trigger a resync
+
+    # Kraken futures ticker key → data/ticker.py field
+    TICKER_FIELDS = {
+        "markPrice": "mark",
+        "index": "index",
+        "last": "last",
+        "bid": "bid",
+        "ask": "ask",
+        "funding_rate": "funding_rate",
+        "openInterest": "open_interest",
+    }
+
+    def subscribe(self, symbol):
+        return [self._msg("subscribe", feed, symbol) for feed in ("ticker", "trade")]
+
+    def resync(self, symbol):
+        # a fresh subscription replays a trade_snapshot
+        return [self._msg("unsubscribe", "trade", symbol), self._msg("subscribe", "trade", symbol)]
+
+    @staticmethod
+    def _msg(event, feed, symbol):
+        return json.dumps({"event": event, "feed": feed, "product_ids": [symbol]})
+
+    @staticmethod
+    def display_only(raw):
+        # cheap pre-decode check for the overload policy
+        return '"ticker"' in raw
+
+    def _trade(self, t, symbol):
+        ts_ms = t.get("time")
+        uid = t.get("uid")
+        return Trade(
+            self.name, symbol, ts_ms / 1000 if ts_ms else None,
+            float(t["price"]), float(t["qty"]), t.get("side", "buy"),
+            t.get("seq"), f"{self.name}:{uid}" if uid is not None else None
+        )
+
+    def decode(self, data):
+        feed = data.get("feed")
+        symbol = data.get("product_id")
+
+        if feed == "ticker":
+            fields = {
+                field: float(data[key])
+                for key, field in self.TICKER_FIELDS.items()
+                if data.get(key) is not None
+            }
+            return [("ticker", Ticker(self.name, symbol, None, fields, data.get("seq")))]
+
+        # initial / resync snapshot — oldest first
+        if feed == "trade_snapshot":
+            trades = sorted(
+                data.get("trades", []),
+                key=lambda t: (t.get("time", 0), t.get("seq", 0))
+            )
+            return [("snapshot", [self._trade(t, t.get("product_id", symbol)) for t in trades])]
+
+        if feed != "trade":
+            return []
+
+        # PF futures format
+        if "price" in data and "qty" in data:
+            return [("trade", self._trade(data, symbol))]
+
+        # spot-type fallback
+        return [
+            ("trade", Trade(self.name, symbol, t.get("timestamp"), float(t["price"]),
+                            float(t["qty"]), t.get("side", "buy"), None, None))
+            for t in data.get("trades", [])
+        ]
+
+    def fixture(self, trade, i):
+        return json.dumps({
+            "feed": "trade", "product_id": trade.symbol, "uid": f"replay-{i}",
+            "side": trade.side, "type": "fill", "seq": i,
+            "time": int(trade.ts * 1000), "qty": trade.qty, "price": trade.price,
+        })
+
+
+class BinanceFutures:
+    """USDⓈ-M futures aggTrade stream (symbol in the URL, nothing to send)."""
+    name = "binance_futures"
+    url = "wss://fstream.binance.com/ws"
+    sequenced = False
+
+    def stream_url(self, base, symbol):
+        return f"{base}/{symbol.lower()}@aggTrade"
+
+    def subscribe(self, symbol):
+        return []
+
+    def resync(self, symbol):
+        return []
+
+    @staticmethod
+    def display_only(raw):
+        return False
+
+    def decode(self, data):
+        if data.get("e") != "aggTrade":
+            return []
+        return [("trade", Trade(
+            self.name, data["s"], data["T"] / 1000, float(data["p"]), float(data["q"]),
+            # buyer is the maker → the taker sold
+            "sell" if data.get("m") else "buy",
+            None, f"{self.name}:{data['a']}"
+        ))]
+
+    def fixture(self, trade, i):
+        return json.dumps({
+            "e": "aggTrade", "E": int(trade.ts * 1000), "s": trade.symbol, "a": i,
+            "p": str(trade.price), "q": str(trade.qty), "T": int(trade.ts * 1000),
+            "m": trade.side == "sell",
+        })
+
+
+class BybitLinear:
+    """Bybit v5 public linear publicTrade topic."""
+    name = "bybit_linear"
+    url = "wss://stream.bybit.com/v5/public/linear"
+    sequenced = False
+
+    def subscribe(self, symbol):
+        return [json.dumps({"op": "subscribe", "args": [f"publicTrade.{symbol}"]})]
+
+    def resync(self, symbol):
+        return []
+
+    @staticmethod
+    def display_only(raw):
+        return False
+
+    def decode(self, data):
+        if not str(data.get("topic", "")).startswith("publicTrade."):
+            return []
+        return [
+            ("trade", Trade(
+                self.name, t["s"], t["T"] / 1000, float(t["p"]), float(t["v"]),
+                "buy" if t["S"] == "Buy" else "sell", None, f"{self.name}:{t['i']}"
+            ))
+            for t in data.get("data", [])
+        ]
+
+    def fixture(self, trade, i):
+        return json.dumps({
+            "topic": f"publicTrade.{trade.symbol}", "type": "snapshot",
+            "ts": int(trade.ts * 1000),
+            "data": [{
+                "T": int(trade.ts * 1000), "s": trade.symbol,
+                "S": "Buy" if trade.side == "buy" else "Sell",
+                "v": str(trade.qty), "p": str(trade.price), "i": f"replay-{i}", "BT": False,
+            }],
+        })
+
+
+ADAPTERS = {a.name: a for a in (KrakenFutures(), BinanceFutures(), BybitLinear())}
+
+# The main feed: only its trades drive price-derived state (last price,
+# displacement, hourly OHLC, tape, sessions, stored bars)
+PRIMARY = KrakenFutures.name
+
+# Venue number stored in the trade log; append-only (0 = Kraken, also
+# what records written before venues existed read as)
+VENUE_IDS = {name: i for i, name in enumerate(ADAPTERS)}
+VENUE_NAMES = list(ADAPTERS)
+
+
+def connection_url(adapter, symbol, url=None):
+    base = url or adapter.url
+    if hasattr(adapter, "stream_url"):
+        return adapter.stream_url(base, symbol)
+    return base
+
+
+# ============================================================
+# PER-VENUE AGGREGATES
+# ============================================================
+# Volume aggregates exist per venue (here) and combined (ws_client CVD /
+# PRICE_BUCKETS, orderflow profile, velocity). Per venue: CVD, volume,
+# a volume profile and a per-second ring that rolling rates (velocity
+# horizons) are read from. Each trade costs one O(1) update here.
+
+HISTORY_SECONDS = 3600
+
+lock = threading.Lock()
+
+
+class VenueStats:
+
+    def __init__(self):
+        self.cvd = 0.0
+        self.buy_vol = 0.0
+        self.sell_vol = 0.0
+        self.trades = 0
+        self.last_price = None
+        self.last_ts = None
+        self.profile = BucketProfile(imbalances=False)
+        self.sec_ts = np.zeros(HISTORY_SECONDS, dtype=np.int64)
+        self.sec_buy = np.zeros(HISTORY_SECONDS)
+        self.sec_sell = np.zeros(HISTORY_SECONDS)
+        self.sec_trades = np.zeros(HISTORY_SECONDS)
+        self.sec_cvd = np.zeros(HISTORY_SECONDS)
+
+    def add(self, ts, price, bucket, qty, side):
+        sec = int(ts)
+        i = sec % HISTORY_SECONDS
+        if self.sec_ts[i] != sec:
+            self.sec_ts[i] = sec
+            self.sec_buy[i] = self.sec_sell[i] = self.sec_trades[i] = 0.0
+
+        if side == "buy":
+            self.buy_vol += qty
+            self.cvd += qty
+            self.sec_buy[i] += qty
+        else:
+            self.sell_vol += qty
+            self.cvd -= qty
+            self.sec_sell[i] += qty
+        self.trades += 1
+        self.last_price = price
+        self.last_ts = ts
+        self.sec_trades[i] += 1
+        self.sec_cvd[i] = self.cvd
+        self.profile.add(bucket, qty, side)
+
+    def copy(self):
+        new = copy.copy(self)
+        for name in ("sec_ts", "sec_buy", "sec_sell", "sec_trades", "sec_cvd"):
+            setattr(new, name, getattr(self, name).copy())
+        new.profile = self.profile.copy()
+        return new
+
+    def series(self):
+        """(second ts, volume, CVD) oldest first, only seconds with trades."""
+        order = np.argsort(self.sec_ts)
+        keep = self.sec_ts[order] > 0
+        vol = self.sec_buy + self.sec_sell
+        return self.sec_ts[order][keep], vol[order][keep], self.sec_cvd[order][keep]
+
+    def rates(self, now):
+        """(len(velocity.HORIZONS), 3) buy vol / sell vol / trades per second."""
+        age = now - self.sec_ts
+        inside = (age[None, :] < velocity.HORIZONS[:, None]) & (age >= 0) & (self.sec_ts > 0)
+        sums = inside @ np.stack((self.sec_buy, self.sec_sell, self.sec_trades), axis=1)
+        return sums / velocity.HORIZONS[:, None]
+
+
+STATS = {}          # venue → VenueStats
+
+
+def add_trade(venue, ts, price, bucket, qty, side):
+    """
+    Called by ws_client for every applied trade. Returns the venue's CVD
+    and buy / sell volume at `bucket` (what its alert engine evaluates).
+    """
+    with lock:
+        stats = STATS.get(venue)
+        if stats is None:
+            stats = STATS[venue] = VenueStats()
+        stats.add(ts, price, bucket, qty, side)
+        p = stats.profile
+        i = p._index(bucket)
+        return stats.cvd, float(p.buy[i]), float(p.sell[i])
+
+
+def summary():
+    """{venue: {cvd, buy_vol, sell_vol, trades, last_price}} plus a "combined" row."""
+    with lock:
+        out = {
+            venue: {
+                "cvd": s.cvd, "buy_vol": s.buy_vol, "sell_vol": s.sell_vol,
+                "trades": s.trades, "last_price": s.last_price,
+            }
+            for venue, s in STATS.items()
+        }
+    if out:
+        out["combined"] = {
+            k: sum(v[k] for v in out.values()) for k in ("cvd", "buy_vol", "sell_vol", "trades")
+        }
+    return out
+
+
+def series(venue):
+    with lock:
+        s = STATS.get(venue)
+        return s.series() if s else (np.array([], dtype=np.int64), np.array([]), np.array([]))
+
+
+def rates(venue, now):
+    """Per-venue rolling rates over velocity.HORIZONS (zeros for an unknown venue)."""
+    with lock:
+        s = STATS.get(venue)
+        return s.rates(now) if s else np.zeros((len(velocity.HORIZONS), 3))
+
+
+def profile(venue):
+    """(bucket prices, volume) of one venue over its traded range."""
+    with lock:
+        s = STATS.get(venue)
+        if s is None or s.profile.hi < s.profile.lo:
+            return np.empty(0), np.empty(0)
+        p = s.profile
+        prices = (p.base + np.arange(p.lo, p.hi + 1)) * p.bucket_size
+        return prices, p.buy[p.lo:p.hi + 1] + p.sell[p.lo:p.hi + 1]
+
+
+# ============================================================
+# SNAPSHOT (ingest process → Dash workers)
+# ============================================================
+
+def snapshot():
+    # copied under the lock: ingest keeps adding to them
+    with lock:
+        return {venue: s.copy() for venue, s in STATS.items()}
+
+
+def restore(state):
+    with lock:
+        STATS.clear()
+        STATS.update(state)
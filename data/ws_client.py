@@ -1,119 +1,171 @@
 # data/ws_client.py
 import asyncio
+import copy
 import json
+import os
+import pickle
+import random
 import threading
 import time
+from collections import deque
 import websockets
 
+from data import alerts
+from data import clock
+from data import metrics_engine
+from data import orderflow
 from data.metrics_engine import add_trade
+from data import latency
+from data import runtime
+from data import sessions
+from data import ts_store
+from data import tape
+from data import ticker
+from data import trade_log
+from data import trade_size
+from data import velocity
+from data import venues
 
 
 # ============================================================
 # GLOBAL STATE
 # ============================================================
 
-LATEST_DATA = {}
 WS_RUNNING = False
 
+# Futures product to subscribe to (set from the dashboard config)
+PRODUCT = "PF_SOLUSD"
+WS_URL = venues.KrakenFutures.url
+
+# Extra venues (dashboard config "venues"), combined into the volume
+# aggregates and tracked per venue (see _ingest):
+# [{"venue": "binance_futures", "symbol": "SOLUSDT", "url": ...}]
+VENUES = []
+
+# Bumped once per applied trade; panels tag renders with it
+STATE_VERSION = 0
+LAST_APPLY_TS = None
+
+# Held while aggregates change, so snapshots are consistent
+STATE_LOCK = threading.Lock()
+
+# Set once the first trade (or mirrored snapshot) is in
+STATE_READY = threading.Event()
+
 # ---- Panel 3 buckets (permanent) ----
 PRICE_BUCKETS = {}
-BUCKET_SIZE = 0.50
+BUCKET_SIZE = orderflow.BUCKET_SIZE   # one price grid for every profile
 
 LAST_BUCKET = None
 LAST_PRICE = None
 LAST_SIDE = None
 
-# ---- Flash effect ----
+# ---- Flash effect (display only: strength is derived at render time) ----
 FLASH_BUCKET = None
-FLASH_STRENGTH = 1.0
-FLASH_DECAY = 0.85
+FLASH_TS = None
+FLASH_HALF_LIFE = 1.0        # seconds
+FLASH_MIN = 0.05             # below this the highlight is off
 
-# ---- CVD, tape, velocity ----
+# ---- CVD, tape ----
 CVD = 0.0
 LAST_TRADES = []
 
-TRADE_TIMESTAMPS = []
-BUY_TIMESTAMPS = []
-SELL_TIMESTAMPS = []
-
 # ---- Panel 7: Micro-Momentum ----
 PREV_TRADE_PRICE = None
 PRICE_DISPLACEMENT = []      # (timestamp, ΔPrice)
+MAX_DISPLACEMENT = 20000     # trimmed in batches; panel 7 downsamples
 
 # ------------------------------------------------------------
-# PANEL 8 — REAL HOURLY PRICE MOVEMENT (OHLC)
+# FEED INTEGRITY — sequence tracking, de-dup, reconnects
 # ------------------------------------------------------------
-HOURLY_FLOW = {}   # hour_ts → { open, close, high, low, buy_vol, sell_vol }
+FEED_SEQ = {}                 # (venue, feed, symbol) → last seq seen
+SEEN_TRADE_UIDS = set()       # uids already applied (survives reconnects)
+SEEN_TRADE_ORDER = deque()    # insertion order, to bound SEEN_TRADE_UIDS
+MAX_SEEN_UIDS = 5000
+
+RECONNECT_BASE = 0.5          # seconds, first retry
+RECONNECT_MAX = 30.0          # seconds, backoff ceiling
+RECONNECT_STABLE = 30.0       # seconds up before the backoff starts over
+
+WS_STATS = {
+    "seq_gaps": 0,                # number of gaps detected
+    "seq_missed": 0,              # messages missing inside those gaps
+    "duplicates_dropped": 0,      # trades skipped because uid was seen
+    "resyncs": 0,                 # trade feed resubscriptions after a gap
+    "reconnects": 0,
+    "last_reconnect_seconds": None,
+    "total_reconnect_seconds": 0.0,
+    # pipeline (see _ws_loop)
+    "queue_decode_depth": 0,
+    "queue_decode_max": 0,
+    "queue_aggregate_depth": 0,
+    "queue_aggregate_max": 0,
+    "dropped_display": 0,         # ticker messages shed under load
+    "backpressure_waits": 0,      # puts that had to wait for a full queue
+}
 
-def _get_hour_timestamp(ts):
-    """Return timestamp rounded down to the start of the hour."""
-    return int(ts // 3600 * 3600)
+# ------------------------------------------------------------
+# PIPELINE — reader → decoder → aggregator → publisher
+# ------------------------------------------------------------
+DECODE_QUEUE = int(os.environ.get("INGEST_DECODE_QUEUE", "5000"))
+AGGREGATE_QUEUE = int(os.environ.get("INGEST_AGGREGATE_QUEUE", "5000"))
+OVERLOAD_POLICY = os.environ.get("INGEST_OVERLOAD", "drop_display")   # or "block"
+AGGREGATE_BATCH = 256         # items per aggregator turn before yielding
+PUBLISH_SECONDS = 0.25
 
+# ------------------------------------------------------------
+# SNAPSHOT — everything the panels read, shipped to Dash workers
+# ------------------------------------------------------------
+SNAPSHOT_FIELDS = [
+    "WS_RUNNING", "STATE_VERSION", "LAST_APPLY_TS",
+    "PRICE_BUCKETS", "LAST_BUCKET", "LAST_PRICE", "LAST_SIDE",
+    "FLASH_BUCKET", "FLASH_TS",
+    "CVD", "LAST_TRADES",
+    "PRICE_DISPLACEMENT", "WS_STATS",
+]
 
 # ============================================================
 # HELPERS
 # ============================================================
 
 def get_latest(symbol):
-    return LATEST_DATA.get(symbol, {})
+    """Latest parsed ticker fields (mark, index, funding, OI, ...)."""
+    return ticker.latest(symbol)
+
+
+def flash_strength(now=None):
+    """Highlight strength of FLASH_BUCKET: 1.0 on a trade, halving every FLASH_HALF_LIFE s."""
+    if FLASH_TS is None:
+        return 0.0
+    now = clock.now() if now is None else now
+    strength = 0.5 ** (max(0.0, now - FLASH_TS) / FLASH_HALF_LIFE)
+    return strength if strength >= FLASH_MIN else 0.0
 
 
 def _bucket_from_price(price: float) -> float:
     return round(price / BUCKET_SIZE) * BUCKET_SIZE
 
 
-def _update_price_bucket(price: float, volume: float, side: str):
+def _update_price_bucket(price: float, volume: float, side: str, ts: float, primary=True):
     """
     Updates:
-    - Buckets
-    - Flash effect
-    - CVD
-    - Tape
-    - Velocity
-    - Micro-momentum
-    - REAL HOURLY PRICE MOVEMENT (Panel 8)
+    - Buckets, CVD and the order-flow profile (every venue)
+    - Flash effect, tape, micro-momentum, absorption (primary venue only:
+      one price series, so other venues' quotes never show up as
+      displacement)
+    (hourly OHLC / volume lives in metrics_engine)
+
+    `ts` is the trade's exchange time; only the flash uses the clock.
+    Returns the trade's bucket.
     """
     global LAST_BUCKET, LAST_PRICE, LAST_SIDE
-    global FLASH_BUCKET, FLASH_STRENGTH
+    global FLASH_BUCKET, FLASH_TS
     global CVD, LAST_TRADES
     global PREV_TRADE_PRICE, PRICE_DISPLACEMENT
-    global TRADE_TIMESTAMPS, BUY_TIMESTAMPS, SELL_TIMESTAMPS
-    global HOURLY_FLOW
-
-    ts_now = time.time()
-    hour_ts = _get_hour_timestamp(ts_now)
-
-    # ============================================
-    #   1) HOURLY PRICE ENGINE (REAL MOVEMENT)
-    # ============================================
-    if hour_ts not in HOURLY_FLOW:
-        HOURLY_FLOW[hour_ts] = {
-            "open": price,
-            "close": price,
-            "high": price,
-            "low": price,
-            "buy_vol": 0.0,
-            "sell_vol": 0.0
-        }
-
-    h = HOURLY_FLOW[hour_ts]
-    h["close"] = price
-    h["high"] = max(h["high"], price)
-    h["low"] = min(h["low"], price)
-
-    if side == "buy":
-        h["buy_vol"] += volume
-    else:
-        h["sell_vol"] += volume
-
-    # keep last 24 hours
-    if len(HOURLY_FLOW) > 48:   # a bit more as buffer
-        oldest = sorted(HOURLY_FLOW.keys())[:-24]
-        for k in oldest:
-            HOURLY_FLOW.pop(k, None)
+    global STATE_VERSION, LAST_APPLY_TS
 
     # ============================================
-    #   2) PANEL 3 + CVD + MOMENTUM
+    #   PANEL 3 + CVD + MOMENTUM
     # ============================================
 
     bucket = _bucket_from_price(price)
@@ -126,132 +178,409 @@ def _update_price_bucket(price: float, volume: float, side: str):
 
     PRICE_BUCKETS[bucket][side] += volume
 
+    CVD += volume if side == "buy" else -volume
+
+    STATE_VERSION += 1
+    LAST_APPLY_TS = time.time()
+
+    if not primary:
+        orderflow.add_trade(ts, bucket, volume, side)
+        return bucket
+
     LAST_BUCKET = bucket
     LAST_PRICE = price
     LAST_SIDE = side
 
     FLASH_BUCKET = bucket
-    FLASH_STRENGTH = 1.0
-
-    CVD += volume if side == "buy" else -volume
+    FLASH_TS = clock.now()
 
     LAST_TRADES.append({
         "price": price,
         "volume": volume,
         "side": side,
-        "time": ts_now
+        "time": ts
     })
     LAST_TRADES[:] = LAST_TRADES[-10:]
 
-    TRADE_TIMESTAMPS.append(ts_now)
-    if side == "buy":
-        BUY_TIMESTAMPS.append((ts_now, volume))
-    else:
-        SELL_TIMESTAMPS.append((ts_now, volume))
-
     # Micro-momentum
+    dp = 0.0
     if PREV_TRADE_PRICE is not None:
-        PRICE_DISPLACEMENT.append((ts_now, price - PREV_TRADE_PRICE))
-        PRICE_DISPLACEMENT[:] = PRICE_DISPLACEMENT[-300:]
+        dp = price - PREV_TRADE_PRICE
+        PRICE_DISPLACEMENT.append((ts, dp))
+        if len(PRICE_DISPLACEMENT) > 2 * MAX_DISPLACEMENT:
+            PRICE_DISPLACEMENT[:] = PRICE_DISPLACEMENT[-MAX_DISPLACEMENT:]
 
     PREV_TRADE_PRICE = price
 
+    # POC / value area / imbalances / absorption (panel 3 overlays)
+    orderflow.add_trade(ts, bucket, volume, side, dp)
+    return bucket
+
+
+def _check_seq(key, seq):
+    """
+    Track the per-feed sequence number.
+    Returns True when messages were skipped since the last one.
+    """
+    if seq is None:
+        return False
+
+    last = FEED_SEQ.get(key)
+
+    if last is not None and seq <= last:
+        # replayed/out-of-order message, nothing new to track
+        return False
+
+    FEED_SEQ[key] = seq
+
+    if last is not None and seq > last + 1:
+        WS_STATS["seq_gaps"] += 1
+        WS_STATS["seq_missed"] += seq - last - 1
+        return True
+
+    return False
+
 
-def _decay_flash():
-    global FLASH_STRENGTH, FLASH_BUCKET
-    if FLASH_BUCKET is not None:
-        FLASH_STRENGTH *= FLASH_DECAY
-        if FLASH_STRENGTH < 0.05:
-            FLASH_BUCKET = None
+def _remember_uid(uid):
+    SEEN_TRADE_UIDS.add(uid)
+    SEEN_TRADE_ORDER.append(uid)
+    if len(SEEN_TRADE_ORDER) > MAX_SEEN_UIDS:
+        SEEN_TRADE_UIDS.discard(SEEN_TRADE_ORDER.popleft())
+
+
+def _apply_trade(t, recv_ts=None):
+    """
+    Feed one normalized trade (data/venues.py Trade) to the aggregates.
+    Trades already applied (same uid) are dropped, so a
+    trade_snapshot replayed after a reconnect never double-counts.
+
+    Live trades (recv_ts given) are tagged with exchange, receive and
+    apply times and feed the latency histograms.
+    """
+    if t.uid is not None:
+        if t.uid in SEEN_TRADE_UIDS:
+            WS_STATS["duplicates_dropped"] += 1
+            return False
+        _remember_uid(t.uid)
+
+    exchange_ts = t.ts
+    ts = exchange_ts or clock.now()
+
+    _ingest(t.price, t.qty, t.side, ts, t.seq if t.seq is not None else -1, t.venue, t.symbol)
+
+    if recv_ts is not None:
+        if t.venue == venues.PRIMARY:
+            LAST_TRADES[-1].update(
+                exchange_ts=exchange_ts,
+                recv_ts=recv_ts,
+                apply_ts=LAST_APPLY_TS
+            )
+        latency.observe_trade(exchange_ts, recv_ts, LAST_APPLY_TS)
+    return True
+
+
+def _venue_symbol(venue):
+    """Configured symbol of a venue (trade-log records carry no symbol)."""
+    if venue == venues.PRIMARY:
+        return PRODUCT
+    for feed in VENUES:
+        if feed["venue"] == venue:
+            return feed["symbol"]
+    return venue
+
+
+def _ingest(price, volume, side, ts, seq=-1, venue=venues.PRIMARY, symbol=None):
+    """
+    Volume aggregates (buckets, CVD, profile, velocity) combine every
+    venue; price-derived state (OHLC, displacement, tape, sessions,
+    stored bars) follows the primary venue only. Per-venue CVD, profile
+    and rates live in data/venues.py.
+    """
+    symbol = symbol or _venue_symbol(venue)
+    primary = venue == venues.PRIMARY
+    with STATE_LOCK:
+        if primary:
+            add_trade(price, volume, side, ts)
+        bucket = _update_price_bucket(price, volume, side, ts, primary)
+        venue_cvd, bucket_buy, bucket_sell = venues.add_trade(venue, ts, price, bucket, volume, side)
+        # one alert engine per symbol, fed that venue's own CVD / bucket
+        alerts.on_trade(symbol, ts, price, volume, side, venue_cvd, bucket, bucket_buy, bucket_sell)
+    trade_log.append(ts, price, volume, side, seq, venues.VENUE_IDS[venue])
+    velocity.add_trade(ts, price, volume, side)
+    trade_size.add_trade(symbol, ts, price, volume, side)
+    if primary:
+        sessions.add_trade(ts, price, bucket, volume, side, seq)
+        ts_store.add_trade(ts, price, volume, side)
+        tape.add_trade(ts, price, volume, side)
+    STATE_READY.set()
+
+
+def snapshot_state():
+    """
+    Pickled copy of all panel-facing state (ws_client + metrics_engine).
+    Only cheap copies are taken under STATE_LOCK (and each engine's own
+    lock); pickling runs outside them, so ingest never waits on it.
+    """
+    with STATE_LOCK:
+        state = {name: globals()[name] for name in SNAPSHOT_FIELDS}
+        state["PRICE_BUCKETS"] = {b: dict(v) for b, v in PRICE_BUCKETS.items()}
+        state["LAST_TRADES"] = [dict(t) for t in LAST_TRADES]
+        state["PRICE_DISPLACEMENT"] = list(PRICE_DISPLACEMENT)
+        state["WS_STATS"] = dict(WS_STATS)
+
+    # ingest-side latency stages, so /metrics works in every worker
+    state["ingest_latency"] = {
+        k: copy.deepcopy(h) for k, h in list(latency.HISTOGRAMS.items()) if k[1] is None
+    }
+    state["velocity"] = velocity.snapshot()
+    state["hourly"] = metrics_engine.snapshot()
+    state["trade_size"] = trade_size.snapshot()
+    state["tape"] = tape.snapshot()
+    state["ticker"] = ticker.snapshot()
+    state["alerts"] = alerts.snapshot()
+    state["orderflow"] = orderflow.snapshot()
+    state["sessions"] = sessions.snapshot()
+    state["venues"] = venues.snapshot()
+    return pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def apply_snapshot(blob):
+    """Replace local state with a snapshot taken by the ingest process."""
+    state = pickle.loads(blob)
+    latency.HISTOGRAMS.update(state.pop("ingest_latency"))
+    velocity.restore(state.pop("velocity"))
+    metrics_engine.restore(state.pop("hourly"))
+    trade_size.restore(state.pop("trade_size"))
+    tape.restore(state.pop("tape"))
+    ticker.restore(state.pop("ticker"))
+    alerts.restore(state.pop("alerts"))
+    orderflow.restore(state.pop("orderflow"))
+    sessions.restore(state.pop("sessions"))
+    venues.restore(state.pop("venues"))
+
+    with STATE_LOCK:
+        globals().update(state)
+    STATE_READY.set()
+
+
+def _backoff_delay(attempt):
+    """Exponential backoff with jitter (half fixed, half random)."""
+    delay = min(RECONNECT_MAX, RECONNECT_BASE * (2 ** attempt))
+    return delay / 2 + random.uniform(0, delay / 2)
 
 
 # ============================================================
 # WEBSOCKET LOOP
 # ============================================================
 
-async def _ws_loop():
+async def _offer(q, name, item, display=False):
+    """
+    Put with the overload policy: display-only items are shed when the
+    queue is full (drop_display), everything else waits for room.
+    """
+    if q.full():
+        if display and OVERLOAD_POLICY == "drop_display":
+            WS_STATS["dropped_display"] += 1
+            return
+        WS_STATS["backpressure_waits"] += 1
+    await q.put(item)
+
+    depth = q.qsize()
+    if depth > WS_STATS[f"queue_{name}_max"]:
+        WS_STATS[f"queue_{name}_max"] = depth
+
+
+async def _reader(ws, decode_q, conn):
+    """Only recv() + timestamp, so the socket is always drained."""
+    display_only = conn["adapter"].display_only
+    while True:
+        try:
+            raw = await asyncio.wait_for(ws.recv(), timeout=5)
+        except asyncio.TimeoutError:
+            await ws.ping()
+            continue
+
+        # cheap pre-decode check: ticker messages are display-only
+        await _offer(decode_q, "decode", (conn, time.time(), raw), display=display_only(raw))
+
+
+async def _decoder(decode_q, aggregate_q):
+    """Shared by all venues: the adapter turns JSON into normalized events."""
+    while True:
+        conn, recv_ts, raw = await decode_q.get()
+        adapter = conn["adapter"]
+
+        if raw is None:
+            # new connection: sequence numbers restart
+            for key in [k for k in FEED_SEQ if k[0] == adapter.name]:
+                del FEED_SEQ[key]
+            continue
+
+        try:
+            events = adapter.decode(json.loads(raw))
+        except (ValueError, KeyError, TypeError) as e:
+            print(f"Decode error ({adapter.name}):", e)
+            continue
+
+        for kind, event in events:
+            gap = False
+            if adapter.sequenced and kind in ("trade", "ticker"):
+                gap = _check_seq((adapter.name, kind, event.symbol), event.seq) and kind == "trade"
+
+            await _offer(aggregate_q, "aggregate", (kind, recv_ts, event), display=kind == "ticker")
+
+            if gap and conn.get("ws") is not None:
+                # Missed trades: resubscribe to get a fresh
+                # snapshot; uids already applied are skipped.
+                print(f"WebSocket ({adapter.name}): trade seq gap, resyncing...")
+                WS_STATS["resyncs"] += 1
+                FEED_SEQ.pop((adapter.name, kind, event.symbol), None)
+                try:
+                    for msg in adapter.resync(conn["symbol"]):
+                        await conn["ws"].send(msg)
+                except Exception as e:
+                    print("WebSocket: resync failed:", e)
+
+
+def _aggregate(kind, recv_ts, event):
+    if kind == "ticker":
+        # kept per symbol; panel 11 reads the main product's
+        try:
+            ticker.update(event.symbol, event.fields, event.ts or recv_ts, CVD)
+        except (TypeError, ValueError, KeyError) as e:
+            print("Ticker parse error:", e)
+        return
+
+    # initial / resync snapshot — oldest first, de-duplicated
+    trades = event if kind == "snapshot" else (event,)
+    for t in trades:
+        try:
+            _apply_trade(t, recv_ts if kind == "trade" else None)
+        except Exception as e:
+            print("Trade parse error:", e)
+
+
+async def _aggregator(aggregate_q):
+    while True:
+        batch = [await aggregate_q.get()]
+        while len(batch) < AGGREGATE_BATCH and not aggregate_q.empty():
+            batch.append(aggregate_q.get_nowait())
+
+        # under load, ticker rows are the first thing to go
+        shed = (
+            OVERLOAD_POLICY == "drop_display"
+            and aggregate_q.qsize() > AGGREGATE_QUEUE // 2
+        )
+        for kind, recv_ts, event in batch:
+            if shed and kind == "ticker":
+                WS_STATS["dropped_display"] += 1
+                continue
+            _aggregate(kind, recv_ts, event)
+
+        # let the reader drain the socket between batches
+        await asyncio.sleep(0)
+
+
+async def _publisher(decode_q, aggregate_q):
+    """Periodic display-side work, off the per-message path."""
+    while True:
+        velocity.sample(clock.now())
+        WS_STATS["queue_decode_depth"] = decode_q.qsize()
+        WS_STATS["queue_aggregate_depth"] = aggregate_q.qsize()
+        await asyncio.sleep(PUBLISH_SECONDS)
+
+
+async def _supervise(name, stage, *args):
+    """Keep a pipeline stage running; a crash is logged, not fatal."""
+    while True:
+        try:
+            await stage(*args)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Pipeline {name} error:", e)
+            await asyncio.sleep(0.1)
+
+
+async def _connection(feed, decode_q, primary):
+    """Connect / subscribe / read one venue feed, reconnecting with backoff."""
     global WS_RUNNING
 
-    url = "wss://futures.kraken.com/ws/v1"
-    product = "PF_SOLUSD"
+    adapter = venues.ADAPTERS[feed["venue"]]
+    symbol = feed["symbol"]
+    url = venues.connection_url(adapter, symbol, feed.get("url"))
+    conn = {"adapter": adapter, "symbol": symbol, "ws": None}
+
+    attempt = 0
+    disconnected_at = None
+    connected_at = None
 
     while True:
-        print(f"WebSocket: Connecting to {product}...")
+        print(f"WebSocket: Connecting to {symbol} ({adapter.name})...")
 
         try:
             async with websockets.connect(url, ping_interval=None) as ws:
 
-                await ws.send(json.dumps({
-                    "event": "subscribe",
-                    "feed": "ticker",
-                    "product_ids": [product]
-                }))
-
-                await ws.send(json.dumps({
-                    "event": "subscribe",
-                    "feed": "trade",
-                    "product_ids": [product]
-                }))
-
-                WS_RUNNING = True
-                print("WebSocket: Connected.")
-
-                while True:
-                    try:
-                        msg = await asyncio.wait_for(ws.recv(), timeout=5)
-                    except asyncio.TimeoutError:
-                        await ws.ping()
-                        continue
-
-                    data = json.loads(msg)
-
-                    if data.get("feed") == "ticker":
-                        if "product_id" in data:
-                            LATEST_DATA[data["product_id"]] = data
-                        _decay_flash()
-                        continue
-
-                    if data.get("feed") == "trade":
-
-                        # PF Futures format
-                        if "price" in data and "qty" in data:
-                            try:
-                                price = float(data["price"])
-                                volume = float(data["qty"])
-                                side = data.get("side", "buy")
-                                ts_ms = data.get("time")
-                                ts = ts_ms / 1000 if ts_ms else time.time()
-
-                                add_trade(price, volume, side, ts)
-                                _update_price_bucket(price, volume, side)
-
-                            except Exception as e:
-                                print("Trade parse error:", e)
-                            _decay_flash()
-                            continue
-
-                        # Spot-type fallback
-                        if "trades" in data:
-                            for t in data["trades"]:
-                                try:
-                                    price = float(t["price"])
-                                    volume = float(t["qty"])
-                                    side = t.get("side", "buy")
-                                    ts = t.get("timestamp", time.time())
-
-                                    add_trade(price, volume, side, ts)
-                                    _update_price_bucket(price, volume, side)
-                                except:
-                                    pass
-                            _decay_flash()
-                            continue
+                # sequence numbers restart with every subscription
+                await decode_q.put((conn, None, None))
+
+                for msg in adapter.subscribe(symbol):
+                    await ws.send(msg)
+
+                if primary:
+                    WS_RUNNING = True
+                connected_at = time.monotonic()
+                conn["ws"] = ws
+                print(f"WebSocket: Connected ({adapter.name}).")
+
+                if disconnected_at is not None:
+                    took = time.time() - disconnected_at
+                    WS_STATS["reconnects"] += 1
+                    WS_STATS["last_reconnect_seconds"] = took
+                    WS_STATS["total_reconnect_seconds"] += took
+                    disconnected_at = None
+
+                await _reader(ws, decode_q, conn)
 
         except Exception as e:
-            print("WEBSOCKET ERROR:", e)
-            WS_RUNNING = False
+            print(f"WEBSOCKET ERROR ({adapter.name}):", e)
+            if primary:
+                WS_RUNNING = False
+            conn["ws"] = None
+
+        if disconnected_at is None:
+            disconnected_at = time.time()
+
+        # a feed that accepts the subscription and then drops at once
+        # keeps backing off; only a connection that held resets it
+        if connected_at is not None and time.monotonic() - connected_at >= RECONNECT_STABLE:
+            attempt = 0
+        connected_at = None
+
+        delay = _backoff_delay(attempt)
+        attempt += 1
+        print(f"Reconnecting in {delay:.1f} seconds...")
+        await asyncio.sleep(delay)
+
 
-        print("Reconnecting in 2 seconds...")
-        await asyncio.sleep(2)
+async def _ws_loop():
+    feeds = [{"venue": venues.PRIMARY, "symbol": PRODUCT, "url": WS_URL}] + list(VENUES)
+
+    # decoder / aggregator / publisher are shared by every venue and
+    # outlive connections, so trades already read are still applied
+    # after a disconnect
+    decode_q = asyncio.Queue(maxsize=DECODE_QUEUE)
+    aggregate_q = asyncio.Queue(maxsize=AGGREGATE_QUEUE)
+    # (references kept so the tasks are not garbage-collected)
+    stages = [
+        asyncio.ensure_future(_supervise("decoder", _decoder, decode_q, aggregate_q)),
+        asyncio.ensure_future(_supervise("aggregator", _aggregator, aggregate_q)),
+        asyncio.ensure_future(_supervise("publisher", _publisher, decode_q, aggregate_q)),
+    ]
+
+    await asyncio.gather(*(
+        _connection(feed, decode_q, primary=i == 0) for i, feed in enumerate(feeds)
+    ))
 
 
 # ============================================================
@@ -259,10 +588,21 @@ async def _ws_loop():
 # ============================================================
 
 def start_ws_thread():
+    # raw trades → mmap'd segment files (see data/trade_log.py)
+    trade_log.open_writer()
+    # sessions already running: fold in what the log has (before any trade)
+    sessions.catch_up()
+
     def run():
-        loop = asyncio.new_event_loop()
+        # uvloop / core pinning / priority, per INGEST_* (see data/runtime.py)
+        loop = runtime.new_event_loop()
         asyncio.set_event_loop(loop)
+        tuned = runtime.tune_current_thread()
+        print(f"Ingest runtime: {runtime.describe(loop)} {' '.join(tuned)}".rstrip())
         loop.run_until_complete(_ws_loop())
 
     thread = threading.Thread(target=run, daemon=True)
     thread.start()
+
+    # history: flush trades + 1 s / 1 m bars to Parquet
+    ts_store.start_flusher()
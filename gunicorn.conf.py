@@ -0,0 +1,27 @@
+# gunicorn.conf.py
+import os
+
+bind = os.environ.get("WEB_BIND", "0.0.0.0:8050")
+workers = int(os.environ.get("WEB_WORKERS", "2"))
+threads = int(os.environ.get("WEB_THREADS", "4"))
+worker_class = "gthread"
+timeout = 30
+
+# Build the layout (and panel 1's figure) once in the master
+preload_app = True
+
+# Without a standalone ingest service every worker would run its own
+# ingest, and they would all append to the same trade log, Parquet store
+# and session files. Only one worker may own them.
+if workers > 1 and not os.environ.get("INGEST_SOCKET"):
+    print(
+        f"WEB_WORKERS={workers} without INGEST_SOCKET: running 1 worker. "
+        "Run ingest.py and set INGEST_SOCKET for more."
+    )
+    workers = 1
+
+
+def post_fork(server, worker):
+    # Threads do not survive fork: start ingest (or the mirror) per worker
+    from app import start_ingest
+    start_ingest()
@@ -0,0 +1,19 @@
+# ingest.py
+#
+# Standalone ingest service: owns the Kraken websocket and all
+# aggregates, and serves snapshots to any number of Dash workers.
+#
+#   export INGEST_AUTHKEY=<shared secret> INGEST_SOCKET=/tmp/futures_dash/ingest.sock
+#   python ingest.py
+#   python app.py
+#
+# The socket's directory is created 0700; the authkey has no default.
+from config import configure
+from data.ws_client import start_ws_thread
+from data.state_channel import serve_snapshots
+
+
+if __name__ == "__main__":
+    configure()
+    start_ws_thread()
+    serve_snapshots()
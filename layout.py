@@ -1,20 +1,17 @@
 # layout.py
 from dash import html
-from panels import panel_1, panel_2, panel_3, panel_4, panel_5, panel_6, panel_7, panel_8, panel_9
+from config import CONFIG
+from panels.registry import get_panels
+import visibility
+import scheduler
+import toasts
 
 
-def serve_layout():
+def serve_layout(panels=None):
     return html.Div(
         id="grid-container",
         children=[
-            panel_1.layout(),
-            panel_2.layout(),
-            panel_3.layout(),
-            panel_4.layout(),
-            panel_5.layout(),
-            panel_6.layout(),
-            panel_7.layout(),
-            panel_8.layout(),
-            panel_9.layout(),
-        ]
+            panel.layout()
+            for panel in get_panels(panels or CONFIG["panels"])
+        ] + visibility.layout() + scheduler.layout() + toasts.layout()
     )
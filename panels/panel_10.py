@@ -0,0 +1,99 @@
+# panels/panel_10.py
+import plotly.graph_objects as go
+from dash import html, dcc, Input, Output, State, no_update, ctx
+import data.ws_client as ws
+from data import latency
+from data import trade_size
+import scheduler
+
+WINDOWS = ["5m", "1h", "session"]
+QUANTILE_COLORS = {0.5: "white", 0.9: "orange", 0.99: "magenta"}
+
+
+def layout():
+    return html.Div(
+        className="panel",
+        children=[
+            html.Div(
+                [
+                    "Trade Size Distribution",
+                    dcc.RadioItems(
+                        id="panel10-window",
+                        options=WINDOWS,
+                        value=trade_size.LARGE_WINDOW,
+                        inline=True,
+                        inputStyle={"marginLeft": "8px", "marginRight": "3px"},
+                        style={"fontSize": "12px", "fontWeight": "normal"}
+                    ),
+                ],
+                className="panel-title panel-title-row"
+            ),
+            html.Div(
+                dcc.Graph(
+                    id="panel10-sizes",
+                    config={"displayModeBar": False},
+                    style={"width": "100%", "height": "100%"}
+                ),
+                className="panel-graph"
+            ),
+            dcc.Store(id="panel10-version"),
+            dcc.Interval(id="panel10-interval", interval=2000, n_intervals=0)
+        ]
+    )
+
+
+def register_callbacks(app):
+
+    @app.callback(
+        Output("panel10-sizes", "figure"),
+        Output("panel10-version", "data"),
+        Input("panel10-interval", "n_intervals"),
+        Input("panel10-window", "value"),
+        State("panel10-version", "data")
+    )
+    def update(_, window, shown_version):
+        if ctx.triggered_id == "panel10-interval" and scheduler.unchanged(shown_version):
+            return no_update, no_update
+
+        version = latency.mark_render("panel10", ws.STATE_VERSION, ws.LAST_APPLY_TS)
+
+        summary = trade_size.summary(ws.PRODUCT, window or trade_size.LARGE_WINDOW)
+        fig = go.Figure()
+
+        if not summary or not summary["n"]:
+            fig.update_layout(
+                template="plotly_dark",
+                title="Waiting for data...",
+                xaxis={"visible": False},
+                yaxis={"visible": False}
+            )
+            return fig, version
+
+        # log-spaced buckets: plot on a log x axis
+        fig.add_trace(go.Bar(
+            x=summary["sizes"],
+            y=summary["counts"],
+            marker_color="steelblue",
+            name="Trades"
+        ))
+
+        for q, size in summary["quantiles"].items():
+            if size is None:
+                continue
+            fig.add_vline(
+                x=size,
+                line=dict(color=QUANTILE_COLORS.get(q, "gray"), width=1, dash="dot"),
+                annotation_text=f"p{q * 100:g} {size:.2f}",
+                annotation_font=dict(color=QUANTILE_COLORS.get(q, "gray"), size=11)
+            )
+
+        fig.update_layout(
+            template="plotly_dark",
+            margin=dict(l=50, r=20, t=30, b=40),
+            xaxis=dict(title="Trade size", type="log"),
+            yaxis=dict(title=f"Trades ({summary['n']:,})"),
+            bargap=0.05,
+            showlegend=False
+        )
+
+        return fig, version
@@ -0,0 +1,156 @@
+# panels/panel_11.py
+import plotly.graph_objects as go
+from dash import html, dcc, Input, Output, State, no_update, ctx
+import data.ws_client as ws
+from data import latency
+from data import ticker
+from data.downsample import minmax, point_budget
+
+CANDLE_SECONDS = 60      # ΔOI bars
+
+
+def layout():
+    return html.Div(
+        className="panel",
+        children=[
+            html.Div(
+                [
+                    html.Span(f"Open Interest vs CVD — {ws.PRODUCT}", id="panel11-title"),
+                    dcc.RadioItems(
+                        id="panel11-view",
+                        options=[
+                            {"label": "OI / CVD", "value": "oi"},
+                            {"label": "Basis / Funding", "value": "basis"},
+                        ],
+                        value="oi",
+                        inline=True,
+                        inputStyle={"marginLeft": "8px", "marginRight": "3px"},
+                        style={"fontSize": "12px", "fontWeight": "normal"}
+                    ),
+                ],
+                className="panel-title panel-title-row"
+            ),
+            html.Div(
+                dcc.Graph(
+                    id="panel11-ticker",
+                    config={"displayModeBar": False},
+                    style={"width": "100%", "height": "100%"}
+                ),
+                className="panel-graph"
+            ),
+            dcc.Store(id="panel11-version"),
+            dcc.Interval(id="panel11-interval", interval=5000, n_intervals=0)
+        ]
+    )
+
+
+def register_callbacks(app):
+
+    @app.callback(
+        Output("panel11-ticker", "figure"),
+        Output("panel11-title", "children"),
+        Output("panel11-version", "data"),
+        Input("panel11-interval", "n_intervals"),
+        Input("panel11-view", "value"),
+        State("panel11-version", "data"),
+        State("graph-width", "data")
+    )
+    def update(_, view, shown_version, width):
+        # driven by ticker messages, not trades
+        if ctx.triggered_id == "panel11-interval" and shown_version == ticker.VERSION:
+            return no_update, no_update, no_update
+
+        latency.mark_render("panel11", ws.STATE_VERSION, ws.LAST_APPLY_TS)
+        version = ticker.VERSION
+
+        ts, cols = ticker.series(ws.PRODUCT)
+        fig = go.Figure()
+
+        if not len(ts):
+            fig.update_layout(
+                template="plotly_dark",
+                title="Waiting for ticker...",
+                xaxis={"visible": False},
+                yaxis={"visible": False}
+            )
+            return fig, no_update, version
+
+        x = (ts - ts[-1]) / 60.0          # minutes ago
+        n = point_budget(width)
+
+        if view == "basis":
+            mark, index = cols["mark"], cols["index"]
+            basis_bps = (mark / index - 1) * 1e4
+            funding = cols["funding_rate"]
+
+            bx, by = minmax(x, basis_bps, n)
+            fx, fy = minmax(x, funding, n)
+
+            fig.add_trace(go.Scatter(
+                x=bx, y=by, mode="lines",
+                line=dict(color="orange", width=2),
+                name="Basis (bps)"
+            ))
+            fig.add_trace(go.Scatter(
+                x=fx, y=fy, mode="lines",
+                line=dict(color="cyan", width=1, dash="dot"),
+                name="Funding rate",
+                yaxis="y2"
+            ))
+
+            latest = ticker.latest(ws.PRODUCT)
+            title = (
+                f"Mark/Index Basis — {latest.get('basis', 0):+.3f} "
+                f"· funding {latest.get('funding_rate', 0):+.6f}"
+            )
+            fig.update_layout(
+                yaxis=dict(title=dict(text="Basis (bps)", font=dict(color="orange"))),
+                yaxis2=dict(
+                    title=dict(text="Funding", font=dict(color="cyan")),
+                    overlaying="y",
+                    side="right"
+                ),
+            )
+        else:
+            ox, oy = minmax(x, cols["open_interest"], n)
+            cx, cy = minmax(x, cols["cvd"], n)
+            candle_ts, d_oi = ticker.oi_change(ws.PRODUCT, CANDLE_SECONDS)
+
+            fig.add_trace(go.Scatter(
+                x=ox, y=oy, mode="lines",
+                line=dict(color="white", width=2),
+                name="Open interest"
+            ))
+            fig.add_trace(go.Scatter(
+                x=cx, y=cy, mode="lines",
+                line=dict(color="deepskyblue", width=2),
+                name="CVD",
+                yaxis="y2"
+            ))
+            fig.add_trace(go.Bar(
+                x=(candle_ts - ts[-1]) / 60.0,
+                y=d_oi,
+                marker_color=["lime" if v >= 0 else "red" for v in d_oi],
+                name=f"ΔOI / {CANDLE_SECONDS // 60}m",
+                yaxis="y3"
+            ))
+
+            title = f"Open Interest vs CVD — {ws.PRODUCT}"
+            fig.update_layout(
+                yaxis=dict(title="Open interest", domain=[0.3, 1]),
+                yaxis2=dict(
+                    title=dict(text="CVD", font=dict(color="deepskyblue")),
+                    overlaying="y",
+                    side="right"
+                ),
+                yaxis3=dict(title="ΔOI", domain=[0, 0.22]),
+            )
+
+        fig.update_layout(
+            template="plotly_dark",
+            margin=dict(l=60, r=60, t=30, b=40),
+            xaxis=dict(title="Minutes ago"),
+            legend=dict(orientation="h", y=1.12, x=0.05)
+        )
+
+        return fig, title, version
@@ -0,0 +1,123 @@
+# panels/panel_12.py
+import plotly.graph_objects as go
+from dash import html, dcc, Input, Output, State, no_update, ctx
+import data.ws_client as ws
+from data import latency
+from data import sessions
+import scheduler
+
+COMPARE_SESSIONS = 5     # previous sessions averaged into the reference profile
+
+
+def layout():
+    names = sessions.names()
+    return html.Div(
+        className="panel",
+        children=[
+            html.Div(
+                [
+                    html.Span(f"Session Profile — {ws.PRODUCT}", id="panel12-title"),
+                    dcc.RadioItems(
+                        id="panel12-session",
+                        options=names,
+                        value=names[0] if names else None,
+                        inline=True,
+                        inputStyle={"marginLeft": "8px", "marginRight": "3px"},
+                        style={"fontSize": "12px", "fontWeight": "normal"}
+                    ),
+                ],
+                className="panel-title panel-title-row"
+            ),
+            html.Div(
+                dcc.Graph(
+                    id="panel12-profile",
+                    config={"displayModeBar": False},
+                    style={"width": "100%", "height": "100%"}
+                ),
+                className="panel-graph"
+            ),
+            dcc.Store(id="panel12-version"),
+            dcc.Interval(id="panel12-interval", interval=5000, n_intervals=0)
+        ]
+    )
+
+
+def _title(cmp):
+    cur = cmp["current"]
+    text = f"{cur['name']} {cur['label']} — vol {cur['volume']:,.0f}"
+    if cmp["relative_volume"] is not None:
+        text += f" ({cmp['relative_volume']:.2f}× prev {len(cmp['previous'])} at this time)"
+    text += f" · Δ {cur['delta']:+,.0f}"
+    if cur["poc"] is not None:
+        text += f" · POC {cur['poc']:.2f}"
+    if cmp["previous"] and cmp["previous"][-1]["poc"] is not None:
+        text += f" (prev {cmp['previous'][-1]['poc']:.2f})"
+    return text
+
+
+def register_callbacks(app):
+
+    @app.callback(
+        Output("panel12-profile", "figure"),
+        Output("panel12-title", "children"),
+        Output("panel12-version", "data"),
+        Input("panel12-interval", "n_intervals"),
+        Input("panel12-session", "value"),
+        State("panel12-version", "data")
+    )
+    def update(_, name, shown_version):
+        if ctx.triggered_id == "panel12-interval" and scheduler.unchanged(shown_version):
+            return no_update, no_update, no_update
+
+        version = latency.mark_render("panel12", ws.STATE_VERSION, ws.LAST_APPLY_TS)
+
+        names = sessions.names()
+        name = name or (names[0] if names else None)
+        cmp = sessions.compare(name, COMPARE_SESSIONS) if name else None
+
+        fig = go.Figure()
+        if not cmp or cmp["current"] is None:
+            fig.update_layout(
+                template="plotly_dark",
+                title="Waiting for data...",
+                xaxis={"visible": False},
+                yaxis={"visible": False}
+            )
+            return fig, f"Session Profile — {ws.PRODUCT}", version
+
+        cur = cmp["current"]
+        fig.add_trace(go.Bar(
+            y=cmp["prices"],
+            x=cmp["volume"],
+            orientation="h",
+            marker_color="teal",
+            name=cur["label"]
+        ))
+        if cmp["previous"]:
+            fig.add_trace(go.Scatter(
+                y=cmp["prices"],
+                x=cmp["avg_volume"],
+                mode="lines",
+                line=dict(color="orange", width=1.5, shape="hvh"),
+                name=f"avg of {len(cmp['previous'])} previous"
+            ))
+
+        # value area + POC of the current session
+        if cur["poc"] is not None:
+            fig.add_hrect(y0=cur["va_low"], y1=cur["va_high"],
+                          fillcolor="rgba(100,150,255,0.08)", line_width=0, layer="below")
+            fig.add_hline(y=cur["poc"], line=dict(color="yellow", width=1.5, dash="dash"))
+        for prev in cmp["previous"][-1:]:
+            if prev["poc"] is not None:
+                fig.add_hline(y=prev["poc"], line=dict(color="gray", width=1, dash="dot"))
+
+        fig.update_layout(
+            template="plotly_dark",
+            margin=dict(l=70, r=20, t=30, b=40),
+            xaxis_title="Volume",
+            yaxis=dict(title="Price", tickformat=".2f"),
+            bargap=0,
+            showlegend=False
+        )
+
+        return fig, _title(cmp), version
@@ -1,8 +1,10 @@
 # panels/panel_2.py
-from dash import html, dcc, Input, Output
+from dash import html, dcc, Input, Output, State, no_update
 import plotly.graph_objects as go
-from data.metrics_engine import get_hourly_metrics
-import datetime
+import data.ws_client as ws
+from data import latency
+from data.metrics_engine import hourly_payload
+import scheduler
 
 
 def layout():
@@ -11,7 +13,7 @@ def layout():
         children=[
             # Title
             html.Div(
-                "Buy/Sell Volume per Hour (Last 24h) — PF_SOLUSD",
+                f"Buy/Sell Volume per Hour (Last 24h) — {ws.PRODUCT}",
                 className="panel-title"
             ),
 
@@ -25,6 +27,7 @@ def layout():
                 className="panel-graph"
             ),
 
+            dcc.Store(id="panel2-version"),
             dcc.Interval(
                 id="panel2-interval",
                 interval=2000,   # update every 2 seconds
@@ -38,12 +41,19 @@ def register_callbacks(app):
 
     @app.callback(
         Output("panel2-volume-bars", "figure"),
-        Input("panel2-interval", "n_intervals")
+        Output("panel2-version", "data"),
+        Input("panel2-interval", "n_intervals"),
+        State("panel2-version", "data")
     )
-    def update_bars(_):
-        metrics = get_hourly_metrics()
+    def update_bars(_, shown_version):
+        if scheduler.unchanged(shown_version):
+            return no_update, no_update
 
-        if not metrics:
+        version = latency.mark_render("panel2", ws.STATE_VERSION, ws.LAST_APPLY_TS)
+
+        hourly = hourly_payload()
+
+        if not len(hourly["hours"]):
             fig = go.Figure()
             fig.update_layout(
                 template="plotly_dark",
@@ -51,31 +61,14 @@ def register_callbacks(app):
                 xaxis={"visible": False},
                 yaxis={"visible": False}
             )
-            return fig
-
-        # ----- Prepare data -----
-        hours = list(metrics.keys())
-        buys = []
-        sells = []
-        totals = []
-        costs = []
-
-        for h in hours:
-            m = metrics[h]
-            buy = m["buy_volume"]
-            sell = m["sell_volume"]
-            total = buy + sell
-            cost = m["buy_cost"] + m["sell_cost"]
-
-            buys.append(buy)
-            sells.append(sell)
-            totals.append(total)
-            costs.append(cost)
-
-        hour_labels = [
-            datetime.datetime.fromtimestamp(h).strftime("%H:%M")
-            for h in hours
-        ]
+            return fig, version
+
+        # ----- Prepare data (closed hours are precomputed) -----
+        hour_labels = hourly["labels"]
+        buys = hourly["buy_vol"]
+        sells = hourly["sell_vol"]
+        totals = buys + sells
+        costs = hourly["buy_cost"] + hourly["sell_cost"]
 
         # ----- Build stacked bars -----
         fig = go.Figure()
@@ -123,4 +116,4 @@ def register_callbacks(app):
             )
         )
 
-        return fig
+        return fig, version
@@ -1,10 +1,21 @@
 # panels/panel_3.py
+import os
+
+import numpy as np
 import plotly.graph_objects as go
-from dash import html, dcc, Input, Output
+from dash import html, dcc, Input, Output, State, Patch, no_update
 import data.ws_client as ws
+from data import clock
+from data import latency
+from data import orderflow
+from data.encoding import typed_array
+import scheduler
 
 BUCKET_SIZE = ws.BUCKET_SIZE
 
+# Send only the volume arrays while no bucket was added (PANEL3_PATCH=0 → full figures)
+PATCH_UPDATES = os.environ.get("PANEL3_PATCH", "1") != "0"
+
 def layout():
     return html.Div(
         className="panel",
@@ -18,47 +29,150 @@ def layout():
                 config={"displayModeBar": False},
                 style={"width": "100%", "height": "100%"}
             ),
+            dcc.Store(id="panel3-version"),
+            dcc.Store(id="panel3-buckets"),
             dcc.Interval(id="panel3-interval", interval=2000, n_intervals=0)
         ]
     )
 
+
+def _flash_shapes(flash):
+    """Outline of the last traded bucket, fading with clock time."""
+    if not flash or ws.FLASH_BUCKET is None:
+        return []
+    half = BUCKET_SIZE / 2
+    return [dict(
+        type="rect", xref="paper", x0=0, x1=1,
+        y0=ws.FLASH_BUCKET - half, y1=ws.FLASH_BUCKET + half,
+        line=dict(color=f"rgba(255,255,0,{flash:.2f})", width=2),
+        fillcolor="rgba(0,0,0,0)"
+    )]
+
+
+def _overlay_shapes(of):
+    """Value area band, POC line and stacked-imbalance markers."""
+    half = BUCKET_SIZE / 2
+    shapes = []
+    if of["value_area"]:
+        va_low, va_high, poc = of["value_area"]
+        shapes.append(dict(
+            type="rect", xref="paper", x0=0, x1=1,
+            y0=va_low - half, y1=va_high + half,
+            line=dict(width=0), fillcolor="rgba(100,150,255,0.08)", layer="below"
+        ))
+        shapes.append(dict(
+            type="line", xref="paper", x0=0, x1=1, y0=poc, y1=poc,
+            line=dict(color="orange", width=2, dash="dash")
+        ))
+    # buy stacks on the right edge, sell stacks on the left
+    for side, low, high, _ in of["stacks"]:
+        x0, x1 = (0.985, 1) if side == "buy" else (0, 0.015)
+        shapes.append(dict(
+            type="rect", xref="paper", x0=x0, x1=x1,
+            y0=low - half, y1=high + half, line=dict(width=0),
+            fillcolor="lime" if side == "buy" else "red"
+        ))
+    return shapes
+
+
+def _overlay_annotations(of):
+    """Absorption events (volume absorbed without the price moving)."""
+    return [
+        dict(
+            xref="paper", x=0.5, y=bucket, showarrow=False,
+            text=f"◆ {side} absorption {volume:,.0f}",
+            font=dict(size=11, color="cyan" if side == "bid" else "magenta")
+        )
+        for _, bucket, side, volume, _ in of["absorption"]
+    ]
+
+
+def _title_suffix(of):
+    if not of["value_area"]:
+        return ""
+    va_low, va_high, poc = of["value_area"]
+    return f" — POC {poc:.2f} · VA {va_low:.2f}–{va_high:.2f}"
+
+
 def register_callbacks(app):
 
     @app.callback(
         Output("panel3-histogram", "figure"),
         Output("panel3-title", "children"),
-        Input("panel3-interval", "n_intervals")
+        Output("panel3-version", "data"),
+        Output("panel3-buckets", "data"),
+        Input("panel3-interval", "n_intervals"),
+        State("panel3-version", "data"),
+        State("panel3-buckets", "data")
     )
-    def update_hist(_):
+    def update_hist(_, shown_version, shown_buckets):
+        # a fading highlight still needs frames when no trades arrive
+        flash = ws.flash_strength()
+        if scheduler.unchanged(shown_version) and not flash:
+            return no_update, no_update, no_update, no_update
+
+        version = latency.mark_render("panel3", ws.STATE_VERSION, ws.LAST_APPLY_TS)
 
         if not ws.PRICE_BUCKETS:
-            return go.Figure(), "Waiting for data..."
+            return go.Figure(), "Waiting for data...", version, None
 
         # --------------------------------------
         # KEEP ALL BUCKETS (no windowing)
         # --------------------------------------
         buckets = sorted(ws.PRICE_BUCKETS.keys())
 
-        buy_vol = [ws.PRICE_BUCKETS[b]["buy"] for b in buckets]
-        sell_vol = [ws.PRICE_BUCKETS[b]["sell"] for b in buckets]
-        labels = [f"{b:.2f}" for b in buckets]
+        # numpy arrays → base64 typed arrays on the wire (not JSON lists)
+        buy_vol = np.array([ws.PRICE_BUCKETS[b]["buy"] for b in buckets], dtype=np.float32)
+        sell_vol = np.array([ws.PRICE_BUCKETS[b]["sell"] for b in buckets], dtype=np.float32)
+
+        max_buy = float(buy_vol.max()) if len(buy_vol) else 0
+        max_sell = float(sell_vol.max()) if len(sell_vol) else 0
+        x_range = [-max_sell * 1.2, max_buy * 1.2]
+
+        of = orderflow.overlays(clock.now())
+        shapes = _flash_shapes(flash) + _overlay_shapes(of)
+        annotations = _overlay_annotations(of)
+
+        title = (
+            f"Live Buy/Sell Volume by Price Bucket (0.50 USD) — {ws.PRODUCT} — "
+            f"Price {ws.LAST_PRICE:.2f}{_title_suffix(of)}"
+        )
+
+        # --------------------------------------
+        # SAME BUCKETS AS ON SCREEN → PATCH VALUES ONLY
+        # --------------------------------------
+        # buckets are only ever added, so (count, lowest, highest) identifies the set
+        bucket_key = [len(buckets), buckets[0], buckets[-1]]
+
+        if PATCH_UPDATES and shown_buckets == bucket_key:
+            patch = Patch()
+            patch["data"][0]["x"] = typed_array(-sell_vol)
+            patch["data"][1]["x"] = typed_array(buy_vol)
+            patch["layout"]["xaxis"]["range"] = x_range
+            patch["layout"]["shapes"] = shapes
+            patch["layout"]["annotations"] = annotations
+            return patch, title, version, no_update
+
+        prices = np.array(buckets)
 
         fig = go.Figure()
 
         # SELL bars (negative)
         fig.add_trace(go.Bar(
-            y=labels,
-            x=[-v for v in sell_vol],
+            y=prices,
+            x=-sell_vol,
             orientation="h",
+            width=BUCKET_SIZE * 0.9,
             marker_color="red",
             name="Sells"
         ))
 
         # BUY bars (positive)
         fig.add_trace(go.Bar(
-            y=labels,
+            y=prices,
             x=buy_vol,
             orientation="h",
+            width=BUCKET_SIZE * 0.9,
             marker_color="green",
             name="Buys"
         ))
@@ -66,19 +180,16 @@ def register_callbacks(app):
         # --------------------------------------
         # FIX X-RANGE SO BARS NEVER DISAPPEAR
         # --------------------------------------
-        max_buy = max(buy_vol) if buy_vol else 0
-        max_sell = max(sell_vol) if sell_vol else 0
-
-        fig.update_xaxes(range=[-max_sell * 1.2, max_buy * 1.2])
+        fig.update_xaxes(range=x_range)
 
         fig.update_layout(
             template="plotly_dark",
             barmode="relative",
             margin=dict(l=70, r=40, t=40, b=40),
             xaxis_title="Volume",
-            yaxis_title=f"Buckets (size = {BUCKET_SIZE})"
+            yaxis=dict(title=f"Buckets (size = {BUCKET_SIZE})", tickformat=".2f"),
+            shapes=shapes,
+            annotations=annotations
         )
 
-        title = f"Live Buy/Sell Volume by Price Bucket (0.50 USD) — PF_SOLUSD — Price {ws.LAST_PRICE:.2f}"
-
-        return fig, title
+        return fig, title, version, bucket_key
@@ -1,12 +1,13 @@
 # panels/panel_4.py
 
 import plotly.graph_objects as go
-from dash import html, dcc, Input, Output
-import time
+from dash import html, dcc, Input, Output, State, no_update, ctx
 import data.ws_client as ws
-
-MAX_POINTS = 400  # number of points to keep
-
+from data import alerts
+from data import latency
+from data import ts_store
+from data.downsample import lttb, point_budget
+import scheduler
 
 # -------------------------------------------------------
 # PANEL LAYOUT
@@ -16,8 +17,18 @@ def layout():
         className="panel",
         children=[
             html.Div(
-                "Cumulative Delta (CVD) — PF_SOLUSD",
-                className="panel-title"
+                [
+                    f"Cumulative Delta (CVD) — {ws.PRODUCT}",
+                    # pick a past day from the on-disk store; clear = live
+                    dcc.DatePickerSingle(
+                        id="panel4-day",
+                        placeholder="Live",
+                        clearable=True,
+                        display_format="YYYY-MM-DD",
+                        className="panel-day"
+                    ),
+                ],
+                className="panel-title panel-title-row"
             ),
             html.Div(
                 dcc.Graph(
@@ -27,11 +38,46 @@ def layout():
                 ),
                 className="panel-graph"
             ),
+            dcc.Store(id="panel4-version"),
             dcc.Interval(id="panel4-interval", interval=1500, n_intervals=0)
         ]
     )
 
 
+# -------------------------------------------------------
+# HISTORICAL DAY (volume CVD from the 1 s store rollup)
+# -------------------------------------------------------
+def history_figure(day, width):
+    ts, cvd, close = ts_store.cvd_series(day)
+
+    fig = go.Figure()
+    if len(ts) == 0:
+        fig.update_layout(template="plotly_dark", title=f"No stored data for {day}")
+        return fig
+
+    budget = point_budget(width)
+    cvd_x, cvd_y = lttb(ts - ts[0], cvd, budget)
+    price_x, price_y = lttb(ts - ts[0], close, budget)
+
+    fig.add_trace(go.Scatter(
+        x=cvd_x, y=cvd_y, mode="lines", name="CVD (volume)",
+        line=dict(color="cyan", width=2)
+    ))
+    fig.add_trace(go.Scatter(
+        x=price_x, y=price_y, mode="lines", name="Price",
+        line=dict(color="white", width=1.7, dash="dot"), yaxis="y2"
+    ))
+    fig.update_layout(
+        template="plotly_dark",
+        margin=dict(l=50, r=70, t=50, b=40),
+        xaxis_title=f"Time (s) — {day}",
+        yaxis_title="CVD (volume)",
+        showlegend=False,
+        yaxis2=dict(overlaying="y", side="right", title="Price", showgrid=False),
+    )
+    return fig
+
+
 # -------------------------------------------------------
 # CALLBACK LOGIC
 # -------------------------------------------------------
@@ -39,86 +85,54 @@ def register_callbacks(app):
 
     @app.callback(
         Output("panel4-cvd", "figure"),
-        Input("panel4-interval", "n_intervals")
+        Output("panel4-version", "data"),
+        Input("panel4-interval", "n_intervals"),
+        Input("panel4-day", "date"),
+        State("graph-width", "data"),
+        State("panel4-version", "data")
     )
-    def update(_):
-
-        # Initialize history structures if missing
-        if not hasattr(ws, "CVD_HISTORY"):
-            ws.CVD_HISTORY = []
-            ws.PRICE_HISTORY = []
-            ws.TIME_HISTORY = []
-
-        # Get latest values
-        price = ws.LAST_PRICE
-        side = ws.LAST_SIDE
-        ts = time.time()
-
-        # -------------------------
-        # Update CVD value
-        # -------------------------
-        delta = 0
-        if side == "buy":
-            delta = 1
-        elif side == "sell":
-            delta = -1
-
-        last_cvd = ws.CVD_HISTORY[-1] if ws.CVD_HISTORY else 0
-        new_cvd = last_cvd + delta
-        ws.CVD_HISTORY.append(new_cvd)
-        ws.CVD_HISTORY = ws.CVD_HISTORY[-MAX_POINTS:]
-
-        # -------------------------
-        # Safe price update
-        # -------------------------
-        if price is None:
-            if ws.PRICE_HISTORY:
-                price = ws.PRICE_HISTORY[-1]
-            else:
-                price = 0.0
-
-        ws.PRICE_HISTORY.append(price)
-        ws.PRICE_HISTORY = ws.PRICE_HISTORY[-MAX_POINTS:]
-
-        # -------------------------
-        # Time update
-        # -------------------------
-        ws.TIME_HISTORY.append(ts)
-        ws.TIME_HISTORY = ws.TIME_HISTORY[-MAX_POINTS:]
-
-        # -------------------------
-        # Convert to relative seconds (clean X-axis)
-        # -------------------------
-        if len(ws.TIME_HISTORY) > 1:
-            t0 = ws.TIME_HISTORY[0]
-            x_vals = [t - t0 for t in ws.TIME_HISTORY]
-        else:
-            x_vals = [0]
+    def update(_, day, width, shown_version):
+        # a past day never changes: only re-render when the pick changes
+        if ctx.triggered_id == "panel4-interval" and (day or scheduler.unchanged(shown_version)):
+            return no_update, no_update
+
+        version = latency.mark_render("panel4", ws.STATE_VERSION, ws.LAST_APPLY_TS)
 
+        if day:
+            return history_figure(day[:10], width), version
+
+        # -----------------------------------------------------
+        # LIVE SERIES — the per-second price / volume CVD the
+        # divergence rules evaluate (data/alerts.py), so the line
+        # and the label below always agree
         # -----------------------------------------------------
-        # DIVERGENCE DETECTION
+        ts, price, cvd = alerts.series(ws.PRODUCT)
+        if len(ts) == 0:
+            fig = go.Figure()
+            fig.update_layout(template="plotly_dark", title="Waiting for data...")
+            return fig, version
+        x_vals = ts - ts[0]
+
+        # -----------------------------------------------------
+        # DIVERGENCE (evaluated at ingest time, see data/alerts.py)
         # -----------------------------------------------------
         divergence_text = None
         color = "cyan"
 
-        if len(ws.CVD_HISTORY) > 20 and len(ws.PRICE_HISTORY) > 20:
-
-            p_now = ws.PRICE_HISTORY[-1]
-            p_prev = ws.PRICE_HISTORY[-20]
+        window, state = alerts.divergence(ws.PRODUCT)
+        if state == "bullish":        # price ↓, CVD ↑
+            color = "lime"
+            divergence_text = f"Bullish Divergence ({window} s)"
+        elif state == "bearish":      # price ↑, CVD ↓
+            color = "red"
+            divergence_text = f"Bearish Divergence ({window} s)"
 
-            if p_now is not None and p_prev is not None:
-                cvd_slope = ws.CVD_HISTORY[-1] - ws.CVD_HISTORY[-20]
-                price_slope = p_now - p_prev
-
-                # Bullish Divergence: price ↓, CVD ↑
-                if price_slope < 0 and cvd_slope > 0:
-                    color = "lime"
-                    divergence_text = "Bullish Divergence"
-
-                # Bearish Divergence: price ↑, CVD ↓
-                if price_slope > 0 and cvd_slope < 0:
-                    color = "red"
-                    divergence_text = "Bearish Divergence"
+        # -----------------------------------------------------
+        # DOWNSAMPLE to the graph width (any history length)
+        # -----------------------------------------------------
+        budget = point_budget(width)
+        cvd_x, cvd_y = lttb(x_vals, cvd, budget)
+        price_x, price_y = lttb(x_vals, price, budget)
 
         # -----------------------------------------------------
         # PLOTTING — CVD (left) + PRICE overlay (right)
@@ -127,8 +141,8 @@ def register_callbacks(app):
 
         # CVD line
         fig.add_trace(go.Scatter(
-            x=x_vals,
-            y=ws.CVD_HISTORY,
+            x=cvd_x,
+            y=cvd_y,
             mode="lines",
             name="CVD",
             line=dict(color=color, width=3)
@@ -136,8 +150,8 @@ def register_callbacks(app):
 
         # Price overlay line
         fig.add_trace(go.Scatter(
-            x=x_vals,
-            y=ws.PRICE_HISTORY,
+            x=price_x,
+            y=price_y,
             mode="lines",
             name="Price",
             line=dict(color="white", width=1.7, dash="dot"),
@@ -148,7 +162,7 @@ def register_callbacks(app):
         if divergence_text:
             fig.add_annotation(
                 x=x_vals[-1],
-                y=max(ws.CVD_HISTORY),
+                y=cvd.max(),
                 text=f"<b>{divergence_text}</b>",
                 font=dict(size=28, color=color),
                 showarrow=False,
@@ -162,7 +176,7 @@ def register_callbacks(app):
             template="plotly_dark",
             margin=dict(l=50, r=70, t=50, b=40),
             xaxis_title="Time (s)",
-            yaxis_title="CVD",
+            yaxis_title="CVD (volume)",
             showlegend=False,
             yaxis=dict(
                 showgrid=True,
@@ -183,4 +197,4 @@ def register_callbacks(app):
             nticks=8
         )
 
-        return fig
+        return fig, version
@@ -1,14 +1,41 @@
 # panels/panel_5.py
-from dash import html, dcc, Input, Output
+from dash import html, dcc, Input, Output, State, no_update, ctx
 import data.ws_client as ws
+from data import latency
+from data import tape
+from data import trade_size
+import scheduler
+
+TAPE_ROWS = 20
+LARGE_ROWS = 10
 
 
 def layout():
     return html.Div(
         className="panel",
         children=[
-            html.Div("Last 10 Trades — Mini Tape", className="panel-title"),
+            html.Div(
+                [
+                    html.Span("Mini Tape", id="panel5-title"),
+                    # aggregated: sweeps folded into one print (data/tape.py)
+                    dcc.RadioItems(
+                        id="panel5-mode",
+                        options=[
+                            {"label": "Aggregated", "value": "agg"},
+                            {"label": "Raw", "value": "raw"},
+                        ],
+                        value="agg",
+                        inline=True,
+                        inputStyle={"marginLeft": "8px", "marginRight": "3px"},
+                        style={"fontSize": "12px", "fontWeight": "normal"}
+                    ),
+                ],
+                className="panel-title panel-title-row"
+            ),
             html.Div(id="panel5-tape", className="tape-list"),
+            html.Div(id="panel5-large-title", className="panel-title"),
+            html.Div(id="panel5-large", className="tape-list"),
+            dcc.Store(id="panel5-version"),
             dcc.Interval(id="panel5-interval", interval=300, n_intervals=0)
         ]
     )
@@ -17,26 +44,54 @@ def layout():
 def register_callbacks(app):
 
     @app.callback(
+        Output("panel5-title", "children"),
         Output("panel5-tape", "children"),
-        Input("panel5-interval", "n_intervals")
+        Output("panel5-large-title", "children"),
+        Output("panel5-large", "children"),
+        Output("panel5-version", "data"),
+        Input("panel5-interval", "n_intervals"),
+        Input("panel5-mode", "value"),
+        State("panel5-version", "data")
     )
-    def update(_):
-
-        rows = []
-        trades = list(reversed(ws.LAST_TRADES))  # newest first
-
-        for t in trades:
-            color = "lime" if t["side"] == "buy" else "red"
-
-            rows.append(
-                html.Div(
-                    [
-                        html.Span(f"{t['price']:.2f}", style={"color": color, "width": "80px"}),
-                        html.Span(f"{t['volume']:.2f}", style={"color": "white", "width": "80px"}),
-                        html.Span(t["side"].upper(), style={"color": color, "width": "60px"}),
-                    ],
-                    style={"display": "flex", "gap": "12px", "fontSize": "16px"}
-                )
-            )
-
-        return rows
+    def update(_, mode, shown_version):
+        if ctx.triggered_id == "panel5-interval" and scheduler.unchanged(shown_version):
+            return no_update, no_update, no_update, no_update, no_update
+
+        version = latency.mark_render("panel5", ws.STATE_VERSION, ws.LAST_APPLY_TS)
+
+        if mode == "raw":
+            title = f"Last {len(ws.LAST_TRADES)} Trades — Mini Tape"
+            rows = [_row(t) for t in reversed(ws.LAST_TRADES)]  # newest first
+        else:
+            title = f"Last {TAPE_ROWS} Prints — Aggregated Tape"
+            rows = [
+                _row(p, f"×{p['count']}" if p["count"] > 1 else None)
+                for p in tape.latest(TAPE_ROWS)
+            ]
+
+        # ---- Large prints (≥ dynamic percentile, flagged at ingest) ----
+        summary = trade_size.summary(ws.PRODUCT)
+        if summary and summary["threshold"]:
+            pct = int(trade_size.LARGE_PERCENTILE * 100)
+            large_title = f"Large Prints — ≥ p{pct} ({summary['threshold']:.2f})"
+        else:
+            large_title = "Large Prints — warming up"
+
+        large = [
+            _row(t, f"p{t['pct'] * 100:.1f}")
+            for t in trade_size.large_prints(ws.PRODUCT, LARGE_ROWS)
+        ]
+
+        return title, rows, large_title, large, version
+
+
+def _row(t, note=None):
+    color = "lime" if t["side"] == "buy" else "red"
+    spans = [
+        html.Span(f"{t['price']:.2f}", style={"color": color, "width": "80px"}),
+        html.Span(f"{t['volume']:.2f}", style={"color": "white", "width": "80px"}),
+        html.Span(t["side"].upper(), style={"color": color, "width": "60px"}),
+    ]
+    if note:
+        spans.append(html.Span(note, style={"color": "#aaa", "width": "60px"}))
+    return html.Div(spans, style={"display": "flex", "gap": "12px", "fontSize": "16px"})
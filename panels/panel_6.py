@@ -1,20 +1,39 @@
 # panels/panel_6.py
-import time
 import plotly.graph_objects as go
-from dash import html, dcc, Input, Output
+from dash import html, dcc, Input, Output, State, no_update, ctx
 import data.ws_client as ws
+from data import latency
+from data import velocity
+from data.downsample import minmax, point_budget
 
 
 def layout():
     return html.Div(
         className="panel",
         children=[
-            html.Div("Buy/Sell Volume Velocity & Trades/sec", className="panel-title"),
+            html.Div(
+                [
+                    html.Span("Buy/Sell Volume Velocity & Trades/sec", id="panel6-title"),
+                    dcc.RadioItems(
+                        id="panel6-horizon",
+                        options=[
+                            {"label": label, "value": i}
+                            for i, label in enumerate(velocity.HORIZON_LABELS)
+                        ],
+                        value=0,
+                        inline=True,
+                        inputStyle={"marginLeft": "8px", "marginRight": "3px"},
+                        style={"fontSize": "12px", "fontWeight": "normal"}
+                    ),
+                ],
+                className="panel-title panel-title-row"
+            ),
             dcc.Graph(
                 id="panel6-velocity",
                 config={"displayModeBar": False},
                 style={"width": "100%", "height": "100%"}
             ),
+            dcc.Store(id="panel6-version"),
             dcc.Interval(id="panel6-interval", interval=1000, n_intervals=0)
         ]
     )
@@ -22,46 +41,38 @@ def layout():
 
 def register_callbacks(app):
 
-    buy_history = []
-    sell_history = []
-    tps_history = []
-
     @app.callback(
         Output("panel6-velocity", "figure"),
-        Input("panel6-interval", "n_intervals")
+        Output("panel6-title", "children"),
+        Output("panel6-version", "data"),
+        Input("panel6-interval", "n_intervals"),
+        Input("panel6-horizon", "value"),
+        State("graph-width", "data"),
+        State("panel6-version", "data")
     )
-    def update(_):
-
-        now = time.time()
-        one_sec_ago = now - 1.0
-
-        # -----------------------------
-        # BUY VOL / SEC
-        # -----------------------------
-        recent_buys = [vol for ts, vol in ws.BUY_TIMESTAMPS if ts >= one_sec_ago]
-        buy_vol_sec = sum(recent_buys)
+    def update(_, horizon, width, shown_samples):
+        # the history gains a row per second even on a quiet feed, so the
+        # sample count (not STATE_VERSION) says whether there is news
+        samples = velocity.samples()
+        if ctx.triggered_id == "panel6-interval" and shown_samples == samples:
+            return no_update, no_update, no_update
 
-        # -----------------------------
-        # SELL VOL / SEC
-        # -----------------------------
-        recent_sells = [vol for ts, vol in ws.SELL_TIMESTAMPS if ts >= one_sec_ago]
-        sell_vol_sec = sum(recent_sells)
+        latency.mark_render("panel6", ws.STATE_VERSION, ws.LAST_APPLY_TS)
 
         # -----------------------------
-        # TRADES / SEC
+        # HISTORY (sampled at ingest, 1 row / second)
         # -----------------------------
-        recent_trades = [ts for ts in ws.TRADE_TIMESTAMPS if ts >= one_sec_ago]
-        tps = len(recent_trades)
+        horizon = horizon or 0
+        ts, rates = velocity.history(horizon)
+        label = velocity.HORIZON_LABELS[horizon]
 
-        # History buffers
-        buy_history.append(buy_vol_sec)
-        sell_history.append(sell_vol_sec)
-        tps_history.append(tps)
+        seconds = ts - ts[-1] if len(ts) else ts
+        buy_x, buy_y = minmax(seconds, rates[:, 0], point_budget(width))
+        sell_x, sell_y = minmax(seconds, rates[:, 1], point_budget(width))
+        tps_x, tps_y = minmax(seconds, rates[:, 2], point_budget(width))
 
-        if len(buy_history) > 60:
-            buy_history.pop(0)
-            sell_history.pop(0)
-            tps_history.pop(0)
+        notional = rates[-1, 3] if len(rates) else 0.0
+        title = f"Buy/Sell Volume Velocity & Trades/sec ({label}) — ${notional:,.0f}/s"
 
         # -----------------------------
         # PLOTTING
@@ -69,7 +80,8 @@ def register_callbacks(app):
         fig = go.Figure()
 
         fig.add_trace(go.Scatter(
-            y=buy_history,
+            x=buy_x,
+            y=buy_y,
             mode="lines+markers",
             line=dict(color="lime", width=2),
             marker=dict(size=5),
@@ -78,7 +90,8 @@ def register_callbacks(app):
         ))
 
         fig.add_trace(go.Scatter(
-            y=sell_history,
+            x=sell_x,
+            y=sell_y,
             mode="lines+markers",
             line=dict(color="red", width=2),
             marker=dict(size=5),
@@ -87,7 +100,8 @@ def register_callbacks(app):
         ))
 
         fig.add_trace(go.Scatter(
-            y=tps_history,
+            x=tps_x,
+            y=tps_y,
             mode="lines+markers",
             line=dict(color="cyan", width=2, dash="dot"),
             marker=dict(size=4),
@@ -102,7 +116,7 @@ def register_callbacks(app):
             template="plotly_dark",
             margin=dict(l=60, r=60, t=60, b=40),
 
-            xaxis=dict(title="Last 60 seconds"),
+            xaxis=dict(title="Seconds ago"),
 
             # LEFT AXIS — volume/sec
             yaxis=dict(
@@ -121,4 +135,4 @@ def register_callbacks(app):
             legend=dict(orientation="h", y=1.15, x=0.05)
         )
 
-        return fig
+        return fig, title, samples
@@ -1,8 +1,12 @@
 # panels/panel_7.py
 import plotly.graph_objects as go
-from dash import html, dcc, Input, Output
+from dash import html, dcc, Input, Output, State, no_update
 import time
+import numpy as np
 import data.ws_client as ws
+from data.downsample import minmax, point_budget
+from data import latency
+import scheduler
 
 
 def layout():
@@ -15,6 +19,7 @@ def layout():
                 config={"displayModeBar": False},
                 style={"width": "100%", "height": "100%"}
             ),
+            dcc.Store(id="panel7-version"),
             dcc.Interval(id="panel7-interval", interval=300, n_intervals=0)
         ]
     )
@@ -24,24 +29,35 @@ def register_callbacks(app):
 
     @app.callback(
         Output("panel7-micro", "figure"),
-        Input("panel7-interval", "n_intervals")
+        Output("panel7-version", "data"),
+        Input("panel7-interval", "n_intervals"),
+        State("panel7-version", "data"),
+        State("graph-width", "data")
     )
-    def update(_):
+    def update(_, shown_version, width):
+        if scheduler.unchanged(shown_version):
+            return no_update, no_update
+
+        version = latency.mark_render("panel7", ws.STATE_VERSION, ws.LAST_APPLY_TS)
 
         if not ws.PRICE_DISPLACEMENT:
-            return go.Figure().update_layout(template="plotly_dark")
+            return go.Figure().update_layout(template="plotly_dark"), version
 
-        # Extract time + displacement
-        timestamps = [t for t, dp in ws.PRICE_DISPLACEMENT]
-        displacement = [dp for t, dp in ws.PRICE_DISPLACEMENT]
+        # Displacement per trade, downsampled keeping every spike
+        displacement = np.fromiter(
+            (dp for t, dp in list(ws.PRICE_DISPLACEMENT)), dtype=float
+        )
+        x, displacement = minmax(
+            np.arange(len(displacement)), displacement, point_budget(width)
+        )
 
         # Momentum color coding
-        colors = ["green" if dp > 0 else "red" for dp in displacement]
+        colors = np.where(displacement > 0, "green", "red")
 
         fig = go.Figure()
 
         fig.add_trace(go.Scatter(
-            x=list(range(len(displacement))),
+            x=x,
             y=displacement,
             mode="lines+markers",
             marker=dict(size=4, color=colors),
@@ -60,4 +76,4 @@ def register_callbacks(app):
             showlegend=False
         )
 
-        return fig
+        return fig, version
@@ -1,22 +1,38 @@
 # panels/panel_8.py
 
 import plotly.graph_objects as go
-from dash import html, dcc, Input, Output
+from dash import html, dcc, Input, Output, State, no_update, ctx
 import data.ws_client as ws
-import time
-from datetime import datetime
+from data import latency
+from data import ts_store
+from data.metrics_engine import build_payload, hourly_payload
+import scheduler
 
 
 def layout():
     return html.Div(
         className="panel",
         children=[
-            html.Div("Directional Volume Efficiency (Last 24 Hours)", className="panel-title"),
+            html.Div(
+                [
+                    "Directional Volume Efficiency (Last 24 Hours)",
+                    # pick a past day from the on-disk store; clear = live
+                    dcc.DatePickerSingle(
+                        id="panel8-day",
+                        placeholder="Live",
+                        clearable=True,
+                        display_format="YYYY-MM-DD",
+                        className="panel-day"
+                    ),
+                ],
+                className="panel-title panel-title-row"
+            ),
             dcc.Graph(
                 id="panel8-directional",
                 config={"displayModeBar": False},
                 style={"width": "100%", "height": "100%"}
             ),
+            dcc.Store(id="panel8-version"),
             dcc.Interval(id="panel8-interval", interval=5000, n_intervals=0)
         ]
     )
@@ -26,36 +42,27 @@ def register_callbacks(app):
 
     @app.callback(
         Output("panel8-directional", "figure"),
-        Input("panel8-interval", "n_intervals")
+        Output("panel8-version", "data"),
+        Input("panel8-interval", "n_intervals"),
+        Input("panel8-day", "date"),
+        State("panel8-version", "data")
     )
-    def update(_):
-
-        hours = sorted(ws.HOURLY_FLOW.keys())[-24:]
-        if not hours:
-            return go.Figure()
-
-        labels = []
-        buy_vol = []
-        sell_vol = []
-        arrows = []
+    def update(_, day, shown_version):
+        # a past day never changes: only re-render when the pick changes
+        if ctx.triggered_id == "panel8-interval" and (day or scheduler.unchanged(shown_version)):
+            return no_update, no_update
 
-        for h in hours:
-            row = ws.HOURLY_FLOW[h]
+        version = latency.mark_render("panel8", ws.STATE_VERSION, ws.LAST_APPLY_TS)
 
-            labels.append(datetime.fromtimestamp(h).strftime("%H:%M"))
-            buy_vol.append(row["buy_vol"])
-            sell_vol.append(-row["sell_vol"])   # negative for left side
+        hourly = build_payload(ts_store.hourly_bars(day[:10])) if day else hourly_payload()
 
-            # REAL PRICE DIRECTION
-            open_p = row["open"]
-            close_p = row["close"]
+        if not len(hourly["hours"]):
+            return go.Figure(), version
 
-            if close_p > open_p:
-                arrows.append("↑")
-            elif close_p < open_p:
-                arrows.append("↓")
-            else:
-                arrows.append("→")
+        labels = hourly["labels"]
+        buy_vol = hourly["buy_vol"]
+        sell_vol = -hourly["sell_vol"]     # negative for left side
+        arrows = hourly["arrows"]          # real price direction
 
         fig = go.Figure()
 
@@ -97,4 +104,4 @@ def register_callbacks(app):
             margin=dict(l=60, r=40, t=40, b=40),
         )
 
-        return fig
+        return fig, version
@@ -1,21 +1,38 @@
 # panels/panel_9.py
 
 import plotly.graph_objects as go
-from dash import html, dcc, Input, Output
+from dash import html, dcc, Input, Output, State, no_update, ctx
 import data.ws_client as ws
-from datetime import datetime
+from data import latency
+from data import ts_store
+from data.metrics_engine import build_payload, hourly_payload
+import scheduler
 
 
 def layout():
     return html.Div(
         className="panel",
         children=[
-            html.Div("Hourly Footprint Candles (Buy/Sell Volume)", className="panel-title"),
+            html.Div(
+                [
+                    "Hourly Footprint Candles (Buy/Sell Volume)",
+                    # pick a past day from the on-disk store; clear = live
+                    dcc.DatePickerSingle(
+                        id="panel9-day",
+                        placeholder="Live",
+                        clearable=True,
+                        display_format="YYYY-MM-DD",
+                        className="panel-day"
+                    ),
+                ],
+                className="panel-title panel-title-row"
+            ),
             dcc.Graph(
                 id="panel9-footprint",
                 config={"displayModeBar": False},
                 style={"width": "100%", "height": "100%"}
             ),
+            dcc.Store(id="panel9-version"),
             dcc.Interval(id="panel9-interval", interval=5000, n_intervals=0)
         ]
     )
@@ -25,44 +42,32 @@ def register_callbacks(app):
 
     @app.callback(
         Output("panel9-footprint", "figure"),
-        Input("panel9-interval", "n_intervals")
+        Output("panel9-version", "data"),
+        Input("panel9-interval", "n_intervals"),
+        Input("panel9-day", "date"),
+        State("panel9-version", "data")
     )
-    def update(_):
-
-        hours = sorted(ws.HOURLY_FLOW.keys())[-24:]
-        if not hours:
-            return go.Figure()
-
-        times = []
-        opens = []
-        highs = []
-        lows = []
-        closes = []
-        buy_vols = []
-        sell_vols = []
-        arrows = []
-
-        # Extract OHLC + volume from ws_client structures
-        for h in hours:
-            row = ws.HOURLY_FLOW[h]
-            o = row["open"]
-            c = row["close"]
-
-            times.append(datetime.fromtimestamp(h))
-            opens.append(o)
-            highs.append(row["high"])
-            lows.append(row["low"])
-            closes.append(c)
-            buy_vols.append(row["buy_vol"])
-            sell_vols.append(row["sell_vol"])
-
-            # Arrow direction
-            if c > o:
-                arrows.append("↑")
-            elif c < o:
-                arrows.append("↓")
-            else:
-                arrows.append("→")
+    def update(_, day, shown_version):
+        # a past day never changes: only re-render when the pick changes
+        if ctx.triggered_id == "panel9-interval" and (day or scheduler.unchanged(shown_version)):
+            return no_update, no_update
+
+        version = latency.mark_render("panel9", ws.STATE_VERSION, ws.LAST_APPLY_TS)
+
+        hourly = build_payload(ts_store.hourly_bars(day[:10])) if day else hourly_payload()
+
+        if not len(hourly["hours"]):
+            return go.Figure(), version
+
+        # OHLC + volume, precomputed per closed hour by metrics_engine
+        times = hourly["times"]
+        opens = hourly["open"]
+        highs = hourly["high"]
+        lows = hourly["low"]
+        closes = hourly["close"]
+        buy_vols = hourly["buy_vol"]
+        sell_vols = hourly["sell_vol"]
+        arrows = hourly["arrows"]
 
         fig = go.Figure()
 
@@ -88,10 +93,10 @@ def register_callbacks(app):
         # ===================================================
 
         # Normalize volumes so bars visually fit under candles
-        max_vol = max(max(buy_vols), max(sell_vols), 1)
+        max_vol = max(buy_vols.max(), sell_vols.max(), 1)
 
-        scaled_buy = [bv / max_vol for bv in buy_vols]
-        scaled_sell = [sv / max_vol for sv in sell_vols]
+        scaled_buy = buy_vols / max_vol
+        scaled_sell = sell_vols / max_vol
 
         # Buy footprint (green bar)
         fig.add_trace(go.Bar(
@@ -107,7 +112,7 @@ def register_callbacks(app):
         # Sell footprint (red bar)
         fig.add_trace(go.Bar(
             x=times,
-            y=[-v for v in scaled_sell],  # flip downward
+            y=-scaled_sell,  # flip downward
             width=0.03,
             marker_color="rgba(255,0,0,0.6)",
             name="Sell Volume",
@@ -118,14 +123,16 @@ def register_callbacks(app):
         # ===================================================
         # 3) Arrows indicating net direction (above candle)
         # ===================================================
-        for i, t in enumerate(times):
-            fig.add_annotation(
-                x=t,
-                y=highs[i] * 1.001,     # barely above the candle high
-                text=arrows[i],
-                showarrow=False,
-                font=dict(size=18, color="white")
-            )
+        # one text trace instead of one layout annotation per hour
+        fig.add_trace(go.Scatter(
+            x=times,
+            y=highs * 1.001,            # barely above the candle high
+            text=arrows,
+            mode="text",
+            textfont=dict(size=18, color="white"),
+            hoverinfo="skip",
+            showlegend=False
+        ))
 
         # ===================================================
         # LAYOUT
@@ -152,4 +159,4 @@ def register_callbacks(app):
             )
         )
 
-        return fig
+        return fig, version
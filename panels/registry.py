@@ -0,0 +1,44 @@
+# panels/registry.py
+import importlib
+import time
+
+# name → module; nothing is imported until a dashboard asks for it
+PANELS = {
+    "panel_1": "panels.panel_1",   # daily SMA chart (REST fetch)
+    "panel_2": "panels.panel_2",   # hourly buy/sell volume
+    "panel_3": "panels.panel_3",   # volume by price bucket
+    "panel_4": "panels.panel_4",   # CVD + divergence
+    "panel_5": "panels.panel_5",   # mini tape
+    "panel_6": "panels.panel_6",   # velocity
+    "panel_7": "panels.panel_7",   # micro-momentum
+    "panel_8": "panels.panel_8",   # directional volume efficiency
+    "panel_9": "panels.panel_9",   # hourly footprint candles
+    "panel_10": "panels.panel_10", # trade-size distribution
+    "panel_11": "panels.panel_11", # open interest vs CVD, basis
+    "panel_12": "panels.panel_12", # session volume profiles
+}
+
+# name → seconds spent importing it (first load only)
+IMPORT_TIMES = {}
+
+_loaded = {}
+
+
+def get_panel(name):
+    """Import a panel module on first use."""
+    if name not in _loaded:
+        if name not in PANELS:
+            raise KeyError(f"Unknown panel '{name}' (known: {', '.join(PANELS)})")
+        t0 = time.perf_counter()
+        _loaded[name] = importlib.import_module(PANELS[name])
+        IMPORT_TIMES[name] = time.perf_counter() - t0
+    return _loaded[name]
+
+
+def get_panels(names):
+    return [get_panel(name) for name in names]
+
+
+def interval_id(name):
+    """Live panels poll through a dcc.Interval named '<panelN>-interval'."""
+    return f"{name.replace('_', '')}-interval"
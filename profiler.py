@@ -0,0 +1,243 @@
+# profiler.py
+import cProfile
+import functools
+import io
+import itertools
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import deque
+
+from dash import Output
+from flask import g, has_request_context
+
+
+# ============================================================
+# CONFIG
+# ============================================================
+
+# Sample 1 in N calls with a heavier profiler (0 = off)
+SAMPLE_EVERY = int(os.environ.get("PROFILE_SAMPLE_EVERY", "0"))
+SAMPLE_MODE = os.environ.get("PROFILE_SAMPLE_MODE", "cprofile")   # or "tracemalloc"
+
+# deque.append / iteration are atomic under the GIL → no lock needed
+RING = deque(maxlen=2000)      # one record per callback call
+SAMPLES = deque(maxlen=50)     # sampled cProfile / tracemalloc reports
+
+# Bytes per panel: "panel3" → {calls, payload_bytes, wire_bytes, last_*}
+# payload = JSON as built, wire = after gzip/brotli (what crosses the VPN)
+PANEL_BYTES = {}
+
+_calls = itertools.count()
+
+# tracemalloc is process-wide: sampled calls on several gthread workers
+# share one start/stop, the last one out stops it
+_trace_lock = threading.Lock()
+_trace_users = 0
+_trace_owned = False
+
+
+# ============================================================
+# DECORATOR
+# ============================================================
+
+def _trace_start():
+    global _trace_users, _trace_owned
+    with _trace_lock:
+        if _trace_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _trace_owned = True
+        _trace_users += 1
+
+
+def _trace_stop():
+    global _trace_users, _trace_owned
+    with _trace_lock:
+        _trace_users -= 1
+        if _trace_users == 0 and _trace_owned:
+            tracemalloc.stop()
+            _trace_owned = False
+
+
+def _run_sampled(fn, args, kwargs, record):
+    if SAMPLE_MODE == "tracemalloc":
+        # the diff still includes other threads' allocations made meanwhile
+        _trace_start()
+        before = tracemalloc.take_snapshot()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            after = tracemalloc.take_snapshot()
+            _trace_stop()
+            stats = after.compare_to(before, "lineno")[:10]
+            SAMPLES.append({
+                "name": record["name"],
+                "time": record["time"],
+                "mode": "tracemalloc",
+                "report": "\n".join(str(s) for s in stats),
+            })
+
+    prof = cProfile.Profile()
+    try:
+        return prof.runcall(fn, *args, **kwargs)
+    finally:
+        out = io.StringIO()
+        pstats.Stats(prof, stream=out).sort_stats("cumulative").print_stats(15)
+        SAMPLES.append({
+            "name": record["name"],
+            "time": record["time"],
+            "mode": "cprofile",
+            "report": out.getvalue(),
+        })
+
+
+def profile_callback(name):
+    """
+    Record wall time, CPU time and net allocated blocks for every call.
+    Payload size is filled in after the response is built (see install).
+
+    The block count is sys.getallocatedblocks(), i.e. process-wide: with
+    gthread workers it also counts other threads' allocations, so it is
+    only an approximation (hence "process_alloc_blocks"). The sampled
+    tracemalloc report shows where the memory actually went.
+    """
+    def decorator(fn):
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            record = {"name": name, "time": time.time(), "payload_bytes": None}
+            sampled = SAMPLE_EVERY and next(_calls) % SAMPLE_EVERY == 0
+
+            blocks = sys.getallocatedblocks()
+            cpu = time.thread_time()
+            wall = time.perf_counter()
+            try:
+                if sampled:
+                    return _run_sampled(fn, args, kwargs, record)
+                return fn(*args, **kwargs)
+            finally:
+                record["wall_ms"] = (time.perf_counter() - wall) * 1000
+                record["cpu_ms"] = (time.thread_time() - cpu) * 1000
+                record["process_alloc_blocks"] = sys.getallocatedblocks() - blocks
+                record["sampled"] = bool(sampled)
+                RING.append(record)
+                if has_request_context():
+                    g.profile_record = record
+
+        return wrapper
+
+    return decorator
+
+
+def _callback_name(args, kwargs):
+    """Name a callback after the component of its first Output."""
+    for a in (*args, *kwargs.values()):
+        if isinstance(a, dict):
+            a = list(a.values())
+        for o in (a if isinstance(a, (list, tuple)) else [a]):
+            if isinstance(o, Output):
+                return str(o.component_id)
+    return "callback"
+
+
+class ProfiledApp:
+    """Stands in for the Dash app while panels register their callbacks."""
+
+    def __init__(self, app):
+        self._app = app
+
+    def __getattr__(self, name):
+        return getattr(self._app, name)
+
+    def callback(self, *args, **kwargs):
+        register = self._app.callback(*args, **kwargs)
+        name = _callback_name(args, kwargs)
+
+        def decorator(fn):
+            return register(profile_callback(name)(fn))
+
+        return decorator
+
+
+# ============================================================
+# FLASK HOOKS + REPORT
+# ============================================================
+
+def _panel_of(name):
+    """'panel3-histogram' → 'panel3' (interval outputs belong to the scheduler)."""
+    if name.endswith("-interval"):
+        return "scheduler"
+    return name.split("-")[0]
+
+
+def install(server):
+    """Fill in the payload (and compressed wire) size of each callback response."""
+
+    @server.after_request
+    def _record_payload(response):
+        record = g.get("profile_record")
+        if record is not None and not response.direct_passthrough:
+            record["payload_bytes"] = len(response.get_data())
+        return response
+
+    # after_request hooks run last-registered first: put this one at the
+    # front of the list so it runs after compression
+    def _record_wire(response):
+        record = g.pop("profile_record", None)
+        if record is None or response.direct_passthrough or record["payload_bytes"] is None:
+            return response
+        wire = len(response.get_data())
+        record["wire_bytes"] = wire
+
+        stats = PANEL_BYTES.setdefault(_panel_of(record["name"]), {
+            "calls": 0, "payload_bytes": 0, "wire_bytes": 0,
+            "last_payload_bytes": 0, "last_wire_bytes": 0,
+        })
+        stats["calls"] += 1
+        stats["payload_bytes"] += record["payload_bytes"]
+        stats["wire_bytes"] += wire
+        stats["last_payload_bytes"] = record["payload_bytes"]
+        stats["last_wire_bytes"] = wire
+        return response
+
+    server.after_request_funcs.setdefault(None, []).insert(0, _record_wire)
+
+
+def _pct(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def report(top=10):
+    """Per-callback summary, slowest and biggest first."""
+    by_name = {}
+    for r in list(RING):
+        by_name.setdefault(r["name"], []).append(r)
+
+    rows = []
+    for name, recs in by_name.items():
+        wall = [r["wall_ms"] for r in recs]
+        payload = [r["payload_bytes"] for r in recs if r["payload_bytes"] is not None]
+        rows.append({
+            "name": name,
+            "calls": len(recs),
+            "wall_ms_avg": sum(wall) / len(wall),
+            "wall_ms_p95": _pct(wall, 0.95),
+            "wall_ms_max": max(wall),
+            "cpu_ms_avg": sum(r["cpu_ms"] for r in recs) / len(recs),
+            "process_alloc_blocks_avg": sum(r["process_alloc_blocks"] for r in recs) / len(recs),
+            "payload_bytes_avg": sum(payload) / len(payload) if payload else None,
+            "payload_bytes_max": max(payload) if payload else None,
+        })
+
+    return {
+        "slowest": sorted(rows, key=lambda r: r["wall_ms_p95"], reverse=True)[:top],
+        "biggest": sorted(
+            (r for r in rows if r["payload_bytes_max"] is not None),
+            key=lambda r: r["payload_bytes_max"], reverse=True
+        )[:top],
+        "samples": list(SAMPLES)[-top:],
+    }
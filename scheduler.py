@@ -0,0 +1,89 @@
+# scheduler.py
+import threading
+import time
+from collections import deque
+
+from dash import dcc, Input, Output
+import data.ws_client as ws
+from panels.registry import interval_id
+
+
+# ============================================================
+# ADAPTIVE REFRESH
+# ============================================================
+# Each panel's dcc.Interval period follows the ingest rate:
+# slow in quiet markets, fast during bursts, within (min_ms, max_ms).
+
+BOUNDS = {
+    "panel_2": (1000, 10000),
+    "panel_3": (500, 5000),
+    "panel_4": (1000, 5000),
+    "panel_5": (200, 2000),
+    "panel_6": (1000, 1000),     # samples vol/sec, keep at 1 s
+    "panel_7": (200, 2000),
+    "panel_8": (2000, 15000),
+    "panel_9": (2000, 15000),
+    "panel_10": (2000, 10000),
+    "panel_11": (5000, 5000),    # ticker-driven, not trade-driven
+    "panel_12": (5000, 30000),
+}
+
+RATE_REF = 2.0          # trades/sec at which a panel runs at half its max period
+RATE_WINDOW = 5.0       # seconds used to measure the ingest rate
+POLL_MS = 2000
+
+LAST_RATE = 0.0
+
+_samples = deque(maxlen=64)      # (time, STATE_VERSION)
+_samples_lock = threading.Lock()  # callbacks of every session share it
+
+
+def ingest_rate(window=RATE_WINDOW):
+    """Applied trades per second, from the state version delta."""
+    global LAST_RATE
+
+    now = time.time()
+    version_now = ws.STATE_VERSION
+    with _samples_lock:
+        _samples.append((now, version_now))
+
+        # newest sample at least `window` old (or the oldest we have)
+        base = _samples[0]
+        for t, version in _samples:
+            if now - t <= window:
+                break
+            base = (t, version)
+
+    dt = now - base[0]
+    LAST_RATE = (version_now - base[1]) / dt if dt > 0 else 0.0
+    return LAST_RATE
+
+
+def period_for(panel, rate):
+    lo, hi = BOUNDS[panel]
+    if rate <= 0:
+        return hi
+    return int(min(hi, max(lo, hi / (1 + rate / RATE_REF))))
+
+
+def unchanged(client_version):
+    """True when the client already shows the current state version."""
+    return client_version is not None and client_version == ws.STATE_VERSION
+
+
+def layout():
+    return [dcc.Interval(id="scheduler-interval", interval=POLL_MS, n_intervals=0)]
+
+
+def register_callbacks(app, panels):
+    panels = [p for p in panels if p in BOUNDS]
+    if not panels:
+        return
+
+    @app.callback(
+        [Output(interval_id(p), "interval") for p in panels],
+        Input("scheduler-interval", "n_intervals")
+    )
+    def update_periods(_):
+        rate = ingest_rate()
+        return [period_for(p, rate) for p in panels]
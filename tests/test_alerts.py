@@ -0,0 +1,39 @@
+# tests/test_alerts.py
+import pytest
+
+from data import alerts
+from data.alerts import AlertEngine
+
+T0 = 1760000000.0
+RULES = [
+    {"type": "imbalance", "ratio": 2.0, "min_volume": 0.0},
+    {"type": "imbalance", "ratio": 5.0, "min_volume": 10.0},
+]
+
+
+@pytest.fixture
+def fired(monkeypatch):
+    got = []
+    monkeypatch.setattr(alerts, "SINKS", [got.append])
+    return got
+
+
+def test_one_sided_bucket_fires_once(fired):
+    engine = AlertEngine("X", RULES)
+    for i in range(5):
+        engine.on_trade(T0 + i, 100.0, 1.0, "buy", 0.0, 100.0, 1.0 + i, 0.0)
+    # volume below the strict rule's minimum: only the loose rule, once
+    assert [a["rule"] for a in fired] == [0]
+
+    engine.on_trade(T0 + 6, 100.5, 10.0, "buy", 0.0, 100.5, 12.0, 0.0)
+    assert [a["rule"] for a in fired] == [0, 1]
+
+
+def test_two_sided_bucket_fires_each_crossed_rule(fired):
+    engine = AlertEngine("X", RULES)
+    engine.on_trade(T0, 101.0, 1.0, "sell", 0.0, 101.0, 1.0, 1.0)
+    assert fired == []
+    engine.on_trade(T0 + 1, 101.0, 11.0, "buy", 0.0, 101.0, 12.0, 1.0)
+
+    assert [a["rule"] for a in fired] == [0, 1]
+    assert "Buy imbalance at 101.00: 12.0x" in fired[-1]["message"]
@@ -0,0 +1,59 @@
+# tests/test_downsample.py
+import numpy as np
+import pytest
+
+from data.downsample import minmax, lttb
+
+SIZES = [(5, 4), (101, 100), (1000, 600), (1201, 600), (5000, 600), (6000, 100), (99999, 4000)]
+
+
+@pytest.mark.parametrize("n, n_out", SIZES)
+def test_minmax_keeps_extremes(n, n_out):
+    rng = np.random.default_rng(n)
+    x = np.arange(n, dtype=float)
+    y = rng.normal(size=n).cumsum()
+
+    ox, oy = minmax(x, y, n_out)
+
+    assert len(ox) <= n_out + 2
+    assert np.all(np.diff(ox) > 0)
+    assert ox[0] == 0 and ox[-1] == n - 1
+    assert oy.min() == y.min() and oy.max() == y.max()
+    assert np.array_equal(oy, y[ox.astype(int)])
+
+
+@pytest.mark.parametrize("n, n_out", SIZES)
+def test_minmax_with_nans(n, n_out):
+    rng = np.random.default_rng(n)
+    x = np.arange(n, dtype=float)
+    y = rng.normal(size=n)
+    y[rng.random(n) < 0.3] = np.nan
+    y[: n // 4] = np.nan                     # whole buckets without data
+
+    ox, oy = minmax(x, y, n_out)
+
+    assert np.all(np.diff(ox) > 0)
+    assert np.nanmin(oy) == np.nanmin(y) and np.nanmax(oy) == np.nanmax(y)
+    assert np.isnan(oy[0])                   # the leading gap is kept
+
+
+def test_minmax_all_nan():
+    y = np.full(1000, np.nan)
+    ox, oy = minmax(np.arange(1000), y, 100)
+    assert np.isnan(oy).all()
+
+
+def test_minmax_short_input_untouched():
+    x, y = np.arange(50), np.arange(50.0)
+    ox, oy = minmax(x, y, 100)
+    assert np.array_equal(oy, y)
+
+
+@pytest.mark.parametrize("n, n_out", SIZES)
+def test_lttb_keeps_endpoints(n, n_out):
+    x = np.arange(n, dtype=float)
+    y = np.sin(x / 7)
+    ox, oy = lttb(x, y, n_out)
+    assert len(ox) == min(n, n_out)
+    assert ox[0] == 0 and ox[-1] == n - 1
+    assert np.all(np.diff(ox) > 0)
@@ -0,0 +1,81 @@
+# tests/test_replay.py
+from collections import OrderedDict
+
+import numpy as np
+import pytest
+
+pytest.importorskip("websockets")
+
+import data.ws_client as ws
+from data import clock, replay, sessions, trade_log, ts_store, velocity, venues
+from data.trade_log import TradeLogWriter
+
+T0 = 1759968000.0          # 2025-10-09 00:00:00 UTC
+
+
+@pytest.fixture(autouse=True)
+def state(tmp_path, monkeypatch):
+    monkeypatch.setattr(sessions, "SESSION_DIR", str(tmp_path / "sessions"))
+    monkeypatch.setattr(sessions, "OPEN", {})
+    monkeypatch.setattr(sessions, "_next_start", {})
+    monkeypatch.setattr(sessions, "_cache", OrderedDict())
+    monkeypatch.setattr(ts_store, "HOT_TRADES", [])
+    monkeypatch.setattr(ts_store, "HOT_BARS", {"bars_1s": {}, "bars_1m": {}})
+    monkeypatch.setattr(velocity, "_hist_count", 0)
+    monkeypatch.setattr(velocity, "_last_sample", None)
+    monkeypatch.setattr(ws, "PRICE_BUCKETS", {})
+    monkeypatch.setattr(ws, "CVD", 0.0)
+    monkeypatch.setattr(ws, "PREV_TRADE_PRICE", None)
+    monkeypatch.setattr(trade_log, "WRITER", None)
+    return tmp_path
+
+
+def _log(directory):
+    primary = venues.VENUE_IDS[venues.PRIMARY]
+    other = next(i for name, i in venues.VENUE_IDS.items() if name != venues.PRIMARY)
+    writer = TradeLogWriter(str(directory), segment_records=8)
+    trades = []
+    for i in range(20):
+        venue = other if i % 5 == 4 else primary
+        side = "buy" if i % 3 else "sell"
+        trades.append((T0 + i * 0.5, 100.0 + i * 0.1, 1.0 + i, side, venue))
+        writer.append(T0 + i * 0.5, 100.0 + i * 0.1, 1.0 + i, side, i, venue)
+    writer.close()
+    return trades
+
+
+def test_rebuild_replays_the_log(state):
+    trades = _log(state / "log")
+    before = clock.CLOCK
+
+    n, took, market = replay.rebuild(directory=str(state / "log"))
+
+    assert n == 20
+    assert market == pytest.approx(9.5)
+    assert clock.CLOCK is before                      # wall clock is back
+    assert ts_store.RECORDING and ts_store.HOT_TRADES == []
+
+    # volume aggregates combine venues, price state follows the primary
+    assert ws.CVD == pytest.approx(sum(q if s == "buy" else -q for _, _, q, s, _ in trades))
+    primary = [t for t in trades if t[4] == venues.VENUE_IDS[venues.PRIMARY]]
+    assert ws.LAST_PRICE == pytest.approx(primary[-1][1])
+    assert sessions.OPEN["utc_day"].summary()["trades"] == len(primary)
+
+    # one velocity row per market second, on the simulated clock
+    ts, _ = velocity.history(0)
+    assert ts.tolist() == [T0 + s for s in range(10)]
+
+
+def test_rebuild_range(state):
+    _log(state / "log")
+    n, _, market = replay.rebuild(T0 + 2, T0 + 4, directory=str(state / "log"))
+    assert n == 4
+    assert market == pytest.approx(1.5)
+
+
+def test_rebuild_refuses_an_open_log(state, monkeypatch):
+    monkeypatch.setattr(trade_log, "WRITER", object())
+    with pytest.raises(RuntimeError):
+        replay.rebuild(directory=str(state / "log"))
+    assert ts_store.RECORDING
+    assert np.isclose(ws.CVD, 0.0)
@@ -0,0 +1,76 @@
+# tests/test_sessions.py
+from collections import OrderedDict
+
+import pytest
+
+from data import sessions, trade_log, venues
+from data.trade_log import TradeLogWriter
+
+DAY1 = 1759968000.0          # 2025-10-09 00:00:00 UTC
+DAY2 = DAY1 + 86400
+
+
+@pytest.fixture(autouse=True)
+def state(tmp_path, monkeypatch):
+    monkeypatch.setattr(sessions, "SESSION_DIR", str(tmp_path / "sessions"))
+    monkeypatch.setattr(sessions, "SESSIONS", [{"name": "day", "start": "00:00", "end": "24:00"}])
+    monkeypatch.setattr(sessions, "OPEN", {})
+    monkeypatch.setattr(sessions, "_next_start", {})
+    monkeypatch.setattr(sessions, "_folded_until", None)
+    monkeypatch.setattr(sessions, "_folded", set())
+    monkeypatch.setattr(sessions, "_cache", OrderedDict())
+    monkeypatch.setattr(trade_log, "LOG_DIR", str(tmp_path / "log"))
+    return tmp_path
+
+
+def _add(ts, price, qty, side, seq=-1):
+    sessions.add_trade(ts, price, round(price / 0.5) * 0.5, qty, side, seq)
+
+
+def test_session_freezes_on_rollover():
+    _add(DAY1 + 60, 100.0, 2.0, "buy")
+    _add(DAY1 + 120, 101.0, 1.0, "sell")
+    _add(DAY2 + 60, 102.0, 5.0, "buy")
+    sessions.wait_writes()
+
+    assert sessions.frozen_labels("day") == ["2025-10-09"]
+    frozen = sessions.load("day", "2025-10-09")
+    assert frozen["stats"][sessions.S["trades"]] == 2
+    assert frozen["by_minute"][1:3].tolist() == [2.0, 1.0]
+
+    cmp = sessions.compare("day")
+    assert cmp["current"]["label"] == "2025-10-10"
+    assert cmp["current"]["volume"] == 5.0
+    assert [p["volume"] for p in cmp["previous"]] == [3.0]
+    assert cmp["previous"][0]["open"] == 100.0 and cmp["previous"][0]["close"] == 101.0
+
+
+def test_catch_up_skips_replayed_trades():
+    primary = venues.VENUE_IDS[venues.PRIMARY]
+    other = next(i for name, i in venues.VENUE_IDS.items() if name != venues.PRIMARY)
+    writer = TradeLogWriter(trade_log.LOG_DIR, segment_records=4)
+    logged = [(DAY1 + 10 + i, 100.0 + i, 1.0, "buy", i) for i in range(6)]
+    for ts, price, qty, side, seq in logged:
+        writer.append(ts, price, qty, side, seq, primary)
+    writer.append(DAY1 + 12.5, 500.0, 9.0, "sell", 0, other)      # another venue
+    writer.close()
+
+    sessions.catch_up(now=DAY1 + 30)
+    assert sessions.OPEN["day"].summary()["trades"] == 6
+    assert sessions.OPEN["day"].summary()["high"] == 105.0
+
+    # the venue's first snapshot re-sends what is already in the log
+    for ts, price, qty, side, seq in logged[-3:]:
+        _add(ts, price, qty, side, seq)
+    _add(DAY1 + 15, 99.0, 1.0, "sell", 99)          # same second, new trade
+    _add(DAY1 + 40, 104.0, 2.0, "sell", 6)
+
+    summary = sessions.OPEN["day"].summary()
+    assert summary["trades"] == 8
+    assert summary["delta"] == 6.0 - 3.0
+
+
+def test_catch_up_without_running_session(monkeypatch):
+    monkeypatch.setattr(sessions, "SESSIONS", [{"name": "us", "start": "13:30", "end": "20:00"}])
+    sessions.catch_up(now=DAY1 + 3600)
+    assert sessions.OPEN == {}
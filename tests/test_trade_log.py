@@ -0,0 +1,92 @@
+# tests/test_trade_log.py
+import struct
+
+import numpy as np
+
+from data import trade_log
+from data.trade_log import TradeLogWriter
+
+T0 = 1760000000.0
+
+
+def _write(directory, trades, segment_records=4):
+    writer = TradeLogWriter(str(directory), segment_records=segment_records)
+    for i, (ts, venue) in enumerate(trades):
+        writer.append(ts, 100.0 + i, 1.0 + i, "buy" if i % 2 else "sell", i, venue)
+    writer.close()
+
+
+def test_round_trip_across_rotation(tmp_path):
+    _write(tmp_path, [(T0 + i, 0) for i in range(10)])
+
+    assert len(trade_log.segments(str(tmp_path))) == 3
+    recs = trade_log.read_range(0, float("inf"), str(tmp_path))
+    assert recs["ts"].tolist() == [T0 + i for i in range(10)]
+    assert recs["seq"].tolist() == list(range(10))
+    assert recs["side"].tolist() == [-1, 1] * 5
+    assert recs["price"].tolist() == [100.0 + i for i in range(10)]
+
+    assert trade_log.read_range(T0 + 3, T0 + 6, str(tmp_path))["seq"].tolist() == [3, 4, 5]
+    assert trade_log.tail(3, str(tmp_path))["seq"].tolist() == [7, 8, 9]
+
+
+def test_writer_resumes_newest_segment(tmp_path):
+    _write(tmp_path, [(T0 + i, 0) for i in range(5)])
+    _write(tmp_path, [(T0 + 5 + i, 0) for i in range(3)])
+
+    assert len(trade_log.segments(str(tmp_path))) == 2
+    assert len(trade_log.read_range(0, float("inf"), str(tmp_path))) == 8
+
+
+def test_interleaved_venues_are_not_lost(tmp_path):
+    # a lagging venue writes ts older than records already in the segment,
+    # and into the next one
+    trades = [(T0 + 0, 0), (T0 + 2, 0), (T0 + 1, 1), (T0 + 3, 0),
+              (T0 + 4, 0), (T0 + 2.5, 1), (T0 + 5, 0), (T0 + 6, 0)]
+    _write(tmp_path, trades)
+
+    got = trade_log.read_range(T0 + 1, T0 + 3, str(tmp_path))
+    assert sorted(got["ts"].tolist()) == [T0 + 1, T0 + 2, T0 + 2.5]
+    # log order is kept
+    assert got["ts"].tolist() == [T0 + 2, T0 + 1, T0 + 2.5]
+    assert len(trade_log.read_range(T0 + 2.5, T0 + 2.6, str(tmp_path))) == 1
+
+
+def test_segments_without_range_are_scanned(tmp_path):
+    _write(tmp_path, [(T0 + 2, 0), (T0 + 1, 1), (T0 + 3, 0)], segment_records=8)
+    path = trade_log.segments(str(tmp_path))[0]
+    with open(path, "r+b") as f:          # as written before the header kept a range
+        f.seek(trade_log.RANGE_OFFSET)
+        f.write(struct.pack("<ddB", 0.0, 0.0, 0))
+
+    got = trade_log.read_range(T0 + 1, T0 + 2.5, str(tmp_path))
+    assert np.array_equal(got["ts"], [T0 + 2, T0 + 1])
+
+    # the writer leaves such a segment alone and starts a new one
+    _write(tmp_path, [(T0 + 4, 0)], segment_records=8)
+    assert len(trade_log.segments(str(tmp_path))) == 2
+
+
+def test_follow_across_rotation(tmp_path):
+    writer = TradeLogWriter(str(tmp_path), segment_records=4)
+    for i in range(3):
+        writer.append(T0 + i, 100.0, 1.0, "buy", i)
+    follow = trade_log.follow(poll=0.01, directory=str(tmp_path), from_start=True)
+    assert next(follow)["seq"].tolist() == [0, 1, 2]
+
+    for i in range(3, 9):                   # fills the segment and rotates twice
+        writer.append(T0 + i, 100.0, 1.0, "buy", i)
+    got = []
+    while len(got) < 9 - 3:
+        got += next(follow)["seq"].tolist()
+    assert got == list(range(3, 9))
+    writer.close()
+
+
+def test_sync_cadence_ignores_trade_time(tmp_path):
+    writer = TradeLogWriter(str(tmp_path), segment_records=16)
+    writer.append(T0, 100.0, 1.0, "buy")
+    last = writer.last_sync
+    writer.append(T0 + 3600, 100.0, 1.0, "buy")   # an hour of trade time, no wall time
+    assert writer.last_sync == last
+    writer.close()
@@ -0,0 +1,52 @@
+# tests/test_trade_size.py
+import numpy as np
+import pytest
+
+from data import trade_size
+from data.trade_size import SizeSketch, WindowedSketch, _index
+
+T0 = 1760000000.0
+
+
+def test_quantiles_within_alpha():
+    sketch = SizeSketch()
+    sizes = np.linspace(0.1, 100.0, 1000)
+    for q in sizes:
+        sketch.add(_index(q))
+    for q in (0.5, 0.9, 0.99):
+        assert sketch.quantile(q) == pytest.approx(np.quantile(sizes, q), rel=2 * trade_size.ALPHA)
+
+
+def test_window_expires_old_slices():
+    window = WindowedSketch(60, 6)             # 10 s slices
+    window.add(_index(1.0), T0)
+    window.add(_index(2.0), T0 + 15)
+    assert window.n == 2
+
+    window.expire(T0 + 65)                     # first slice is out
+    assert window.n == 1
+    assert window.counts.sum() == 1
+    window.expire(T0 + 200)
+    assert window.n == 0
+    assert not window.counts.any()
+
+
+def test_late_trade_keeps_current_slice():
+    window = WindowedSketch(60, 6)
+    window.add(_index(1.0), T0 + 100)
+    window.add(_index(2.0), T0 + 100)
+
+    window.add(_index(3.0), T0 + 95)           # late, inside the window
+    assert window.n == 3
+    window.add(_index(4.0), T0 + 10)           # older than the window
+    assert window.n == 3
+    assert window.last_id == int((T0 + 100) // 10)
+    assert window.counts[_index(2.0)] == 1
+
+
+def test_summary_ages_out_on_a_quiet_feed(monkeypatch):
+    monkeypatch.setattr(trade_size, "ENGINES", {})
+    trade_size.add_trade("X", T0, 100.0, 1.0, "buy")
+    monkeypatch.setattr(trade_size.clock, "now", lambda: T0 + 7200)
+    assert trade_size.summary("X", "1h")["n"] == 0
+    assert trade_size.summary("X", "session")["n"] == 1
@@ -0,0 +1,112 @@
+# tests/test_ts_store.py
+import os
+
+import pytest
+
+from data import ts_store
+
+pytest.importorskip("pyarrow")
+
+DAY = "2025-10-09"
+T0 = 1759968000.0          # 2025-10-09 00:00:00 UTC
+
+
+@pytest.fixture(autouse=True)
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(ts_store, "STORE_DIR", str(tmp_path))
+    monkeypatch.setattr(ts_store, "HOT_TRADES", [])
+    monkeypatch.setattr(ts_store, "HOT_BARS", {"bars_1s": {}, "bars_1m": {}})
+    monkeypatch.setattr(ts_store, "IN_FLIGHT", {"trades": [], "bars_1s": {}, "bars_1m": {}})
+    monkeypatch.setattr(ts_store, "LATEST_TS", 0.0)
+    monkeypatch.setattr(ts_store, "RECORDING", True)
+    return tmp_path
+
+
+def _parts(store, kind):
+    path = os.path.join(store, kind, f"date={DAY}")
+    return sorted(os.listdir(path)) if os.path.isdir(path) else []
+
+
+def test_flush_moves_closed_rows_only(store):
+    ts_store.add_trade(T0 + 1, 100.0, 1.0, "buy")
+    ts_store.add_trade(T0 + 30, 101.0, 2.0, "sell")
+    ts_store.flush()                        # LATEST_TS - LATE_SECONDS cutoff
+
+    assert [r[0] for r in ts_store.HOT_TRADES] == [T0 + 30]
+    assert len(_parts(store, "trades")) == 1
+    trades = ts_store.query("trades", T0, T0 + 60)
+    assert trades.column("ts").to_pylist() == [T0 + 1, T0 + 30]
+    assert ts_store.IN_FLIGHT["trades"] == []
+
+
+def test_late_trade_merges_into_flushed_bar(store):
+    ts_store.add_trade(T0 + 1, 100.0, 1.0, "buy")
+    ts_store.add_trade(T0 + 2, 105.0, 1.0, "sell")
+    ts_store.flush(force=True)
+    # a late trade for the same minute after its bar went to disk
+    ts_store.add_trade(T0 + 3, 95.0, 2.0, "buy")
+
+    bars = ts_store.query("bars_1m", T0, T0 + 60).to_pylist()
+    assert bars == [{"ts": int(T0), "open": 100.0, "high": 105.0, "low": 95.0,
+                     "close": 95.0, "buy_vol": 3.0, "sell_vol": 1.0, "trades": 3}]
+
+    ts_store.flush(force=True)
+    assert ts_store.query("bars_1m", T0, T0 + 60).to_pylist() == bars
+    assert ts_store.hourly_bars(DAY)[int(T0)]["open"] == 100.0
+    assert ts_store.hourly_bars(DAY)[int(T0)]["close"] == 95.0
+
+
+def test_compact_day_merges_parts(store):
+    for i in range(3):
+        ts_store.add_trade(T0 + 10 + i, 100.0 + i, 1.0, "buy")
+        ts_store.flush(force=True)
+    before = ts_store.query("bars_1m", T0, T0 + 86400).to_pylist()
+    assert len(_parts(store, "bars_1m")) == 3
+
+    ts_store.compact_day(DAY)
+
+    assert _parts(store, "bars_1m") == [f"day-{DAY}.parquet"]
+    assert ts_store.query("bars_1m", T0, T0 + 86400).to_pylist() == before
+    assert before[0]["open"] == 100.0 and before[0]["close"] == 102.0
+    assert ts_store.query("trades", T0, T0 + 86400).num_rows == 3
+
+
+def test_rows_in_flight_are_counted_once(store, monkeypatch):
+    ts_store.add_trade(T0 + 1, 100.0, 1.0, "buy")
+    seen = []
+    write = ts_store._write
+
+    def write_and_query(kind, table):
+        written = write(kind, table)
+        if kind == "trades":
+            # parts are on disk but not yet published
+            seen.append(ts_store.query("trades", T0, T0 + 60).num_rows)
+        return written
+
+    monkeypatch.setattr(ts_store, "_write", write_and_query)
+    ts_store.flush(force=True)
+
+    assert seen == [1]
+    assert ts_store.query("trades", T0, T0 + 60).num_rows == 1
+
+
+def test_failed_write_keeps_rows_hot(store, monkeypatch):
+    ts_store.add_trade(T0 + 1, 100.0, 1.0, "buy")
+
+    def fail(kind, table):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(ts_store, "_write", fail)
+    with pytest.raises(OSError):
+        ts_store.flush(force=True)
+
+    assert len(ts_store.HOT_TRADES) == 1
+    assert int(T0) in ts_store.HOT_BARS["bars_1m"]
+    assert ts_store.query("bars_1s", T0, T0 + 60).num_rows == 1
+
+
+def test_not_recording_is_a_noop(store, monkeypatch):
+    monkeypatch.setattr(ts_store, "RECORDING", False)
+    ts_store.add_trade(T0 + 1, 100.0, 1.0, "buy")
+    assert ts_store.HOT_TRADES == []
+    assert ts_store.query("trades", T0, T0 + 60).num_rows == 0
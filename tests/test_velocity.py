@@ -0,0 +1,79 @@
+# tests/test_velocity.py
+import numpy as np
+import pytest
+
+from data import velocity
+
+T0 = 1760000000.0
+BUY, SELL, TRADES, NOTIONAL = range(4)
+
+
+@pytest.fixture(autouse=True)
+def engine(monkeypatch):
+    monkeypatch.setattr(velocity, "CAPACITY", 8)
+    monkeypatch.setattr(velocity, "_ts", np.zeros(9))
+    monkeypatch.setattr(velocity, "_cum", np.zeros((9, len(velocity.METRICS))))
+    monkeypatch.setattr(velocity, "_n", 0)
+    monkeypatch.setattr(velocity, "_hist_ts", np.zeros(velocity.HISTORY_SECONDS))
+    monkeypatch.setattr(velocity, "_hist", np.zeros(
+        (velocity.HISTORY_SECONDS, len(velocity.HORIZONS), len(velocity.METRICS))))
+    monkeypatch.setattr(velocity, "_hist_count", 0)
+    monkeypatch.setattr(velocity, "_last_sample", None)
+
+
+def test_rates_per_horizon():
+    velocity.add_trade(T0 - 30, 100.0, 6.0, "buy")
+    velocity.add_trade(T0 - 5, 100.0, 2.0, "sell")
+    velocity.add_trade(T0 - 0.5, 50.0, 1.0, "buy")
+
+    r = velocity.rates(T0)
+    assert r[0].tolist() == [1.0, 0.0, 1.0, 50.0]               # 1 s
+    assert r[1].tolist() == [0.1, 0.2, 0.2, 25.0]               # 10 s
+    assert r[2, BUY] == pytest.approx(7.0 / 60)                 # 60 s
+    assert r[3, TRADES] == pytest.approx(3.0 / 300)             # 5 m
+
+
+def test_rates_exclude_later_trades():
+    velocity.add_trade(T0 + 0.5, 100.0, 1.0, "buy")
+    velocity.add_trade(T0 + 5.5, 100.0, 4.0, "buy")
+
+    assert velocity.rates(T0 + 1)[0, BUY] == 1.0
+    assert velocity.rates(T0 + 3)[0, BUY] == 0.0
+    assert velocity.rates(T0 + 6)[1, BUY] == pytest.approx(0.5)
+
+
+def test_sample_backfills_quiet_seconds():
+    velocity.sample(T0)
+    velocity.add_trade(T0 + 0.5, 100.0, 1.0, "buy")
+    velocity.add_trade(T0 + 3.5, 100.0, 2.0, "buy")
+    velocity.sample(T0 + 4)
+
+    ts, rates = velocity.history(0)
+    assert ts.tolist() == [T0, T0 + 1, T0 + 2, T0 + 3, T0 + 4]
+    # second 1 sees only the first trade, not the one at 3.5
+    assert rates[:, BUY].tolist() == [0.0, 1.0, 0.0, 0.0, 2.0]
+
+
+def test_compact_keeps_recent_sums():
+    for i in range(20):
+        velocity.add_trade(T0 + i, 10.0, 1.0, "sell")
+    assert velocity._n <= velocity.CAPACITY
+    # the window is [now - H, now]: trades at 18 and 19
+    assert velocity.rates(T0 + 19)[0, SELL] == 2.0
+
+
+def test_late_trade_is_clamped():
+    velocity.add_trade(T0 + 5, 100.0, 1.0, "buy")
+    velocity.add_trade(T0 + 2, 100.0, 1.0, "sell")      # lagging venue
+    assert velocity.rates(T0 + 5.5)[0].tolist()[:3] == [1.0, 1.0, 2.0]
+
+
+def test_snapshot_round_trip():
+    velocity.add_trade(T0 + 0.5, 100.0, 1.0, "buy")
+    velocity.sample(T0)
+    velocity.sample(T0 + 2)
+    state = velocity.snapshot()
+    velocity._hist_count = 0
+
+    velocity.restore(state)
+    assert len(velocity.history(0)[0]) == 3
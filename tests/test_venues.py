@@ -0,0 +1,96 @@
+# tests/test_venues.py
+import json
+
+import pytest
+
+from data import venues
+from data.venues import Trade
+
+SYMBOLS = {"kraken_futures": "PF_SOLUSD", "binance_futures": "SOLUSDT", "bybit_linear": "SOLUSDT"}
+
+
+@pytest.mark.parametrize("name", list(venues.ADAPTERS))
+@pytest.mark.parametrize("side", ["buy", "sell"])
+def test_fixture_decodes_back(name, side):
+    adapter = venues.ADAPTERS[name]
+    trade = Trade(name, SYMBOLS[name], 1760000000.123, 187.45, 12.5, side, 7, None)
+
+    events = adapter.decode(json.loads(adapter.fixture(trade, 7)))
+
+    assert len(events) == 1
+    kind, got = events[0]
+    assert kind == "trade"
+    assert got.venue == name
+    assert got.symbol == trade.symbol
+    assert got.ts == pytest.approx(trade.ts, abs=1e-3)      # venues send ms
+    assert got.price == trade.price
+    assert got.qty == trade.qty
+    assert got.side == side
+    assert got.uid.startswith(f"{name}:")
+    assert got.seq == (7 if adapter.sequenced else None)
+
+
+@pytest.mark.parametrize("name", list(venues.ADAPTERS))
+def test_uids_distinct_per_trade(name):
+    adapter = venues.ADAPTERS[name]
+    trade = Trade(name, SYMBOLS[name], 1760000000.0, 100.0, 1.0, "buy", 0, None)
+    uids = {adapter.decode(json.loads(adapter.fixture(trade, i)))[0][1].uid for i in range(5)}
+    assert len(uids) == 5
+
+
+@pytest.mark.parametrize("name", list(venues.ADAPTERS))
+def test_unrelated_messages_ignored(name):
+    adapter = venues.ADAPTERS[name]
+    for msg in ({"event": "subscribed", "feed": "trade"}, {"op": "pong"}, {"e": "markPriceUpdate"}, {}):
+        assert adapter.decode(msg) == []
+
+
+def test_kraken_snapshot_oldest_first():
+    adapter = venues.ADAPTERS["kraken_futures"]
+    trades = [
+        {"uid": str(i), "side": "buy", "seq": i, "time": 1760000000000 + i, "qty": 1, "price": 100 + i}
+        for i in (3, 1, 2)
+    ]
+    events = adapter.decode({"feed": "trade_snapshot", "product_id": "PF_SOLUSD", "trades": trades})
+
+    kind, snapshot = events[0]
+    assert kind == "snapshot"
+    assert [t.seq for t in snapshot] == [1, 2, 3]
+    assert all(t.symbol == "PF_SOLUSD" for t in snapshot)
+
+
+def test_kraken_ticker_fields():
+    adapter = venues.ADAPTERS["kraken_futures"]
+    events = adapter.decode({
+        "feed": "ticker", "product_id": "PF_SOLUSD", "seq": 4,
+        "markPrice": 187.5, "index": 187.4, "openInterest": 1.2e6, "funding_rate": None,
+    })
+
+    kind, t = events[0]
+    assert kind == "ticker"
+    assert t.fields == {"mark": 187.5, "index": 187.4, "open_interest": 1.2e6}
+    assert t.seq == 4
+
+
+def test_binance_maker_flag_is_taker_sell():
+    adapter = venues.ADAPTERS["binance_futures"]
+    msg = {"e": "aggTrade", "s": "SOLUSDT", "a": 1, "p": "100", "q": "2", "T": 1760000000000, "m": True}
+    assert adapter.decode(msg)[0][1].side == "sell"
+
+
+def test_bybit_batch():
+    adapter = venues.ADAPTERS["bybit_linear"]
+    data = [
+        {"T": 1760000000000 + i, "s": "SOLUSDT", "S": "Buy" if i % 2 else "Sell",
+         "v": "1", "p": str(100 + i), "i": f"id{i}", "BT": False}
+        for i in range(3)
+    ]
+    events = adapter.decode({"topic": "publicTrade.SOLUSDT", "data": data})
+    assert [t.side for _, t in events] == ["sell", "buy", "sell"]
+    assert [t.price for _, t in events] == [100.0, 101.0, 102.0]
+
+
+def test_venue_ids_start_with_primary():
+    # records written before the venue byte existed read as 0
+    assert venues.VENUE_IDS[venues.PRIMARY] == 0
+    assert venues.VENUE_NAMES[0] == venues.PRIMARY
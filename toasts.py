@@ -0,0 +1,41 @@
+# toasts.py
+from dash import html, dcc, Input, Output, State, no_update
+from data import alerts
+
+POLL_MS = 1000
+MAX_TOASTS = 4
+
+
+def layout():
+    return [
+        html.Div(id="alert-toasts", className="toast-stack"),
+        dcc.Store(id="alert-seen"),
+        dcc.Interval(id="alert-interval", interval=POLL_MS, n_intervals=0),
+    ]
+
+
+def register_callbacks(app):
+    """Show alerts from the engine's UI sink as fading toasts."""
+
+    @app.callback(
+        Output("alert-toasts", "children"),
+        Output("alert-seen", "data"),
+        Input("alert-interval", "n_intervals"),
+        State("alert-seen", "data")
+    )
+    def update(_, seen):
+        latest = alerts.latest_id()
+        # first poll: don't replay alerts fired before the page was opened
+        if seen is None or latest < seen:
+            return [], latest
+        if latest == seen:
+            return no_update, no_update
+
+        return [
+            html.Div(
+                a["message"],
+                key=str(a["id"]),
+                className=f"toast toast-{a['severity']}"
+            )
+            for a in alerts.recent(after=seen, limit=MAX_TOASTS)
+        ], latest
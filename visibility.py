@@ -0,0 +1,58 @@
+# visibility.py
+from dash import html, dcc, Input, Output, State, ClientsideFunction
+from panels.registry import interval_id
+
+# Clientside check rate; costs nothing on the server
+POLL_MS = 500
+
+# panel → interval ticks skipped while hidden (reported by browsers)
+SUPPRESSED_TICKS = {}
+
+
+def layout():
+    return [
+        dcc.Interval(id="visibility-poll", interval=POLL_MS, n_intervals=0),
+        dcc.Store(id="visibility-report"),
+        dcc.Store(id="graph-width"),        # px per panel, for downsampling
+        html.Div(id="visibility-ack", style={"display": "none"}),
+    ]
+
+
+def register_callbacks(app, panels):
+    """Gate every live panel's interval on tab / on-screen visibility."""
+
+    for name in panels:
+        iid = interval_id(name)
+        app.clientside_callback(
+            ClientsideFunction(namespace="visibility", function_name="gate"),
+            Output(iid, "disabled"),
+            Output(iid, "n_intervals"),
+            Input("visibility-poll", "n_intervals"),
+            State(iid, "disabled"),
+            State(iid, "n_intervals"),
+            State(iid, "id"),
+            State(iid, "interval"),
+        )
+
+    app.clientside_callback(
+        ClientsideFunction(namespace="visibility", function_name="graphWidth"),
+        Output("graph-width", "data"),
+        Input("visibility-poll", "n_intervals"),
+        State("graph-width", "data"),
+    )
+
+    app.clientside_callback(
+        ClientsideFunction(namespace="visibility", function_name="report"),
+        Output("visibility-report", "data"),
+        Input("visibility-poll", "n_intervals"),
+    )
+
+    @app.callback(
+        Output("visibility-ack", "children"),
+        Input("visibility-report", "data"),
+        prevent_initial_call=True
+    )
+    def record_suppressed(report):
+        for panel, ticks in (report or {}).items():
+            SUPPRESSED_TICKS[panel] = SUPPRESSED_TICKS.get(panel, 0) + int(ticks)
+        return ""
@@ -0,0 +1,17 @@
+# wsgi.py
+#
+# Production entry point.
+#
+#   gunicorn -c gunicorn.conf.py wsgi:server
+#   uvicorn --interface wsgi --factory wsgi:create_server
+#
+# With more than one worker, run ingest.py and set INGEST_SOCKET and
+# INGEST_AUTHKEY so every worker mirrors the same state instead of
+# opening its own feed.
+from app import server, start_ingest
+
+
+def create_server():
+    """Factory for servers that do not fork after import (uvicorn, waitress)."""
+    start_ingest()
+    return server